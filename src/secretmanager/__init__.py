@@ -1,6 +1,19 @@
+from .bundle import SecretBundle, prefetch
 from .cache import CACHE
+from .inject import inject
 from .secret import Secret
 from .settings import Settings
+from .sources import SecretManagerSettingsSource
 from .store import AbstractSecretStore, SecretValue
 
-__all__ = ["AbstractSecretStore", "CACHE", "Secret", "SecretValue", "Settings"]
+__all__ = [
+    "AbstractSecretStore",
+    "CACHE",
+    "Secret",
+    "SecretBundle",
+    "SecretManagerSettingsSource",
+    "SecretValue",
+    "Settings",
+    "inject",
+    "prefetch",
+]
@@ -0,0 +1,340 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from pydantic import JsonValue
+
+from secretmanager import tracing
+from secretmanager.error import BaseSecretError, SecretNotFoundError, SecretTimeoutError
+from secretmanager.fork import ClientPool
+from secretmanager.settings import Settings, StoreSettings
+from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+# each frame is a 4-byte big-endian length followed by a utf-8 encoded JSON document
+_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+_ERRORS: dict[str, type[BaseSecretError]] = {
+    SecretNotFoundError.__name__: SecretNotFoundError,
+    SecretTimeoutError.__name__: SecretTimeoutError,
+}
+
+
+class AgentConnectionError(BaseSecretError, ConnectionError):
+    pass
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes | None:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            if data:
+                raise AgentConnectionError("Connection closed in the middle of a frame")
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def read_frame(sock: socket.socket) -> dict[str, Any] | None:
+    """
+    Read a single frame, returns None if the connection was closed
+    """
+    if (header := _recv_exactly(sock, _HEADER.size)) is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise AgentConnectionError(f"Frame of {size} bytes exceeds maximum frame size")
+    if (payload := _recv_exactly(sock, size)) is None:
+        raise AgentConnectionError("Connection closed in the middle of a frame")
+    return json.loads(payload)
+
+
+def write_frame(sock: socket.socket, message: dict[str, Any]) -> None:
+    payload = json.dumps(message, separators=(",", ":")).encode()
+    if len(payload) > MAX_FRAME_SIZE:
+        raise AgentConnectionError(f"Frame of {len(payload)} bytes exceeds maximum frame size")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _peer_uid(sock: socket.socket) -> int | None:
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid
+
+
+class _AgentRequestHandler(socketserver.BaseRequestHandler):
+    server: "AgentServer"
+
+    def handle(self) -> None:
+        # the socket is only accessible by the owner, double-check the peer where the platform allows it
+        if (uid := _peer_uid(self.request)) is not None and uid != os.getuid():
+            logger.warning("Rejecting agent connection from uid %s", uid)
+            return
+
+        while True:
+            try:
+                request = read_frame(self.request)
+            except (AgentConnectionError, ValueError, OSError) as e:
+                logger.debug("Closing agent connection: %s", e)
+                return
+            if request is None:
+                return
+            write_frame(self.request, self.server.dispatch(request))
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves secrets of a warm store over a unix domain socket that is only accessible by the current user
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str | Path, store: AbstractSecretStore | None = None) -> None:
+        """
+        Constructor
+
+        Args:
+            path: Path of the unix socket, its parent directory must not be accessible by other users
+            store: Store to serve secrets from. Defaults to the global default store.
+        """
+        if store is None:
+            from secretmanager.registry import get_store
+
+            store = get_store(Settings.default_store, **Settings.default_store_kwargs)
+        self.store = store
+        self.path = Path(path)
+
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.path), _AgentRequestHandler)
+        finally:
+            os.umask(old_umask)
+        self.path.chmod(0o600)
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        op = request.get("op")
+        try:
+            if op == "ping":
+                return {"ok": True}
+            if op == "get":
+                value = self.store.get(request["key"], timeout=request.get("timeout"))
+                return {"ok": True, "value": value.get_secret_value()}
+            if op == "get_many":
+                values = self.store.get_many(request["keys"], timeout=request.get("timeout"))
+                return {"ok": True, "values": {k: v.get_secret_value() for k, v in values.items()}}
+            if op == "list":
+                return {"ok": True, "keys": sorted(self.store.list_secret_keys())}
+            return {"ok": False, "error": "ValueError", "message": f"Unknown operation {op}"}
+        except Exception as e:
+            logger.debug("Agent request %s failed: %s", op, e)
+            return {"ok": False, "error": e.__class__.__name__, "message": str(e)}
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def default_socket_path() -> Path:
+    """
+    Path of a new socket in a private temporary directory, similar to ssh-agent
+    """
+    return Path(tempfile.mkdtemp(prefix="secretmanager-")) / "agent.sock"
+
+
+def serve(path: str | Path | None = None, store: AbstractSecretStore | None = None, daemon: bool = False) -> None:
+    """
+    Run the agent until it is interrupted
+
+    Args:
+        path: Path of the unix socket. Defaults to a socket in a new private temporary directory.
+        store: Store to serve secrets from. Defaults to the global default store.
+        daemon: Whether to detach into the background. Defaults to False.
+    """
+    path = Path(path) if path is not None else default_socket_path()
+    server = AgentServer(path, store=store)
+    print(f"SM_AGENT_SOCK={path}; export SM_AGENT_SOCK;")
+    sys.stdout.flush()
+
+    if daemon and os.fork() > 0:
+        # the parent exits, the child keeps serving in a new session
+        os._exit(0)
+    if daemon:
+        os.setsid()
+
+    logger.info("Secret agent listening on %s", path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class AgentClient:
+    """
+    A client of the agent which keeps a single connection open and reconnects if necessary
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(path)
+        self._sock: socket.socket | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise AgentConnectionError(f"Could not connect to agent at {self.path}: {e}") from e
+        return sock
+
+    def connect(self) -> None:
+        """
+        Open the connection if it is not open yet
+
+        Raises:
+            AgentConnectionError: If the agent is not reachable
+        """
+        with self._lock:
+            if self._sock is None:
+                self._sock = self._connect()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def request(self, message: dict[str, Any], timeout: float | None = None) -> dict[str, Any]:
+        with tracing.span("agent.request", op=message.get("op", "")), self._lock:
+            # a reused connection may have been closed by a restarted agent, retry once on a new connection
+            reused = self._sock is not None
+            while True:
+                try:
+                    response = self._request(message, timeout)
+                except AgentConnectionError:
+                    if not reused:
+                        raise
+                    reused = False
+                    continue
+                break
+
+        if not response.get("ok"):
+            error = _ERRORS.get(response.get("error", ""), BaseSecretError)
+            raise error(response.get("message", "Unknown agent error"))
+        return response
+
+    def _request(self, message: dict[str, Any], timeout: float | None) -> dict[str, Any]:
+        if self._sock is None:
+            self._sock = self._connect()
+        self._sock.settimeout(timeout)
+        try:
+            write_frame(self._sock, message)
+            response = read_frame(self._sock)
+        except socket.timeout as e:
+            # the response may still arrive, hence the connection cannot be reused
+            self._close()
+            raise SecretTimeoutError(f"Agent did not answer within {timeout}s") from e
+        except OSError as e:
+            self._close()
+            raise AgentConnectionError(f"Connection to agent at {self.path} failed: {e}") from e
+        if response is None:
+            self._close()
+            raise AgentConnectionError(f"Agent at {self.path} closed the connection")
+        return response
+
+
+class AgentStore(AbstractSecretStore[StoreSettings]):
+    """
+    A store which retrieves secrets from a running agent, see `secretmanager agent`
+
+    The agent serves secrets from its own default store and caches them, hence this store does not cache.
+    Keys are mapped with the settings of the default store, the same way as when accessing the store directly.
+    If the agent becomes unreachable, the default store is accessed directly instead.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        path = path or Settings.agent_sock
+        if path is None:
+            raise ValueError("No agent socket has been provided")
+        self.settings = getattr(Settings, Settings.default_store.lower(), None) or Settings.env
+        self.capabilities = StoreCapabilities(cacheable=False, read=True, write=False)
+        self._path = path
+        self._fallback: AbstractSecretStore | None = None
+
+    @property
+    def _client(self) -> AgentClient:
+        return _get_client(self._path)
+
+    def connect(self) -> None:
+        self._client.connect()
+
+    def _get_fallback(self, error: AgentConnectionError) -> AbstractSecretStore:
+        if self._fallback is None:
+            from secretmanager.registry import get_store
+
+            logger.warning("Falling back to direct store access: %s", error)
+            self._fallback = get_store(Settings.default_store, **Settings.default_store_kwargs)
+        return self._fallback
+
+    def get(self, key: str, timeout: float | None = None):
+        timeout = self._resolve_timeout(timeout)
+        logger.info("Getting key %s from agent", key)
+        try:
+            response = self._client.request({"op": "get", "key": key, "timeout": timeout}, timeout=timeout)
+        except AgentConnectionError as e:
+            return self._get_fallback(e).get(key, timeout=timeout)
+        return SecretValue(response["value"])
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        timeout = self._resolve_timeout(timeout)
+        keys = list(keys)
+        logger.info("Getting %s keys from agent", len(keys))
+        try:
+            response = self._client.request({"op": "get_many", "keys": keys, "timeout": timeout}, timeout=timeout)
+        except AgentConnectionError as e:
+            return self._get_fallback(e).get_many(keys, timeout=timeout)
+        return {k: SecretValue(v) for k, v in response["values"].items()}
+
+    def add(self, key: str, value: JsonValue):
+        raise NotImplementedError("This store only supports reading")
+
+    def update(self, key: str, value: JsonValue):
+        raise NotImplementedError("This store only supports reading")
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in agent")
+        try:
+            return set(self._client.request({"op": "list"})["keys"])
+        except AgentConnectionError as e:
+            return self._get_fallback(e).list_secret_keys()
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError("This store only supports reading")
+
+
+# a forked child must not talk over the connections of its parent, it opens its own connections on use.
+# Closing the inherited sockets only closes the descriptors of the child, the parent's connections remain open.
+_clients: ClientPool[str, AgentClient] = ClientPool(on_fork=AgentClient._close)
+
+
+def _get_client(path: str | Path) -> AgentClient:
+    return _clients.get(str(path), lambda: AgentClient(path))
@@ -0,0 +1,414 @@
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from secretmanager.version import __version__
+
+CLI_STARTUP_COMMANDS: dict[str, list[str]] = {
+    "cli_help": ["--help"],
+    "cli_secret_get": ["secret", "get", "SM_BENCH_KEY"],
+}
+
+# stub sops binary which prints the version or the "decrypted" file, i.e. the last argument
+_SOPS_STUB = """#!/bin/sh
+if [ "$1" = "-v" ]; then echo "sops 3.9.0"; exit 0; fi
+for f; do :; done
+cat "$f"
+"""
+
+Benchmark = Callable[[int, int], list[dict[str, Any]]]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """
+    Register a benchmark, it is called with the number of repetitions and the number of secrets to use
+    """
+
+    def wrapper(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return wrapper
+
+
+def summarize(name: str, timings: list[float], **extra: Any) -> dict[str, Any]:
+    """
+    Summarize timings in seconds into a machine-readable result
+    """
+    return {
+        "name": name,
+        "unit": "s",
+        "runs": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+        **extra,
+    }
+
+
+def measure(
+    func: Callable[[], Any], repeat: int, number: int = 1, setup: Callable[[], Any] | None = None
+) -> list[float]:
+    """
+    Measure the time per call of `func`, averaged over `number` calls for each of the `repeat` runs
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+@contextlib.contextmanager
+def _bench_environ(size: int) -> Iterator[list[str]]:
+    keys = [f"SM_BENCH_{i}" for i in range(size)]
+    os.environ.update({k: f'{{"index": {i}, "value": "secret"}}' for i, k in enumerate(keys)})
+    try:
+        yield keys
+    finally:
+        for key in keys:
+            os.environ.pop(key, None)
+
+
+def _cold_warm(name: str, func: Callable[[], Any], repeat: int, **extra: Any) -> list[dict[str, Any]]:
+    from secretmanager.cache import CACHE
+
+    cold = measure(func, repeat, setup=CACHE.clear)
+    func()
+    warm = measure(func, repeat)
+    return [summarize(f"{name}[cold]", cold, **extra), summarize(f"{name}[warm]", warm, **extra)]
+
+
+def _store_benchmarks(name: str, store: Any, keys: list[str], repeat: int) -> list[dict[str, Any]]:
+    def single() -> None:
+        for key in keys:
+            store.get(key)
+
+    def batch() -> None:
+        store.get_many(keys)
+
+    return [
+        *_cold_warm(f"{name}.get", single, repeat, secrets=len(keys)),
+        *_cold_warm(f"{name}.get_many", batch, repeat, secrets=len(keys)),
+    ]
+
+
+@benchmark("secret")
+def bench_secret(repeat: int, size: int) -> list[dict[str, Any]]:
+    from secretmanager.bundle import SecretBundle
+    from secretmanager.implementations.env import EnvVarStore
+    from secretmanager.secret import Secret
+
+    with _bench_environ(size) as keys:
+        store = EnvVarStore()
+        secrets = [Secret(key, store=store) for key in keys]
+        bundle = SecretBundle(keys, store=store)
+
+        def single() -> None:
+            for secret in secrets:
+                secret()
+
+        return [
+            *_cold_warm("secret.call", single, repeat, secrets=size),
+            *_cold_warm("secret.bundle", bundle, repeat, secrets=size),
+        ]
+
+
+@benchmark("cache")
+def bench_cache(repeat: int, size: int) -> list[dict[str, Any]]:
+    from secretmanager.cache import LRUCache
+
+    cache = LRUCache(max_size=size, expires_in=3600)
+    keys = [f"KEY_{i}" for i in range(size)]
+
+    def get_put() -> None:
+        for key in keys:
+            cache.put(key, key)
+            cache.get(key)
+
+    def get_hit() -> None:
+        for key in keys:
+            cache.get(key)
+
+    def fill() -> None:
+        cache.clear()
+        for key in keys:
+            cache.put(key, key)
+
+    results = []
+    # hits do not take the lock, hence their throughput should scale with threads on free-threaded builds
+    for name, worker, setup, ops_per_key in (("get_put", get_put, cache.clear, 2), ("get_hit", get_hit, fill, 1)):
+        for threads in (1, 4, 8):
+
+            def run(threads: int = threads, worker: Callable[[], None] = worker) -> None:
+                pool = [threading.Thread(target=worker) for _ in range(threads)]
+                for thread in pool:
+                    thread.start()
+                for thread in pool:
+                    thread.join()
+
+            timings = measure(run, repeat, setup=setup)
+            ops = threads * size * ops_per_key
+            results.append(
+                summarize(
+                    f"cache.{name}[threads={threads}]",
+                    [t / ops for t in timings],
+                    ops_per_second=ops / statistics.median(timings),
+                    threads=threads,
+                )
+            )
+    cache.clear()
+    return results
+
+
+def _allocated_per_item(create: Callable[[], Any], size: int) -> float:
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = create()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return allocated / size
+
+
+@benchmark("memory")
+def bench_memory(repeat: int, size: int) -> list[dict[str, Any]]:
+    from secretmanager.cache import LRUCache
+    from secretmanager.store import SecretValue
+
+    # keys and values exist before measuring, such that only the overhead of caching and wrapping them is counted
+    keys = [f"SM_BENCH_{i}" for i in range(size)]
+    values = [f'{{"index": {i}, "value": "secret"}}' for i in range(size)]
+    cache = LRUCache(max_size=size, expires_in=3600)
+
+    def fill_cache() -> LRUCache:
+        cache.clear()
+        for key, value in zip(keys, values):
+            cache.put(key, value)
+        return cache
+
+    def wrap() -> list[SecretValue]:
+        return [SecretValue(value) for value in values]
+
+    results = [
+        summarize(
+            "memory.cache_entry", [_allocated_per_item(fill_cache, size) for _ in range(repeat)], unit="B", secrets=size
+        ),
+        summarize("memory.secret_value", [_allocated_per_item(wrap, size) for _ in range(repeat)], unit="B"),
+    ]
+    cache.clear()
+    return results
+
+
+@benchmark("decode")
+def bench_decode(repeat: int, size: int) -> list[dict[str, Any]]:
+    from secretmanager.implementations.env import EnvVarStore
+    from secretmanager.settings import Settings
+
+    store = EnvVarStore()
+    document = json.dumps({f"SM_BENCH_{i}": {"index": i, "value": "secret"} for i in range(size)})
+    cases = {
+        "password": "correct-horse-battery-staple",
+        "token": "0a1b2c3d4e5f60718293a4b5c6d7e8f9",
+        "json": '{"username": "admin", "password": "secret"}',
+        "large": document,
+    }
+    results = [
+        summarize(f"decode.{name}", measure(lambda raw=raw: store._deserialize(raw), repeat, number=1000))
+        for name, raw in cases.items()
+    ]
+
+    # values which are never accessed are not decoded at all
+    previous = Settings.lazy_decoding
+    Settings.lazy_decoding = True
+    try:
+        results.append(
+            summarize("decode.large[lazy]", measure(lambda: store._to_secret_value(document), repeat, number=1000))
+        )
+    finally:
+        Settings.lazy_decoding = previous
+    return results
+
+
+@benchmark("env")
+def bench_env(repeat: int, size: int) -> list[dict[str, Any]]:
+    from secretmanager.implementations.env import EnvVarStore
+
+    with _bench_environ(size) as keys:
+        return _store_benchmarks("env", EnvVarStore(), keys, repeat)
+
+
+@benchmark("dotenv")
+def bench_dotenv(repeat: int, size: int) -> list[dict[str, Any]]:
+    from secretmanager.implementations.dotenv import DotEnvStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file = Path(tmp) / ".env"
+        keys = [f"SM_BENCH_{i}" for i in range(size)]
+        file.write_text("".join(f"{key}=value-{i}\n" for i, key in enumerate(keys)))
+        return _store_benchmarks("dotenv", DotEnvStore(file=file), keys, repeat)
+
+
+@benchmark("local")
+def bench_local(repeat: int, size: int) -> list[dict[str, Any]]:
+    try:
+        from secretmanager.implementations.local import LocalVaultStore
+    except ImportError as e:
+        return [{"name": "local", "skipped": f"cryptography is required: {e}"}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVaultStore(Path(tmp) / "vault", key=bytes(32), create=True)
+        keys = [f"SM_BENCH_{i}" for i in range(size)]
+        store._write({key: f"value-{i}" for i, key in enumerate(keys)})
+        return _store_benchmarks("local", store, keys, repeat)
+
+
+@benchmark("sops")
+def bench_sops(repeat: int, size: int) -> list[dict[str, Any]]:
+    from secretmanager.implementations.sops import SOPSSecretStore
+    from secretmanager.settings import Settings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        binary = Path(tmp) / "sops"
+        binary.write_text(_SOPS_STUB)
+        binary.chmod(0o700)
+        file = Path(tmp) / "secrets.json"
+        keys = [f"SM_BENCH_{i}" for i in range(size)]
+        file.write_text(json.dumps({key: f"value-{i}" for i, key in enumerate(keys)}))
+
+        previous = Settings.sops.binary
+        Settings.sops.binary = str(binary)
+        try:
+            return _store_benchmarks("sops", SOPSSecretStore(file), keys, repeat)
+        finally:
+            Settings.sops.binary = previous
+
+
+@benchmark("aws")
+def bench_aws(repeat: int, size: int) -> list[dict[str, Any]]:
+    try:
+        from moto import mock_aws
+
+        from secretmanager.implementations.aws import AWSSecretStore
+    except ImportError as e:
+        return [{"name": "aws", "skipped": f"moto and botocore are required: {e}"}]
+
+    credentials = {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    }
+    previous = {k: os.environ.get(k) for k in credentials}
+    os.environ.update(credentials)
+    try:
+        with mock_aws():
+            store = AWSSecretStore()
+            client = store._get_client()
+            keys = [f"SM_BENCH_{i}" for i in range(size)]
+            for i, key in enumerate(keys):
+                client.create_secret(Name=key, SecretString=f"value-{i}")
+            return _store_benchmarks("aws", store, keys, repeat)
+    finally:
+        for k, v in previous.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+@benchmark("cli")
+def bench_cli_startup(repeat: int = 5, size: int = 1) -> list[dict[str, Any]]:
+    """
+    Measure the cold-start wall time of the CLI, each run is a fresh Python process
+    """
+    env = {**os.environ, "SM_DEFAULT_STORE": "ENV", "SM_BENCH_KEY": "VALUE"}
+    results = []
+    for name, args in CLI_STARTUP_COMMANDS.items():
+        command = [sys.executable, "-c", "from secretmanager.cli import app; app()", *args]
+
+        def run(command: list[str] = command) -> None:
+            subprocess.run(command, env=env, capture_output=True, check=True)
+
+        results.append(summarize(name, measure(run, repeat), command=" ".join(args)))
+    return results
+
+
+def run_benchmarks(names: list[str] | None = None, repeat: int = 5, size: int = 100) -> dict[str, Any]:
+    """
+    Run benchmarks and return a machine-readable report
+
+    Args:
+        names: Benchmarks to run, see BENCHMARKS. Defaults to all.
+        repeat: Number of repetitions of each benchmark. Defaults to 5.
+        size: Number of secrets used by each benchmark. Defaults to 100.
+    """
+    from secretmanager.cache import CACHE
+
+    unknown = set(names or []) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    for name in names or BENCHMARKS:
+        if name == "sops" and shutil.which("sh") is None:
+            results.append({"name": name, "skipped": "a posix shell is required for the stub sops binary"})
+            continue
+        results.extend(BENCHMARKS[name](repeat, size))
+        CACHE.clear()
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "size": size,
+        "results": results,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Compare the median of each result against a baseline report, a ratio above 1 is a regression
+    """
+    baseline_results = {r["name"]: r for r in baseline["results"] if "median" in r}
+    comparison = []
+    for result in current["results"]:
+        if "median" not in result or (previous := baseline_results.get(result["name"])) is None:
+            continue
+        comparison.append(
+            {
+                "name": result["name"],
+                "baseline": previous["median"],
+                "current": result["median"],
+                "ratio": result["median"] / previous["median"] if previous["median"] else float("inf"),
+            }
+        )
+    return comparison
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmarks(), indent=2))
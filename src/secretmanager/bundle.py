@@ -0,0 +1,209 @@
+import logging
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, JsonValue
+
+from secretmanager.error import SecretBundleError, SecretNotFoundError
+from secretmanager.registry import get_default_store
+from secretmanager.secret import Secret
+from secretmanager.settings import StoreSettings
+from secretmanager.store import AbstractSecretStore, SecretValue
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class SecretBundle(Generic[M]):
+    """
+    A group of secrets that are resolved together in one batched pass
+
+    Secrets are grouped by their target store and each store is queried once via `get_many`.
+    Stores are queried concurrently. Errors are collected for all keys and raised together.
+    """
+
+    def __init__(
+        self,
+        secrets: Iterable[str | Secret],
+        store: AbstractSecretStore | None = None,
+        settings: StoreSettings | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            secrets: Generic keys or Secret instances to resolve. Keys are turned into a Secret using `settings`.
+            store: Overwrites the global default store for secrets that do not define their own store.
+                Defaults to None.
+            settings: Settings that are used for all keys that are not already a Secret. Defaults to None.
+            max_workers: Maximum number of stores that are queried concurrently. Defaults to None.
+        """
+        self.store = store
+        self.settings = settings or StoreSettings()
+        self.max_workers = max_workers
+        self.secrets: dict[str, Secret] = {}
+        for secret in secrets:
+            if not isinstance(secret, Secret):
+                secret = Secret(secret, settings=self.settings)
+            self.secrets[secret.key] = secret
+        self.model: type[M] | None = None
+        self.values: dict[str, SecretValue | None] = {}
+
+    @classmethod
+    def from_model(cls, model: type[M], **kwargs) -> "SecretBundle[M]":
+        """
+        Create a bundle from the fields of a pydantic model. The field alias is used as key if set.
+        """
+        keys = [field.alias or name for name, field in model.model_fields.items()]
+        bundle = cls(keys, **kwargs)
+        bundle.model = model
+        return bundle
+
+    def __call__(self, store: AbstractSecretStore | None = None, timeout: float | None = None) -> dict[str, JsonValue]:
+        """
+        Retrieve all secrets of the bundle
+
+        Args:
+            store: Overwrites the Secrets' stores, the bundle's store as well as the global default store
+            timeout: Timeout in seconds for the entire bundle, overwrites the store-specific and global timeout
+
+        Returns:
+            Mapping of the generic key to the parsed secret value. Filtered keys are mapped to None.
+
+        Raises:
+            SecretBundleError: If one or more secrets could not be retrieved
+        """
+        values = self._resolve(store, timeout=timeout)
+        return {k: v.get_secret_value() if v is not None else None for k, v in values.items()}
+
+    def to_model(self, store: AbstractSecretStore | None = None, timeout: float | None = None) -> M:
+        """
+        Retrieve all secrets and validate them against the bundle's model
+        """
+        if self.model is None:
+            raise ValueError("Bundle has not been created from a model, use SecretBundle.from_model")
+        return self.model.model_validate(self(store=store, timeout=timeout))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.secrets)
+
+    def __len__(self) -> int:
+        return len(self.secrets)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(self.secrets)})"
+
+    def _group(
+        self, store: AbstractSecretStore | None
+    ) -> dict[int, tuple[AbstractSecretStore, dict[str, list[Secret]]]]:
+        default_store = None
+        groups: dict[int, tuple[AbstractSecretStore, dict[str, list[Secret]]]] = {}
+        for secret in self.secrets.values():
+            target = store or secret.store or self.store
+            if target is None:
+                if default_store is None:
+                    default_store = get_default_store()
+                target = default_store
+            secret._last_used_store = target
+
+            if secret._filter_key(target.settings):
+                secret.value = None
+                continue
+
+            # several secrets may map to the same key of a store, each of them gets the fetched value
+            mapped_key = secret._get_mapped_key(target.settings)
+            groups.setdefault(id(target), (target, {}))[1].setdefault(mapped_key, []).append(secret)
+        return groups
+
+    def _fetch(
+        self, store: AbstractSecretStore, secrets: Mapping[str, list[Secret]], timeout: float | None = None
+    ) -> tuple[dict[str, SecretValue], dict[str, BaseException]]:
+        errors: dict[str, BaseException] = {}
+        store_errors: dict[str, BaseException] = {}
+        try:
+            values = store.get_many(list(secrets), timeout=timeout)
+        except SecretBundleError as e:
+            # the store failed for some keys only, the others are kept
+            values, store_errors = e.values, e.errors
+        except Exception as e:
+            logger.debug("Failed to get %s keys from %s: %s", len(secrets), store.__class__.__name__, e)
+            return {}, {secret.key: e for group in secrets.values() for secret in group}
+
+        for mapped_key, group in secrets.items():
+            if mapped_key not in values:
+                for secret in group:
+                    errors[secret.key] = store_errors.get(mapped_key) or SecretNotFoundError(
+                        f"Secret {mapped_key} was not found"
+                    )
+        return values, errors
+
+    def _resolve(
+        self, store: AbstractSecretStore | None = None, timeout: float | None = None
+    ) -> dict[str, SecretValue | None]:
+        groups = self._group(store)
+
+        # stores are queried concurrently, hence each store gets the full timeout
+        if len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(lambda group: self._fetch(*group, timeout=timeout), groups.values()))
+        else:
+            results = [self._fetch(*group, timeout=timeout) for group in groups.values()]
+
+        values: dict[str, SecretValue | None] = {}
+        errors: dict[str, BaseException] = {}
+        for (_, secrets), (group_values, group_errors) in zip(groups.values(), results):
+            errors.update(group_errors)
+            for mapped_key, group in secrets.items():
+                if mapped_key in group_values:
+                    for secret in group:
+                        secret.value = group_values[mapped_key]
+
+        # keep the declared order of the bundle
+        for key, secret in self.secrets.items():
+            if key not in errors:
+                values[key] = secret.value
+
+        self.values = values
+        if errors:
+            raise SecretBundleError(errors, values)
+        return values
+
+
+def prefetch(
+    secrets: SecretBundle | Iterable[str | Secret],
+    store: AbstractSecretStore | None = None,
+    timeout: float | None = None,
+    raise_errors: bool = True,
+) -> SecretBundle:
+    """
+    Warm up the cache by resolving many secrets concurrently, e.g. during application startup
+
+    In a pre-fork server, prefetch in the master process before forking the workers. The workers inherit the cache
+    copy-on-write and are served from it without any request to the store until the entries expire. Clients of the
+    master are not inherited, a worker creates its own clients once it has to access the store.
+
+    Args:
+        secrets: A bundle or keys/Secrets to prefetch
+        store: Overwrites the global default store for secrets that do not define their own store. Defaults to None.
+        timeout: Timeout in seconds for the entire prefetch. Defaults to None.
+        raise_errors: Whether to raise if a secret could not be retrieved, otherwise errors are logged.
+            Defaults to True.
+
+    Returns:
+        The resolved bundle, its `values` hold the retrieved SecretValues
+
+    Raises:
+        SecretBundleError: If one or more secrets could not be retrieved and `raise_errors` is True
+    """
+    bundle = secrets if isinstance(secrets, SecretBundle) else SecretBundle(secrets, store=store)
+    logger.info("Prefetching %s secrets", len(bundle))
+    try:
+        bundle._resolve(store, timeout=timeout)
+    except SecretBundleError as e:
+        if raise_errors:
+            raise
+        logger.warning("Prefetching secrets failed partially: %s", e)
+    return bundle
@@ -3,8 +3,10 @@ import logging
 import threading
 import time
 from collections import OrderedDict
+from collections.abc import Iterable, Mapping
 from typing import Generic, TypeVar
 
+from secretmanager.fork import register_at_fork
 from secretmanager.settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -13,72 +15,156 @@ T = TypeVar("T")
 
 
 class CacheEntry(Generic[T]):
+    __slots__ = ("value", "timestamp", "referenced")
+
     def __init__(self, value: T, timestamp: float):
         self.value = value
         self.timestamp = timestamp
+        # whether the entry was hit since eviction last passed it, new entries count as recently used
+        self.referenced = True
 
 
 class Singleton(type):
     _instances = dict()
+    _lock = threading.Lock()
 
     def __call__(cls, /, **kwargs):
         unique_key = (cls.__name__, *kwargs.values())
-        if unique_key not in cls._instances:
-            cls._instances[unique_key] = super().__call__(**kwargs)
-        return cls._instances[unique_key]
+        if (instance := cls._instances.get(unique_key)) is None:
+            with Singleton._lock:
+                if (instance := cls._instances.get(unique_key)) is None:
+                    instance = cls._instances[unique_key] = super().__call__(**kwargs)
+        return instance
 
 
 class LRUCache(metaclass=Singleton):
-    def __init__(self, /, max_size: int, expires_in: int):
+    """
+    A thread-safe cache which evicts the least recently used entries
+
+    Lookups do not take the lock, such that hits scale across threads, also without the GIL.
+    Instead of reordering entries on every hit, a hit only marks the entry as referenced. On eviction,
+    referenced entries get a second chance and are moved to the end, which approximates LRU order.
+    The `generation` changes whenever values are invalidated, i.e. replaced by a different value or removed,
+    such that values derived from the cache can tell whether they are still current.
+    """
+
+    def __init__(self, /, max_size: int, expires_in: int, max_staleness: int = 0):
         self.lock = threading.Lock()
-        self.cache: OrderedDict[str, CacheEntry[str | None]] = OrderedDict()
+        self.cache: OrderedDict[bytes, CacheEntry[str | None]] = OrderedDict()
         self.max_cache_size = max_size
         self.expires_in = expires_in
+        self.max_staleness = max_staleness
+        self.generation = 0
 
-    def _hash_key(self, key: str) -> str:
-        return hashlib.sha256((key).encode()).hexdigest()
+    def _hash_key(self, key: str) -> bytes:
+        # keys are not retained in plain text, a 16 byte digest is compact and collisions are negligible
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
 
     def get(self, key: str):
-        with self.lock:
-            current_time = time.time()
-            hashed_key = self._hash_key(key)
-
-            if hashed_key in self.cache:
-                entry = self.cache[hashed_key]
-                if current_time - entry.timestamp <= self.expires_in:
-                    logger.debug("Cache hit for key %s (%s)", key, hashed_key)
-                    self.cache.move_to_end(hashed_key)  # update last_accessed
-                    return entry.value
-                logger.debug("Cache expired for key %s (%s)", key, hashed_key)
-                self.cache.pop(hashed_key)  # delete if expired
+        hashed_key = self._hash_key(key)
+        # a single read of the dict, entries are replaced but never modified apart from their reference bit
+        if (entry := self.cache.get(hashed_key)) is None:
+            return None
+
+        age = time.time() - entry.timestamp
+        if age <= self.expires_in:
+            logger.debug("Cache hit for key %s", key)
+            if not entry.referenced:
+                entry.referenced = True
+            return entry.value
+        logger.debug("Cache expired for key %s", key)
+        if age > self.expires_in + self.max_staleness:
+            # delete if expired and too stale to be served on errors, unless it has been replaced in the meantime
+            with self.lock:
+                if self.cache.get(hashed_key) is entry:
+                    del self.cache[hashed_key]
+        return None
+
+    def get_stale(self, key: str, max_staleness: float | None = None):
+        """
+        Get a value even if it is expired, as long as it did not expire more than `max_staleness` seconds ago.
+
+        Expired entries are only retained for the cache's `max_staleness`, which therefore limits `max_staleness`.
+        """
+        max_staleness = self.max_staleness if max_staleness is None else max_staleness
+        if (entry := self.cache.get(self._hash_key(key))) is None:
+            return None
+        if time.time() - entry.timestamp <= self.expires_in + max_staleness:
+            logger.debug("Stale cache hit for key %s", key)
+            return entry.value
+        return None
 
     def put(self, key: str, value: str | None):
-        with self.lock:
-            current_time = time.time()
-            hashed_key = self._hash_key(key)
+        self.put_many({key: value})
 
-            logger.debug("Putting key %s (%s) into cache", key, hashed_key)
-            # update entry and move to end
-            self.cache[hashed_key] = CacheEntry(value, current_time)
-            self.cache.move_to_end(hashed_key)
-
-            # if length exceeded, pop least accessed item
-            if len(self.cache) > self.max_cache_size:
-                self.cache.popitem(last=False)
+    def put_many(self, values: Mapping[str, str | None]):
+        """Put multiple values into the cache, taking the lock only once."""
+        timestamp = time.time()
+        entries = [(self._hash_key(key), CacheEntry(value, timestamp)) for key, value in values.items()]
+        with self.lock:
+            logger.debug("Putting %s keys into cache", len(entries))
+            for hashed_key, entry in entries:
+                if (previous := self.cache.get(hashed_key)) is not None and previous.value != entry.value:
+                    self.generation += 1
+                # update entry and move to end
+                self.cache[hashed_key] = entry
+                self.cache.move_to_end(hashed_key)
+
+            # if length exceeded, evict the oldest entry which was not hit since eviction last passed it
+            while len(self.cache) > self.max_cache_size:
+                oldest, candidate = self.cache.popitem(last=False)
+                if candidate.referenced:
+                    candidate.referenced = False
+                    self.cache[oldest] = candidate
 
     def clear(self):
         """Clears the entire cache."""
         with self.lock:
             logger.debug("Clearing cache with %s cached items", len(self.cache))
             self.cache.clear()
+            self.generation += 1
 
     def remove(self, key):
         """Remove a specific key from the cache."""
+        self.remove_many([key])
+
+    def remove_many(self, keys: Iterable[str]):
+        """Remove multiple keys from the cache, taking the lock only once."""
+        hashed_keys = {key: self._hash_key(key) for key in keys}
         with self.lock:
-            hashed_key = self._hash_key(key)
-            if hashed_key in self.cache:
-                logger.debug("Deleting item %s (%s) from cache", key, hashed_key)
-                del self.cache[hashed_key]
+            for key, hashed_key in hashed_keys.items():
+                if self.cache.pop(hashed_key, None) is not None:
+                    logger.debug("Deleting item %s from cache", key)
+                    self.generation += 1
+
+
+def _caches() -> list[LRUCache]:
+    return [instance for instance in Singleton._instances.values() if isinstance(instance, LRUCache)]
+
+
+def _acquire_locks() -> None:
+    # a lock held by another thread at fork time would never be released in the child
+    Singleton._lock.acquire()
+    for cache in _caches():
+        cache.lock.acquire()
+
+
+def _release_locks() -> None:
+    for cache in _caches():
+        cache.lock.release()
+    Singleton._lock.release()
+
+
+def _reset_locks() -> None:
+    # the entries are consistent as no thread was writing at fork time, hence they are kept
+    Singleton._lock = threading.Lock()
+    for cache in _caches():
+        cache.lock = threading.Lock()
+
+
+register_at_fork(before=_acquire_locks, after_in_parent=_release_locks, after_in_child=_reset_locks)
 
 
-CACHE: LRUCache = LRUCache(max_size=Settings.cache.max_size, expires_in=Settings.cache.expires_in)
+CACHE: LRUCache = LRUCache(
+    max_size=Settings.cache.max_size, expires_in=Settings.cache.expires_in, max_staleness=Settings.cache.max_staleness
+)
@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from enum import Enum
+from typing import TypeVar
+
+from secretmanager.error import CircuitOpenError
+from secretmanager.fork import register_at_fork
+from secretmanager.settings import CircuitBreakerSettings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitMetrics:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.transitions: dict[CircuitState, int] = dict.fromkeys(CircuitState, 0)
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "short_circuits": self.short_circuits,
+            **{f"transitions_{state.value}": count for state, count in self.transitions.items()},
+        }
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker which short-circuits calls to a failing backend
+
+    The circuit opens after `failure_threshold` consecutive failures. While open, calls fail immediately with a
+    CircuitOpenError. After `reset_timeout` seconds a single trial call is let through (half-open), which either
+    closes the circuit on success or opens it again on failure.
+    """
+
+    def __init__(self, name: str, settings: CircuitBreakerSettings) -> None:
+        self.name = name
+        self.settings = settings
+        self.metrics = CircuitMetrics()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.settings.reset_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+        log = logger.warning if state == CircuitState.OPEN else logger.info
+        log("Circuit breaker %s changed from %s to %s", self.name, self._state.value, state.value)
+        self._state = state
+        self.metrics.transitions[state] += 1
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            self.metrics.calls += 1
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return True
+            if state == CircuitState.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.metrics.short_circuits += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.metrics.successes += 1
+            self._trial_running = False
+            # only consecutive failures open the circuit
+            self._failures = 0
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.metrics.failures += 1
+            self._trial_running = False
+            self._failures += 1
+            if self._state == CircuitState.HALF_OPEN or self._failures >= self.settings.failure_threshold:
+                self._transition(CircuitState.OPEN)
+
+    def call(
+        self, func: Callable[..., T], *args, is_failure: Callable[[Exception], bool] = lambda e: True, **kwargs
+    ) -> T:
+        """
+        Call a function through the circuit breaker
+
+        Args:
+            func: Function to call
+            args: Positional arguments passed to the function
+            is_failure: Predicate whether an exception counts as a backend failure, e.g. a missing secret does not.
+            kwargs: Keyword arguments passed to the function
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.settings.enabled:
+            return func(*args, **kwargs)
+
+        if not self._acquire():
+            raise CircuitOpenError(f"Circuit breaker {self.name} is open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, settings: CircuitBreakerSettings) -> CircuitBreaker:
+    """
+    Get the circuit breaker for a name. Breakers are shared by all store instances using the same name.
+    """
+    with _breakers_lock:
+        if (breaker := _breakers.get(name)) is None:
+            breaker = _breakers[name] = CircuitBreaker(name, settings)
+        breaker.settings = settings
+        return breaker
+
+
+def _reset_locks() -> None:
+    # locks and trial calls of other threads at fork time are not carried over to a forked child
+    global _breakers_lock
+    _breakers_lock = threading.Lock()
+    for breaker in _breakers.values():
+        breaker._lock = threading.Lock()
+        breaker._trial_running = False
+
+
+register_at_fork(after_in_child=_reset_locks)
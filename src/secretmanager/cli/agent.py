@@ -0,0 +1,21 @@
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+app = typer.Typer(name="agent", pretty_exceptions_enable=False)
+
+
+@app.command("agent")
+def agent(
+    socket: Annotated[
+        Path | None, typer.Option(help="Path of the unix socket, defaults to a new private temporary directory")
+    ] = None,
+    daemon: Annotated[bool, typer.Option(help="Whether to detach into the background")] = False,
+):
+    """
+    Run an agent which serves secrets of the default store over a unix socket
+    """
+    from secretmanager.agent import serve
+
+    serve(socket, daemon=daemon)
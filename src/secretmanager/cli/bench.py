@@ -0,0 +1,51 @@
+import json
+import sys
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+app = typer.Typer(name="bench", pretty_exceptions_enable=False)
+
+
+@app.command("bench")
+def bench(
+    names: Annotated[list[str] | None, typer.Argument(help="Benchmarks to run, defaults to all")] = None,
+    repeat: Annotated[int, typer.Option(min=1, help="Number of repetitions of each benchmark")] = 5,
+    size: Annotated[int, typer.Option(min=1, help="Number of secrets used by each benchmark")] = 100,
+    output: Annotated[Path | None, typer.Option(help="Write the JSON report to a file instead of stdout")] = None,
+    baseline: Annotated[
+        Path | None, typer.Option(help="JSON report of a previous run to compare the median timings against")
+    ] = None,
+    max_ratio: Annotated[
+        float | None, typer.Option(help="Exit with an error if a median is slower than the baseline by this factor")
+    ] = None,
+):
+    """
+    Run benchmarks and print a machine-readable JSON report
+    """
+    from secretmanager.bench import BENCHMARKS, compare, run_benchmarks
+
+    unknown = sorted(set(names or []) - set(BENCHMARKS))
+    if unknown:
+        raise typer.BadParameter(f"Unknown benchmark(s) {', '.join(unknown)}, choose from {', '.join(BENCHMARKS)}")
+
+    report = run_benchmarks(names or None, repeat=repeat, size=size)
+    regressions = []
+    if baseline is not None:
+        report["comparison"] = compare(json.loads(baseline.read_text()), report)
+        if max_ratio is not None:
+            regressions = [c for c in report["comparison"] if c["ratio"] > max_ratio]
+
+    text = json.dumps(report, indent=2)
+    if output is not None:
+        output.write_text(text + "\n")
+    else:
+        print(text)
+
+    for regression in regressions:
+        print(
+            f"Regression: {regression['name']} is {regression['ratio']:.2f}x slower than the baseline", file=sys.stderr
+        )
+    if regressions:
+        raise typer.Exit(code=1)
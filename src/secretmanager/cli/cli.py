@@ -1,11 +1,10 @@
+import importlib
 import logging
 from enum import Enum
 
+import click
 import typer
-
-from secretmanager.cli.secret import app as secret_app
-from secretmanager.cli.settings import app as settings_app
-from secretmanager.cli.stores import app as stores_app
+from typer.core import TyperGroup
 
 
 class Verbosity(str, Enum):
@@ -19,10 +18,55 @@ class Verbosity(str, Enum):
     NOTSET = "NOTSET"
 
 
-app = typer.Typer(pretty_exceptions_enable=False, context_settings={"max_content_width": 500})
-app.add_typer(secret_app)
-app.add_typer(settings_app)
-app.add_typer(stores_app)
+# subcommands are only imported when they are invoked to keep the start-up of the CLI fast
+# name: (module path of the typer app, short help)
+LAZY_SUBCOMMANDS: dict[str, tuple[str, str]] = {
+    "agent": ("secretmanager.cli.agent:app", "Run an agent which serves secrets over a unix socket"),
+    "bench": ("secretmanager.cli.bench:app", "Run benchmarks and print a machine-readable report"),
+    "secret": ("secretmanager.cli.secret:app", "Get and list secrets"),
+    "settings": ("secretmanager.cli.settings:app", "View settings"),
+    "stores": ("secretmanager.cli.stores:app", "View available stores"),
+    "sync": ("secretmanager.cli.sync:app", "Replicate secrets from one store to another"),
+    "exec": ("secretmanager.cli.exec:app", "Resolve secrets and execute a command with them in its environment"),
+}
+
+
+class LazyTyperGroup(TyperGroup):
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return [*super().list_commands(ctx), *LAZY_SUBCOMMANDS]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name not in LAZY_SUBCOMMANDS:
+            return super().get_command(ctx, cmd_name)
+
+        module_name, _, attr = LAZY_SUBCOMMANDS[cmd_name][0].partition(":")
+        sub_app: typer.Typer = getattr(importlib.import_module(module_name), attr)
+        # an app consisting of a single command with the same name is a command instead of a group
+        commands = sub_app.registered_commands
+        if not sub_app.registered_groups and len(commands) == 1 and commands[0].name == cmd_name:
+            command = typer.main.get_command(sub_app)
+        else:
+            command = typer.main.get_group(sub_app)
+        command.name = cmd_name
+        return command
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        # use the static help of lazy subcommands, otherwise --help would import all of them
+        rows = [(name, help_text) for name, (_, help_text) in LAZY_SUBCOMMANDS.items()]
+        for name in super().list_commands(ctx):
+            command = super().get_command(ctx, name)
+            if command is not None and not command.hidden:
+                rows.append((name, command.get_short_help_str()))
+        with formatter.section("Commands"):
+            formatter.write_dl(sorted(rows))
+
+
+app = typer.Typer(
+    cls=LazyTyperGroup,
+    rich_markup_mode=None,
+    pretty_exceptions_enable=False,
+    context_settings={"max_content_width": 500},
+)
 
 
 @app.callback()
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from pydantic import JsonValue
+
+from secretmanager.bundle import SecretBundle
+from secretmanager.error import SecretBundleError
+
+app = typer.Typer(name="exec", pretty_exceptions_enable=False)
+
+
+def parse_mapping(entries: list[str]) -> dict[str, str]:
+    """
+    Parse entries of the form `ENV_VAR=secret_key` or `KEY` into a mapping of environment variable to secret key
+    """
+    mapping: dict[str, str] = {}
+    for entry in entries:
+        entry = entry.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        name, sep, key = entry.partition("=")
+        name, key = name.strip(), key.strip()
+        if name.startswith("export "):
+            name = name[len("export ") :].strip()
+        mapping[name] = key if sep and key else name
+    return mapping
+
+
+def read_mapping_file(file: Path) -> dict[str, str]:
+    """
+    Read a mapping file, either a JSON object or dotenv-style lines of `ENV_VAR=secret_key`
+    """
+    content = file.read_text()
+    if file.suffix == ".json":
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError(f"{file} must contain a JSON object mapping environment variables to secret keys")
+        return {str(k): str(v) for k, v in data.items()}
+    return parse_mapping(content.splitlines())
+
+
+def to_environ_value(value: JsonValue) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"))
+
+
+def resolve_environ(mapping: dict[str, str], timeout: float | None = None) -> dict[str, str]:
+    """
+    Resolve all secrets of a mapping of environment variable to secret key concurrently
+    """
+    values = SecretBundle(mapping.values())(timeout=timeout)
+    return {name: to_environ_value(values[key]) for name, key in mapping.items() if values[key] is not None}
+
+
+@app.command("exec", context_settings={"ignore_unknown_options": True})
+def exec_command(
+    command: Annotated[list[str], typer.Argument(help="Command to execute, separate its options with --")],
+    key: Annotated[
+        list[str] | None,
+        typer.Option("--key", "-k", help="Secret to expose, either KEY or ENV_VAR=KEY. Can be repeated."),
+    ] = None,
+    file: Annotated[
+        Path | None,
+        typer.Option("--file", "-f", exists=True, dir_okay=False, help="File of ENV_VAR=KEY lines or a JSON object"),
+    ] = None,
+    override: Annotated[bool, typer.Option(help="Whether secrets overwrite existing environment variables")] = True,
+    timeout: Annotated[float | None, typer.Option(help="Timeout in seconds for resolving all secrets")] = None,
+):
+    """
+    Resolve secrets and execute a command with them in its environment
+    """
+    mapping = read_mapping_file(file) if file is not None else {}
+    mapping |= parse_mapping(key or [])
+    if not mapping:
+        raise typer.BadParameter("No secrets given, use --key or --file", param_hint="--key")
+
+    try:
+        secrets = resolve_environ(mapping, timeout=timeout)
+    except SecretBundleError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=1)
+
+    env = dict(os.environ)
+    env |= secrets if override else {k: v for k, v in secrets.items() if k not in env}
+
+    # flush before the process image is replaced, there is no shell or child process in between
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        os.execvpe(command[0], command, env)
+    except OSError as e:
+        print(f"Error: failed to execute {command[0]}: {e}", file=sys.stderr)
+        raise typer.Exit(code=127)
@@ -1,14 +1,107 @@
+import json
+import sys
+from enum import Enum
+from typing import Annotated
+
 import typer
-from rich import print
+from pydantic import JsonValue
 
-from secretmanager.secret import Secret
+from secretmanager.bundle import SecretBundle
+from secretmanager.error import SecretBundleError
+from secretmanager.registry import get_default_store, get_store
+from secretmanager.store import AbstractSecretStore
 
 app = typer.Typer(name="secret", pretty_exceptions_enable=False)
 
 
+class OutputFormat(str, Enum):
+    PLAIN = "plain"
+    JSON = "json"
+    DOTENV = "dotenv"
+
+
+def _get_store(store: str | None) -> AbstractSecretStore:
+    if store is None:
+        return get_default_store()
+    return get_store(store.upper())
+
+
+def _to_plain(value: JsonValue) -> str:
+    return value if isinstance(value, str) else json.dumps(value, separators=(",", ":"))
+
+
+def format_line(output_format: OutputFormat, key: str, value: JsonValue = None, with_value: bool = True) -> str:
+    """
+    Format a single secret as one line of output
+    """
+    if output_format == OutputFormat.JSON:
+        data: dict[str, JsonValue] = {"key": key}
+        if with_value:
+            data["value"] = value
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    if output_format == OutputFormat.DOTENV:
+        return f"{key}={json.dumps(_to_plain(value), ensure_ascii=False)}" if with_value else key
+    if with_value:
+        return f"{key}\t{_to_plain(value)}"
+    return key
+
+
+def _write(line: str) -> None:
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
 @app.command()
-def get(key: str):
+def get(
+    keys: Annotated[list[str], typer.Argument(help="Keys to retrieve, use - to read keys from stdin")],
+    output_format: Annotated[OutputFormat, typer.Option("--format", help="Output format")] = OutputFormat.PLAIN,
+    store: Annotated[str | None, typer.Option(help="Store to use instead of the default store")] = None,
+    timeout: Annotated[float | None, typer.Option(help="Timeout in seconds for retrieving all secrets")] = None,
+):
+    """
+    Get one or more secrets from manager. A single key in plain format prints only the value.
+    """
+    if keys == ["-"]:
+        keys = [line.strip() for line in sys.stdin if line.strip()]
+
+    bundle = SecretBundle(keys, store=_get_store(store) if store else None)
+    try:
+        values = bundle(timeout=timeout)
+    except SecretBundleError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        values = {k: v.get_secret_value() if v is not None else None for k, v in e.values.items()}
+        exit_code = 1
+    else:
+        exit_code = 0
+
+    if len(keys) == 1 and output_format == OutputFormat.PLAIN:
+        if keys[0] in values:
+            _write(_to_plain(values[keys[0]]))
+    else:
+        for key in keys:
+            if key in values:
+                _write(format_line(output_format, key, values[key]))
+
+    if exit_code:
+        raise typer.Exit(code=exit_code)
+
+
+@app.command("list")
+def secret_list(
+    values: Annotated[bool, typer.Option("--values/--keys-only", help="Whether to include the values")] = False,
+    output_format: Annotated[OutputFormat, typer.Option("--format", help="Output format")] = OutputFormat.PLAIN,
+    store: Annotated[str | None, typer.Option(help="Store to use instead of the default store")] = None,
+    batch_size: Annotated[int, typer.Option(min=1, help="Number of secrets fetched per batch")] = 100,
+    concurrency: Annotated[int, typer.Option(min=1, help="Maximum number of batches fetched concurrently")] = 4,
+):
     """
-    Get secret from manager
+    Stream keys and optionally values of all secrets in a store
     """
-    print(Secret(key)())
+    secret_store = _get_store(store)
+    if not values:
+        for key in secret_store.iter_secret_keys():
+            _write(format_line(output_format, key, with_value=False))
+        return
+
+    for key, value in secret_store.iter_secrets(batch_size=batch_size, max_workers=concurrency):
+        _write(format_line(output_format, key, value.get_secret_value()))
@@ -3,18 +3,13 @@ from enum import Enum
 from typing import Annotated
 
 import typer
-import yaml
 from pydantic import BaseModel, JsonValue
 from pydantic.fields import FieldInfo
 from pydantic_core import PydanticUndefined
-from rich import print
-from rich.console import Console
-from rich.table import Table
 
 from secretmanager.settings import Settings
 
 app = typer.Typer(name="settings", pretty_exceptions_enable=False)
-console = Console()
 
 
 class FormatChoice(str, Enum):
@@ -55,6 +50,9 @@ def setting_list(
 ):
     """View settings"""
     if format_style == FormatChoice.PLAIN:
+        from rich.console import Console
+        from rich.table import Table
+
         elems = list(get_elements(Settings, key="SM"))
         cols = ["ENVIRONMENT VARIABLE", "VALUE", "DEFAULT", "TYPE", "DESCRIPTION"]
         table = Table("Environment Variable", "Value", "Default", "Type", "Description")
@@ -62,10 +60,12 @@ def setting_list(
             if exclude_unset and elem["VALUE"] == format(elem["DEFAULT"]):
                 continue
             table.add_row(*[format(elem[c]) for c in cols])
-        console.print(table)
+        Console().print(table)
     elif format_style == FormatChoice.JSON:
         indent = 2 if pretty else None
         print(json.dumps(Settings.model_dump(exclude_unset=exclude_unset), indent=indent))
     elif format_style == FormatChoice.YAML:
+        import yaml
+
         indent = 2 if pretty else None
         print(yaml.dump(Settings.model_dump(exclude_unset=exclude_unset), indent=indent, sort_keys=False))
@@ -1,18 +1,28 @@
 import typer
-from rich.console import Console
-from rich.table import Table
 
-from secretmanager.registry import _known_implementations, registry
+from secretmanager.registry import _known_implementations, is_available
 
 app = typer.Typer(name="stores", pretty_exceptions_enable=False)
-console = Console()
 
 
 @app.command("list")
-def store_list(available_only: bool = False):
+def store_list(available_only: bool = False, plain: bool = False):
     """List available stores"""
+    rows = [
+        (k, format(is_available(k)), v["dependency"])
+        for k, v in _known_implementations.items()
+        if is_available(k) or not available_only
+    ]
+    if plain:
+        for row in rows:
+            print("\t".join(row))
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
     table = Table("Store name", "Available", "Dependency")
-    for k, v in _known_implementations.items():
-        table.add_row(k, format(k in registry), v["dependency"])
+    for row in rows:
+        table.add_row(*row)
 
-    console.print(table)
+    Console().print(table)
@@ -0,0 +1,86 @@
+import sys
+from collections import Counter
+from typing import Annotated
+
+import typer
+
+from secretmanager.registry import get_store
+from secretmanager.settings import StoreSettings
+from secretmanager.sync import SyncAction, sync
+
+app = typer.Typer(name="sync", pretty_exceptions_enable=False)
+
+
+def parse_rename(entries: list[str]) -> dict[str, str]:
+    """
+    Parse entries of the form `SOURCE_KEY=TARGET_KEY` into a mapping of source key to target key
+    """
+    mapping: dict[str, str] = {}
+    for entry in entries:
+        key, sep, target_key = entry.partition("=")
+        if not sep or not key.strip() or not target_key.strip():
+            raise typer.BadParameter(f"Expected SOURCE_KEY=TARGET_KEY, got {entry}", param_hint="--map")
+        mapping[key.strip()] = target_key.strip()
+    return mapping
+
+
+@app.command("sync")
+def sync_command(
+    source: Annotated[str, typer.Argument(help="Store to read the secrets from")],
+    target: Annotated[str, typer.Argument(help="Store to write the secrets to")],
+    key: Annotated[
+        list[str] | None, typer.Option("--key", "-k", help="Key of the source to sync. Can be repeated.")
+    ] = None,
+    source_prefix: Annotated[
+        str, typer.Option(help="Only sync keys of the source with this prefix, it is removed from the key")
+    ] = "",
+    prefix: Annotated[str, typer.Option(help="Prefix to prepend to the keys in the target")] = "",
+    suffix: Annotated[str, typer.Option(help="Suffix to append to the keys in the target")] = "",
+    rename: Annotated[
+        list[str] | None, typer.Option("--map", help="Rename a key, SOURCE_KEY=TARGET_KEY. Can be repeated.")
+    ] = None,
+    exclude: Annotated[list[str] | None, typer.Option("--exclude", help="Key to skip. Can be repeated.")] = None,
+    dry_run: Annotated[bool, typer.Option("--dry-run", help="Only show the changes without writing them")] = False,
+    batch_size: Annotated[int, typer.Option(min=1, help="Number of secrets compared and written per batch")] = 100,
+    concurrency: Annotated[int, typer.Option(min=1, help="Maximum number of batches processed concurrently")] = 4,
+    timeout: Annotated[
+        float | None, typer.Option(help="Timeout in seconds for reading a batch from the target")
+    ] = None,
+):
+    """
+    Replicate secrets from one store to another, only changed secrets are written
+    """
+    settings = StoreSettings(prefix=prefix, suffix=suffix, mapping=parse_rename(rename or []), filter_key=exclude or [])
+    try:
+        changes = sync(
+            get_store(source.upper()),
+            get_store(target.upper()),
+            keys=key or None,
+            settings=settings,
+            source_prefix=source_prefix,
+            dry_run=dry_run,
+            batch_size=batch_size,
+            max_workers=concurrency,
+            timeout=timeout,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=1)
+
+    counts: Counter[str] = Counter()
+    for change in changes:
+        if change.error is not None:
+            counts["failed"] += 1
+            print(f"Error: failed to {change.action.value} {change.target_key}: {change.error}", file=sys.stderr)
+            continue
+        counts[change.action.value] += 1
+        if change.action != SyncAction.UNCHANGED:
+            target_key = (
+                change.target_key if change.target_key == change.key else f"{change.key} -> {change.target_key}"
+            )
+            print(f"{change.action.value}\t{target_key}", flush=True)
+
+    summary = ", ".join(f"{counts[action]} {action}" for action in ("add", "update", "unchanged", "failed"))
+    print(f"{summary}{' (dry run)' if dry_run else ''}", file=sys.stderr)
+    if counts["failed"]:
+        raise typer.Exit(code=1)
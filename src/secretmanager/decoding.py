@@ -0,0 +1,101 @@
+import re
+from functools import lru_cache
+from typing import Any
+
+from pydantic import JsonValue, TypeAdapter, ValidationError
+
+from secretmanager.value import SecretValue
+
+JSON_VALUE = TypeAdapter[JsonValue](JsonValue)
+
+# characters a JSON document may start with, besides numbers and the literals true, false and null
+_JSON_START = frozenset('{["')
+_NUMBER_START = frozenset("-0123456789")
+_JSON_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+_JSON_LITERALS = frozenset({"true", "false", "null"})
+_WHITESPACE = " \t\n\r"
+
+_UNDECODED: Any = object()
+
+
+@lru_cache(maxsize=256)
+def get_adapter(type_: Any) -> TypeAdapter:
+    """
+    Get the compiled TypeAdapter of a type, adapters are built once per type
+    """
+    return TypeAdapter(type_)
+
+
+def looks_like_json(raw: str) -> bool:
+    """
+    Whether a raw value may be a JSON document, judged by its first character
+
+    Values starting like a number, e.g. PEM keys or hex tokens, must be a JSON number as a whole.
+    """
+    if not raw:
+        return False
+    first = raw[0]
+    if first in _WHITESPACE:
+        raw = raw.strip()
+        if not raw:
+            return False
+        first = raw[0]
+    if first in _JSON_START:
+        return True
+    if first in _NUMBER_START:
+        return _JSON_NUMBER.fullmatch(raw.strip()) is not None
+    return first in "tfn" and raw.rstrip() in _JSON_LITERALS
+
+
+def decode(raw: str, adapter: TypeAdapter = JSON_VALUE) -> Any:
+    """
+    Decode a raw value, JSON documents are parsed and plain text such as passwords or tokens is used as is
+
+    Args:
+        raw: Raw value of the store
+        adapter: Type of the value. Defaults to any JSON value.
+
+    Raises:
+        ValidationError: If the value does not match the type of the adapter
+    """
+    if not looks_like_json(raw):
+        return raw if adapter is JSON_VALUE else adapter.validate_python(raw)
+    try:
+        return adapter.validate_json(raw)
+    except ValidationError:
+        # plain text which only looks like JSON, e.g. a value starting with a bracket
+        return adapter.validate_python(raw)
+
+
+class LazySecretValue(SecretValue):
+    """
+    A secret value which keeps the raw value and only decodes it on first access
+    """
+
+    __slots__ = ("_raw", "_adapter")
+
+    def __init__(self, raw: str, adapter: TypeAdapter = JSON_VALUE) -> None:
+        self._secret_value = _UNDECODED
+        self._raw = raw
+        self._adapter = adapter
+
+    def get_secret_value(self) -> JsonValue:
+        if self._secret_value is _UNDECODED:
+            self._secret_value = decode(self._raw, self._adapter)
+        return self._secret_value
+
+    @property
+    def decoded(self) -> bool:
+        return self._secret_value is not _UNDECODED
+
+
+def decode_as(value: SecretValue, type_: Any) -> Any:
+    """
+    Get the value of a secret as the given type, e.g. a pydantic model
+
+    Lazy values are decoded from their raw value directly, without decoding them as generic JSON first.
+    """
+    adapter = get_adapter(type_)
+    if isinstance(value, LazySecretValue) and not value.decoded:
+        return decode(value._raw, adapter)
+    return adapter.validate_python(value.get_secret_value())
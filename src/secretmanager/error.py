@@ -8,3 +8,23 @@ class SecretNotFoundError(BaseSecretError):
 
 class SecretAlreadyExistsError(BaseSecretError):
     pass
+
+
+class SecretTimeoutError(BaseSecretError, TimeoutError):
+    pass
+
+
+class CircuitOpenError(BaseSecretError):
+    pass
+
+
+class SecretDecryptionError(BaseSecretError):
+    pass
+
+
+class SecretBundleError(BaseSecretError):
+    def __init__(self, errors: dict[str, BaseException], values: dict[str, object] | None = None) -> None:
+        self.errors = errors
+        self.values = values or {}
+        details = ", ".join(f"{key} ({error.__class__.__name__}: {error})" for key, error in errors.items())
+        super().__init__(f"Failed to retrieve {len(errors)} secret(s): {details}")
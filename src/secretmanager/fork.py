@@ -0,0 +1,89 @@
+import os
+import threading
+import weakref
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def register_at_fork(
+    *,
+    before: Callable[[], None] | None = None,
+    after_in_parent: Callable[[], None] | None = None,
+    after_in_child: Callable[[], None] | None = None,
+) -> None:
+    """
+    Register handlers which are called around `os.fork`, does nothing on platforms without fork
+    """
+    if not hasattr(os, "register_at_fork"):
+        return
+    handlers = {"before": before, "after_in_parent": after_in_parent, "after_in_child": after_in_child}
+    os.register_at_fork(**{name: handler for name, handler in handlers.items() if handler is not None})
+
+
+class ClientPool(Generic[K, V]):
+    """
+    Clients shared by all stores of the process, a client is created once per key
+
+    Connections must not be shared with a forked child, hence the pool of a child starts empty and the child
+    creates its own clients on use. Stores look up their client on use instead of keeping a reference to it.
+    """
+
+    def __init__(self, on_fork: Callable[[V], None] | None = None) -> None:
+        """
+        Constructor
+
+        Args:
+            on_fork: Called in a forked child with every client of the parent, e.g. to close inherited sockets.
+                Defaults to None.
+        """
+        self._clients: dict[K, V] = {}
+        self._lock = threading.Lock()
+        self._on_fork = on_fork
+        pool = weakref.ref(self)
+
+        def reset() -> None:
+            if (alive := pool()) is not None:
+                alive._after_fork()
+
+        register_at_fork(after_in_child=reset)
+
+    def get(self, key: K, create: Callable[[], V]) -> V:
+        """
+        Get the client of a key, `create` is only called if there is no client yet
+        """
+        if (client := self._clients.get(key)) is not None:
+            return client
+        with self._lock:
+            if (client := self._clients.get(key)) is None:
+                client = self._clients[key] = create()
+            return client
+
+    def values(self) -> list[V]:
+        return list(self._clients.values())
+
+    def clear(self) -> list[V]:
+        """
+        Remove all clients from the pool
+
+        Returns:
+            The removed clients
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        return clients
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _after_fork(self) -> None:
+        # the lock may have been held by another thread of the parent at fork time
+        self._lock = threading.Lock()
+        clients = list(self._clients.values())
+        self._clients.clear()
+        if self._on_fork is not None:
+            for client in clients:
+                self._on_fork(client)
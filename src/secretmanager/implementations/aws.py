@@ -1,17 +1,64 @@
 import logging
-from typing import Any, Literal
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal, TypeVar
 
 import botocore
 import botocore.session
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError, ConnectTimeoutError, ReadTimeoutError
 from pydantic import JsonValue
 
-from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError
+from secretmanager import tracing
+from secretmanager.circuit import get_circuit_breaker
+from secretmanager.error import CircuitOpenError, SecretAlreadyExistsError, SecretNotFoundError, SecretTimeoutError
+from secretmanager.fork import register_at_fork
 from secretmanager.settings import AWSSettings, Settings
-from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+from secretmanager.store import AbstractSecretStore, Deadline, SecretValue, StoreCapabilities
+from secretmanager.watch import SnapshotDiff, Watch, WatchCallback
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# maximum number of secrets that can be retrieved in a single BatchGetSecretValue call
+BATCH_SIZE = 20
+# timeouts of clients in seconds, a timeout is rounded down to a bucket to bound the number of clients per store
+_TIMEOUT_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 15, 30, 60, 120, 300)
+# error codes of requests which were rejected because the request rate of the account was exceeded
+_THROTTLING_CODES = {"ThrottlingException", "TooManyRequestsException"}
+
+
+def _is_backend_failure(error: Exception) -> bool:
+    # client errors such as a missing secret are not a failure of the backend, except for throttling
+    if isinstance(error, ClientError):
+        status_code = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 500)
+        return status_code >= 500 or error.response["Error"]["Code"] in _THROTTLING_CODES
+    return True
+
+
+def _bucket_timeout(timeout: float | None) -> float | None:
+    # the remaining time of a deadline differs on every call, hence it must not select a client on its own
+    if timeout is None:
+        return None
+    return max((bucket for bucket in _TIMEOUT_BUCKETS if bucket <= timeout), default=_TIMEOUT_BUCKETS[0])
+
+
+# botocore clients must not be shared with a forked child, hence the clients of all stores are dropped in the child
+_stores: "weakref.WeakValueDictionary[int, AWSSecretStore]" = weakref.WeakValueDictionary()
+
+
+def _reset_clients() -> None:
+    for store in list(_stores.values()):
+        store._clients = {}
+        store._clients_lock = threading.Lock()
+
+
+register_at_fork(after_in_child=_reset_clients)
+
 
 class AWSSecretStore(AbstractSecretStore[AWSSettings]):
     def __init__(
@@ -27,6 +74,12 @@ class AWSSecretStore(AbstractSecretStore[AWSSettings]):
         self._client_options = client_options or {}
         self._kms_key = kms_key
         self._deletion_policy = self._parse_deletion_policy(self.settings.deletion_policy)
+        self._clients: dict[float | None, Any] = {}
+        self._clients_lock = threading.Lock()
+        self._throttled_until = 0.0
+        _stores[id(self)] = self
+        region = self._client_options.get("region_name", "default")
+        self._breaker = get_circuit_breaker(f"{self.__class__.__name__}:{region}", self.settings.circuit_breaker)
 
     def _parse_deletion_policy(self, deletion_policy: Literal["force"] | int | None):
         if deletion_policy is None:
@@ -40,26 +93,111 @@ class AWSSecretStore(AbstractSecretStore[AWSSettings]):
         else:
             raise ValueError("Unknown value for deletion_policy parameter")
 
-    def _get_client(self):
-        session = botocore.session.get_session(**self._session_options)
-        client = session.create_client("secretsmanager", **self._client_options)
-        return client
+    def _get_client(self, timeout: float | None = None):
+        # clients are thread-safe and expensive to create, hence they are reused per timeout bucket
+        timeout = _bucket_timeout(timeout)
+        if (client := self._clients.get(timeout)) is not None:
+            return client
+        with self._clients_lock:
+            if (client := self._clients.get(timeout)) is None:
+                client_options = dict(self._client_options)
+                if timeout is not None:
+                    # a single attempt, otherwise retries would exceed the deadline, the connect and read
+                    # timeouts add up, hence each gets half of the timeout
+                    config = Config(
+                        connect_timeout=timeout / 2, read_timeout=timeout / 2, retries={"total_max_attempts": 1}
+                    )
+                    if (user_config := client_options.get("config")) is not None:
+                        config = user_config.merge(config)
+                    client_options["config"] = config
+                with tracing.span("aws.create_client"):
+                    session = botocore.session.get_session(**self._session_options)
+                    client = session.create_client("secretsmanager", **client_options)
+                self._clients[timeout] = client
+            return client
 
-    def get(self, key: str):
-        client = self._get_client()
+    def get(self, key: str, timeout: float | None = None):
         logger.info("Getting key %s from aws secretmanager", key)
 
         if cached_value := self._get_cache(key):
-            return SecretValue(self._deserialize(cached_value))
+            return self._to_secret_value(cached_value)
+
+        timeout = self._resolve_timeout(timeout)
+        client = self._get_client(timeout)
+        max_staleness = self.settings.circuit_breaker.max_staleness
         try:
-            value: str = client.get_secret_value(SecretId=key)["SecretString"]
+            with tracing.span("aws.get_secret_value"):
+                response = self._breaker.call(client.get_secret_value, SecretId=key, is_failure=_is_backend_failure)
+            value: str = response["SecretString"]
         except ClientError as e:
             if e.response["Error"]["Code"] == "ResourceNotFoundException":
                 raise SecretNotFoundError(f"Secret {key} was not found in AWS SecretManager") from e
+            elif _is_backend_failure(e):
+                return self._serve_stale(key, e, max_staleness=max_staleness)
             else:
                 raise e
+        except (ConnectTimeoutError, ReadTimeoutError) as e:
+            error = SecretTimeoutError(f"Getting secret {key} from AWS SecretManager timed out after {timeout}s")
+            error.__cause__ = e
+            return self._serve_stale(key, error, max_staleness=max_staleness)
+        except (BotoCoreError, CircuitOpenError) as e:
+            return self._serve_stale(key, e, max_staleness=max_staleness)
         self._put_cache(key, value)
-        return SecretValue(self._deserialize(value))
+        return self._to_secret_value(value)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        res: dict[str, SecretValue] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            if cached_value := self._get_cache(key):
+                res[key] = self._to_secret_value(cached_value)
+            else:
+                missing.append(key)
+
+        if not missing:
+            return res
+
+        timeout = self._resolve_timeout(timeout)
+        deadline = Deadline(timeout)
+        max_staleness = self.settings.circuit_breaker.max_staleness
+        failures: dict[str, Exception] = {}
+        errors: dict[str, Exception] = {}
+        for i in range(0, len(missing), BATCH_SIZE):
+            batch = missing[i : i + BATCH_SIZE]
+            logger.info("Getting %s keys from aws secretmanager", len(batch))
+            try:
+                # each batch is bound by the time left of the deadline
+                client = self._get_client(deadline.remaining())
+                with tracing.span("aws.batch_get_secret_value", keys=len(batch)):
+                    response = self._breaker.call(
+                        client.batch_get_secret_value, SecretIdList=batch, is_failure=_is_backend_failure
+                    )
+            except (ConnectTimeoutError, ReadTimeoutError, SecretTimeoutError) as e:
+                error = SecretTimeoutError(f"Getting secrets from AWS SecretManager timed out after {timeout}s")
+                error.__cause__ = e
+                failures.update(dict.fromkeys(missing[i:], error))
+                break
+            except (ClientError, BotoCoreError, CircuitOpenError) as e:
+                if isinstance(e, ClientError) and not _is_backend_failure(e):
+                    raise
+                failures.update(dict.fromkeys(missing[i:], e))
+                break
+            for error in response.get("Errors", []):
+                if error["ErrorCode"] != "ResourceNotFoundException":
+                    # e.g. a secret which cannot be decrypted, it does not fail the other secrets of the batch
+                    errors[error["SecretId"]] = RuntimeError(
+                        f"Failed to get secret {error['SecretId']}: {error['Message']}"
+                    )
+                    continue
+                logger.debug("Secret %s was not found in AWS SecretManager", error["SecretId"])
+            for item in response["SecretValues"]:
+                # the response may contain the name or the arn of the secret, map back to the requested id
+                key = item["Name"] if item["Name"] in batch else item["ARN"]
+                self._put_cache(key, item["SecretString"])
+                res[key] = self._to_secret_value(item["SecretString"])
+        if failures or errors:
+            return self._serve_stale_many(res, failures, errors, max_staleness=max_staleness)
+        return res
 
     def add(self, key: str, value: JsonValue):
         client = self._get_client()
@@ -82,11 +220,79 @@ class AWSSecretStore(AbstractSecretStore[AWSSettings]):
         self._put_cache(key, self._serialize(value))
         return SecretValue(value)
 
-    def list_secret_keys(self):
+    def _call_throttled(self, func: Callable[..., T], **kwargs: Any) -> T:
+        attempt = 0
+        while True:
+            if (wait := self._throttled_until - time.monotonic()) > 0:
+                time.sleep(wait)
+            try:
+                return func(**kwargs)
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in _THROTTLING_CODES or attempt >= self.settings.max_retries:
+                    raise
+                # the rate limit applies to the account, hence the pause applies to all concurrent writes
+                delay = 2**attempt
+                self._throttled_until = max(self._throttled_until, time.monotonic() + delay)
+                logger.warning("AWS SecretManager is throttling, retrying in %ss", delay)
+                attempt += 1
+
+    def _put(self, client: Any, key: str, value: str) -> None:
+        kwargs = {"KmsKeyId": self._kms_key} if self._kms_key else {}
+        try:
+            self._call_throttled(client.create_secret, Name=key, SecretString=value, **kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ResourceExistsException":
+                raise
+            self._call_throttled(client.update_secret, SecretId=key, SecretString=value)
+
+    def _delete(self, client: Any, key: str) -> None:
+        try:
+            self._call_throttled(client.delete_secret, SecretId=key, **self._deletion_policy)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ResourceNotFoundException":
+                raise SecretNotFoundError(f"Secret {key} was not found in AWS SecretManager") from e
+            raise
+
+    def _run_many(self, func: Callable[[Any, str], None], keys: Iterable[str], operation: str):
+        # writes are independent requests, hence they are issued concurrently and a failure does not abort the batch
+        res: dict[str, Exception | None] = {}
+        if not (keys := list(dict.fromkeys(keys))):
+            return res
         client = self._get_client()
-        response = client.list_secrets()
+        workers = min(self.settings.max_concurrency, len(keys))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="secretmanager-aws") as pool:
+            futures = {key: pool.submit(func, client, key) for key in keys}
+            for key, future in futures.items():
+                try:
+                    future.result()
+                    res[key] = None
+                except Exception as e:
+                    logger.warning("Failed to %s secret %s in aws secretmanager: %s", operation, key, e)
+                    res[key] = e
+        return res
+
+    def put_many(self, values: Mapping[str, JsonValue]):
+        logger.info("Putting %s keys to aws secretmanager", len(values))
+        serialized = {key: self._serialize(value) for key, value in values.items()}
+        res = self._run_many(lambda client, key: self._put(client, key, serialized[key]), serialized, "put")
+        self._put_cache_many({key: serialized[key] for key, error in res.items() if error is None})
+        return res
+
+    def delete_many(self, keys: Iterable[str]):
+        logger.info("Deleting keys from aws secretmanager")
+        res = self._run_many(self._delete, keys, "delete")
+        self._drop_cache_many(key for key, error in res.items() if error is None)
+        return res
+
+    def list_secret_keys(self):
         logger.info("List all secrets keys in aws secretmanager")
-        return {res["Name"] for res in response["SecretList"]}
+        return set(self.iter_secret_keys())
+
+    def iter_secret_keys(self):
+        client = self._get_client()
+        for page in client.get_paginator("list_secrets").paginate():
+            for res in page["SecretList"]:
+                yield res["Name"]
 
     def list_secrets(self):
         secrets = self.list_secret_keys()
@@ -104,3 +310,19 @@ class AWSSecretStore(AbstractSecretStore[AWSSettings]):
         kwargs = {} | self._deletion_policy
         client.delete_secret(SecretId=key, **kwargs)
         self._drop_cache(key)
+
+    def _last_changed(self) -> dict[str, Any]:
+        client = self._get_client()
+        with tracing.span("aws.list_secrets"):
+            return {
+                secret["Name"]: secret.get("LastChangedDate")
+                for page in client.get_paginator("list_secrets").paginate()
+                for secret in page["SecretList"]
+            }
+
+    def watch(
+        self, keys: Iterable[str] | None = None, callback: WatchCallback | None = None, interval: float | None = None
+    ):
+        # listing returns the last change of every secret without their values, hence values are only
+        # requested for secrets which changed
+        return Watch(self, keys, callback, SnapshotDiff(self._last_changed), interval or self.settings.watch_interval)
@@ -0,0 +1,292 @@
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
+from typing import Any, TypeVar
+
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ServiceRequestError
+from azure.keyvault.secrets.aio import SecretClient
+from pydantic import JsonValue
+
+from secretmanager import tracing
+from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError, SecretTimeoutError
+from secretmanager.fork import ClientPool, register_at_fork
+from secretmanager.settings import AzureSettings, Settings
+from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# status codes of throttled or temporarily unavailable requests which are retried after their Retry-After
+_RETRY_STATUS_CODES = {429, 503}
+_RETRY_AFTER_HEADERS = ("retry-after-ms", "x-ms-retry-after-ms", "Retry-After")
+
+# all requests run on a single event loop in a background thread, such that clients and their
+# connection pools are shared by all stores and threads of the process
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+_clients: ClientPool[tuple[str, int | None], "_VaultClient"] = ClientPool()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="secretmanager-azure", daemon=True).start()
+        return _loop
+
+
+def _run(coro: Coroutine[Any, Any, T], timeout: float | None) -> T:
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError as e:
+        future.cancel()
+        raise SecretTimeoutError(f"Request to Azure Key Vault timed out after {timeout}s") from e
+
+
+def _retry_after(error: HttpResponseError) -> float | None:
+    headers = getattr(error.response, "headers", None) or {}
+    for header in _RETRY_AFTER_HEADERS:
+        if (value := headers.get(header)) is not None:
+            try:
+                return float(value) / (1000 if header.endswith("-ms") else 1)
+            except ValueError:
+                return None
+    return None
+
+
+def _is_backend_failure(error: Exception) -> bool:
+    if isinstance(error, HttpResponseError):
+        return error.status_code is None or error.status_code >= 500 or error.status_code == 429
+    return isinstance(error, (ServiceRequestError, SecretTimeoutError))
+
+
+class _VaultClient:
+    """
+    A client of a single vault, its transport is shared and requests are throttled together
+    """
+
+    def __init__(self, client: SecretClient) -> None:
+        self.client = client
+        self.throttled_until = 0.0
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def semaphore(self, limit: int) -> asyncio.Semaphore:
+        # created lazily as it must be bound to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(limit)
+        return self._semaphore
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, settings: AzureSettings, **kwargs: Any) -> T:
+        attempt = 0
+        while True:
+            async with self.semaphore(settings.max_concurrency):
+                if (wait := self.throttled_until - time.monotonic()) > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    return await func(*args, **kwargs)
+                except HttpResponseError as e:
+                    if e.status_code not in _RETRY_STATUS_CODES or attempt >= settings.max_retries:
+                        raise
+                    # a throttled vault throttles all requests, hence the pause applies to all requests of the vault
+                    delay = _retry_after(e) or 2**attempt
+                    self.throttled_until = max(self.throttled_until, time.monotonic() + delay)
+                    logger.warning("Azure Key Vault is throttling, retrying in %ss", delay)
+                    attempt += 1
+
+
+def _get_shared_client(vault_url: str, credential: Any, client_options: dict[str, Any]) -> _VaultClient:
+    def create() -> _VaultClient:
+        nonlocal credential
+        if credential is None:
+            from azure.identity.aio import DefaultAzureCredential
+
+            credential = DefaultAzureCredential()
+        # throttled requests are retried by the store, honoring Retry-After across all requests of the vault
+        options = {"retry_status": 0, **client_options}
+        with tracing.span("azure.create_client"):
+            return _VaultClient(SecretClient(vault_url, credential, **options))
+
+    return _clients.get((vault_url, id(credential) if credential is not None else None), create)
+
+
+@atexit.register
+def _close_clients() -> None:
+    clients = _clients.clear()
+    if _loop is not None and clients:
+
+        async def close() -> None:
+            await asyncio.gather(*(c.client.close() for c in clients), return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(close(), _loop).result(5)
+        except Exception as e:
+            logger.debug("Failed to close Azure Key Vault clients: %s", e)
+
+
+def _reset_loop() -> None:
+    # the loop thread does not exist in a forked child, the child starts its own loop on use.
+    # Clients are bound to the loop, they are dropped by their pool.
+    global _loop, _loop_lock
+    _loop, _loop_lock = None, threading.Lock()
+
+
+register_at_fork(after_in_child=_reset_loop)
+
+
+class AzureKeyVaultStore(AbstractSecretStore[AzureSettings]):
+    """
+    A store backed by Azure Key Vault
+
+    Requests are made with the async SecretClient on a shared event loop. Stores of the same vault and
+    credential share one client and hence one transport. Concurrent requests per vault are bounded by
+    `max_concurrency` and throttled requests are retried after the time indicated by the vault.
+    """
+
+    def __init__(
+        self,
+        vault_url: str | None = None,
+        credential: Any = None,
+        client_options: dict[str, Any] | None = None,
+        client: SecretClient | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            vault_url: Url of the vault. Defaults to the store settings.
+            credential: Async credential. Defaults to DefaultAzureCredential.
+            client_options: Options of the client, only used when the client of the vault is created.
+            client: Client to use instead of the shared client of the vault. Defaults to None.
+        """
+        self.capabilities = StoreCapabilities(cacheable=True, read=True, write=True)
+        self.settings = Settings.azure
+
+        self._custom_vault = _VaultClient(client) if client is not None else None
+        if client is None:
+            vault_url = vault_url or self.settings.vault_url
+            if vault_url is None:
+                raise ValueError("No Azure Key Vault url has been provided")
+            _get_shared_client(vault_url, credential, client_options or {})
+        self._vault_args = (vault_url, credential, client_options or {})
+
+    @property
+    def _vault(self) -> _VaultClient:
+        return self._custom_vault or _get_shared_client(*self._vault_args)
+
+    async def _call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        return await self._vault.call(func, *args, settings=self.settings, **kwargs)
+
+    async def _get_value(self, key: str) -> str:
+        try:
+            with tracing.span("azure.get_secret"):
+                secret = await self._call(self._vault.client.get_secret, key)
+        except ResourceNotFoundError as e:
+            raise SecretNotFoundError(f"Secret {key} was not found in Azure Key Vault") from e
+        return secret.value
+
+    def get(self, key: str, timeout: float | None = None):
+        logger.info("Getting key %s from azure key vault", key)
+
+        if cached_value := self._get_cache(key):
+            return self._to_secret_value(cached_value)
+
+        timeout = self._resolve_timeout(timeout)
+        try:
+            value = _run(self._get_value(key), timeout)
+        except (HttpResponseError, ServiceRequestError, SecretTimeoutError) as e:
+            if not _is_backend_failure(e):
+                raise
+            return self._serve_stale(key, e)
+        self._put_cache(key, value)
+        return self._to_secret_value(value)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        res: dict[str, SecretValue] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            if cached_value := self._get_cache(key):
+                res[key] = self._to_secret_value(cached_value)
+            else:
+                missing.append(key)
+
+        if not missing:
+            return res
+
+        logger.info("Getting %s keys from azure key vault", len(missing))
+
+        async def get_values() -> list[str | BaseException]:
+            return await asyncio.gather(*(self._get_value(key) for key in missing), return_exceptions=True)
+
+        try:
+            results = _run(get_values(), self._resolve_timeout(timeout))
+        except SecretTimeoutError as e:
+            results = [e] * len(missing)
+
+        failures: dict[str, Exception] = {}
+        errors: dict[str, Exception] = {}
+        for key, result in zip(missing, results):
+            if isinstance(result, SecretNotFoundError):
+                logger.debug("Secret %s was not found in Azure Key Vault", key)
+            elif isinstance(result, Exception):
+                if _is_backend_failure(result):
+                    failures[key] = result
+                else:
+                    errors[key] = result
+            elif isinstance(result, str):
+                self._put_cache(key, result)
+                res[key] = self._to_secret_value(result)
+        if failures or errors:
+            return self._serve_stale_many(res, failures, errors)
+        return res
+
+    def add(self, key: str, value: JsonValue):
+        logger.info("Adding key %s to azure key vault", key)
+        try:
+            _run(self._get_value(key), self._resolve_timeout(None))
+        except SecretNotFoundError:
+            pass
+        else:
+            raise SecretAlreadyExistsError(f"Secret {key} already exists")
+        return self.update(key, value)
+
+    def update(self, key: str, value: JsonValue):
+        logger.info("Updating key %s in azure key vault", key)
+        raw_value = self._serialize(value)
+        _run(self._call(self._vault.client.set_secret, key, raw_value), self._resolve_timeout(None))
+        self._put_cache(key, raw_value)
+        return SecretValue(value)
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in azure key vault")
+        return set(self.iter_secret_keys())
+
+    def iter_secret_keys(self):
+        pages = self._vault.client.list_properties_of_secrets(max_page_size=self.settings.page_size).by_page()
+
+        async def next_page() -> list[str] | None:
+            try:
+                page = await self._call(pages.__anext__)
+            except StopAsyncIteration:
+                return None
+            return [properties.name async for properties in page if properties.enabled is not False]
+
+        # pages are requested one at a time, such that keys are yielded while paginating
+        while (names := _run(next_page(), self._resolve_timeout(None))) is not None:
+            yield from names
+
+    def delete(self, key: str) -> None:
+        logger.info("Deleting key %s from azure key vault", key)
+        try:
+            _run(self._call(self._vault.client.delete_secret, key), self._resolve_timeout(None))
+        except ResourceNotFoundError as e:
+            raise SecretNotFoundError(f"Secret {key} was not found in Azure Key Vault") from e
+        finally:
+            self._drop_cache(key)
@@ -0,0 +1,237 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import JsonValue
+
+from secretmanager import tracing
+from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError
+from secretmanager.fork import register_at_fork
+from secretmanager.settings import BitwardenSettings, Settings
+from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _IndexEntry:
+    id: str
+    value: str
+    project_id: str | None
+    revision_date: datetime
+
+
+def _unwrap(response: Any) -> Any:
+    if not response.success:
+        raise RuntimeError(f"Bitwarden request failed: {response.error_message}")
+    return response.data
+
+
+# the SDK client must not be shared with a forked child, hence a child logs in again on use.
+# A client passed to a store is kept, the caller is responsible for its fork safety.
+_stores: "weakref.WeakValueDictionary[int, BitwardenSecretStore]" = weakref.WeakValueDictionary()
+
+
+def _reset_clients() -> None:
+    for store in list(_stores.values()):
+        store._lock = threading.Lock()
+        store._client_lock = threading.Lock()
+        if store._access_token is not None:
+            store._sdk_client = None
+
+
+register_at_fork(after_in_child=_reset_clients)
+
+
+class BitwardenSecretStore(AbstractSecretStore[BitwardenSettings]):
+    """
+    A store backed by Bitwarden Secrets Manager
+
+    All secrets of the organization are synced in one bulk call into a local index keyed by the secret's key,
+    which serves all reads. The index is re-synced once `sync_interval` has passed or when a key is missing,
+    at most every `miss_sync_interval`. A sync only transfers secrets if there were changes since the last sync.
+    Hence the store does not use the global cache.
+    """
+
+    def __init__(
+        self,
+        access_token: str | None = None,
+        organization_id: str | None = None,
+        project_id: str | None = None,
+        client: Any = None,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            access_token: Access token of a machine account. Defaults to the environment variable BWS_ACCESS_TOKEN.
+            organization_id: Organization of the secrets. Defaults to the store settings.
+            project_id: Only serve secrets of this project. Defaults to the store settings.
+            client: An authenticated client to use instead of creating one, it is also used by a forked child.
+                Defaults to None.
+        """
+        self.capabilities = StoreCapabilities(cacheable=False, read=True, write=True)
+        self.settings = Settings.bitwarden
+
+        self._organization_id = organization_id or self.settings.organization_id
+        if self._organization_id is None:
+            raise ValueError("No Bitwarden organization has been provided")
+        self._project_id = project_id or self.settings.project_id
+        # the access token is only kept to log in again in a forked child
+        self._access_token = None if client is not None else access_token or os.environ.get("BWS_ACCESS_TOKEN")
+        self._sdk_client = client or self._create_client(self._access_token)
+        self._client_lock = threading.Lock()
+
+        self._index: dict[str, _IndexEntry] = {}
+        self._lock = threading.Lock()
+        _stores[id(self)] = self
+        self._last_synced: datetime | None = None
+        self._synced_at = float("-inf")
+
+    def _create_client(self, access_token: str | None) -> Any:
+        from bitwarden_sdk import BitwardenClient, DeviceType, client_settings_from_dict
+
+        if access_token is None:
+            raise ValueError("No Bitwarden access token has been provided")
+        client = BitwardenClient(
+            client_settings_from_dict(
+                {
+                    "apiUrl": self.settings.api_url,
+                    "identityUrl": self.settings.identity_url,
+                    "deviceType": DeviceType.SDK,
+                    "userAgent": "secretmanager",
+                }
+            )
+        )
+        state_file = str(self.settings.state_file) if self.settings.state_file else None
+        client.auth().login_access_token(access_token, state_file)
+        return client
+
+    @property
+    def _client(self) -> Any:
+        if (client := self._sdk_client) is not None:
+            return client
+        with self._client_lock:
+            if self._sdk_client is None:
+                self._sdk_client = self._create_client(self._access_token)
+            return self._sdk_client
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        Sync the local index with Bitwarden
+
+        Args:
+            force: Whether to request all secrets instead of only changes since the last sync. Defaults to False.
+
+        Returns:
+            Whether the index has changed
+        """
+        with self._lock:
+            return self._sync(force)
+
+    def _sync(self, force: bool = False) -> bool:
+        started = datetime.now(timezone.utc)
+        last_synced = None if force or self._last_synced is None else self._last_synced.isoformat()
+        logger.info("Syncing bitwarden secrets of organization %s", self._organization_id)
+        with tracing.span("bitwarden.sync"):
+            response = _unwrap(self._client.secrets().sync(self._organization_id, last_synced))
+
+        self._last_synced = started
+        self._synced_at = time.monotonic()
+        if not response.has_changes:
+            return False
+
+        # a sync with changes returns all secrets, hence the index is replaced
+        index: dict[str, _IndexEntry] = {}
+        for secret in response.secrets or []:
+            project_id = str(secret.project_id) if secret.project_id is not None else None
+            if self._project_id is not None and project_id != self._project_id:
+                continue
+            entry = _IndexEntry(str(secret.id), secret.value, project_id, secret.revision_date)
+            if (existing := index.get(secret.key)) is not None:
+                logger.warning("Bitwarden key %s is not unique, using the most recently revised secret", secret.key)
+                if existing.revision_date >= entry.revision_date:
+                    continue
+            index[secret.key] = entry
+        self._index = index
+        return True
+
+    def _sync_if_due(self, miss: bool = False) -> None:
+        interval = self.settings.miss_sync_interval if miss else self.settings.sync_interval
+        with self._lock:
+            if time.monotonic() - self._synced_at >= interval:
+                self._sync()
+
+    def _lookup(self, key: str) -> _IndexEntry | None:
+        self._sync_if_due()
+        if (entry := self._index.get(key)) is None:
+            self._sync_if_due(miss=True)
+            entry = self._index.get(key)
+        return entry
+
+    def get(self, key: str, timeout: float | None = None):
+        logger.info("Getting key %s from bitwarden", key)
+        if (entry := self._lookup(key)) is None:
+            raise SecretNotFoundError(f"Secret {key} was not found in Bitwarden")
+        return self._to_secret_value(entry.value)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        keys = list(keys)
+        self._sync_if_due()
+        if any(key not in self._index for key in keys):
+            self._sync_if_due(miss=True)
+        index = self._index
+        return {key: self._to_secret_value(index[key].value) for key in keys if key in index}
+
+    def add(self, key: str, value: JsonValue):
+        if self._lookup(key) is not None:
+            raise SecretAlreadyExistsError(f"Secret {key} already exists")
+        logger.info("Adding key %s to bitwarden", key)
+        project_ids = [self._project_id] if self._project_id else None
+        raw_value = self._serialize(value)
+        secret = _unwrap(self._client.secrets().create(self._organization_id, key, raw_value, None, project_ids))
+        self._put_index(key, secret)
+        return SecretValue(value)
+
+    def update(self, key: str, value: JsonValue):
+        if (entry := self._lookup(key)) is None:
+            raise SecretNotFoundError(f"Secret {key} was not found in Bitwarden")
+        logger.info("Updating key %s in bitwarden", key)
+        project_ids = [entry.project_id] if entry.project_id else None
+        raw_value = self._serialize(value)
+        secret = _unwrap(
+            self._client.secrets().update(self._organization_id, entry.id, key, raw_value, None, project_ids)
+        )
+        self._put_index(key, secret)
+        return SecretValue(value)
+
+    def _put_index(self, key: str, secret: Any) -> None:
+        project_id = str(secret.project_id) if secret.project_id is not None else None
+        with self._lock:
+            self._index = {
+                **self._index,
+                key: _IndexEntry(str(secret.id), secret.value, project_id, secret.revision_date),
+            }
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in bitwarden")
+        self._sync_if_due()
+        return set(self._index)
+
+    def list_secrets(self):
+        self._sync_if_due()
+        return {key: self._to_secret_value(entry.value) for key, entry in self._index.items()}
+
+    def delete(self, key: str) -> None:
+        if (entry := self._lookup(key)) is None:
+            raise SecretNotFoundError(f"Secret {key} was not found in Bitwarden")
+        logger.info("Deleting key %s from bitwarden", key)
+        _unwrap(self._client.secrets().delete([entry.id]))
+        with self._lock:
+            self._index = {k: v for k, v in self._index.items() if k != key}
@@ -0,0 +1,198 @@
+import logging
+import threading
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from pydantic import JsonValue
+
+from secretmanager.error import SecretNotFoundError, SecretTimeoutError
+from secretmanager.settings import ChainSettings, Settings
+from secretmanager.store import AbstractSecretStore, Deadline, SecretValue, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+
+class ChainedSecretStore(AbstractSecretStore[ChainSettings]):
+    """
+    A composite store which queries an ordered chain of stores until a secret is found
+
+    Keys are passed as-is to the stores of the chain, i.e. the store-specific prefix, suffix and mapping
+    settings of the chained stores are not applied. Caching is left to the stores of the chain.
+    """
+
+    def __init__(self, stores: list[AbstractSecretStore] | None = None, hedge_after: float | None = None) -> None:
+        """
+        Constructor
+
+        Args:
+            stores: Ordered stores to query. Defaults to the stores configured via the chain settings.
+            hedge_after: Time in milliseconds after which the next store is queried in parallel if the
+                current one has not answered yet. Defaults to the chain settings.
+        """
+        self.settings = Settings.chain
+        self.capabilities = StoreCapabilities(cacheable=False, read=True, write=False)
+
+        if stores is None:
+            from secretmanager.registry import get_store
+
+            stores = [get_store(name, **self.settings.store_kwargs.get(name, {})) for name in self.settings.stores]
+        if not stores:
+            raise ValueError("A chained store requires at least one store")
+
+        self.stores = stores
+        self._hedge_after = hedge_after if hedge_after is not None else self.settings.hedge_after
+        self._owners: dict[str, int] = {}
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=len(self.stores), thread_name_prefix="secretmanager-chain")
+            return self._pool
+
+    def _remember(self, key: str, index: int) -> None:
+        if self.settings.remember_owner:
+            self._owners[key] = index
+
+    def _get_from_owner(self, key: str, deadline: Deadline) -> SecretValue | None:
+        if (index := self._owners.get(key)) is None:
+            return None
+        try:
+            return self.stores[index].get(key, timeout=deadline.remaining())
+        except SecretTimeoutError:
+            raise
+        except Exception as e:
+            # the owner is only a shortcut, a failing owner falls back to the full chain
+            logger.debug("Failed to get %s from owner %s: %s", key, self.stores[index].__class__.__name__, e)
+            self._owners.pop(key, None)
+            return None
+
+    def _get_sequential(self, key: str, deadline: Deadline) -> SecretValue:
+        errors: list[Exception] = []
+        for index, store in enumerate(self.stores):
+            try:
+                value = store.get(key, timeout=deadline.remaining())
+            except SecretTimeoutError:
+                raise
+            except Exception as e:
+                logger.debug("Failed to get %s from %s: %s", key, store.__class__.__name__, e)
+                errors.append(e)
+                continue
+            self._remember(key, index)
+            return value
+        raise self._chain_error(key, errors)
+
+    def _get_hedged(self, key: str, hedge_after: float, deadline: Deadline) -> SecretValue:
+        pool = self._get_pool()
+        futures: dict[Future[SecretValue], int] = {}
+        errors: list[Exception] = []
+
+        def launch(index: int) -> Future[SecretValue]:
+            logger.debug("Querying %s for %s", self.stores[index].__class__.__name__, key)
+            future = pool.submit(self.stores[index].get, key, timeout=deadline.remaining())
+            futures[future] = index
+            return future
+
+        pending = {launch(0)}
+        next_index = 1
+        while pending:
+            timeout = hedge_after / 1000 if next_index < len(self.stores) else None
+            if (remaining := deadline.remaining()) is not None:
+                timeout = min(timeout, remaining) if timeout is not None else remaining
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    value = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                # first success wins, all other lookups are not needed anymore
+                for other in pending:
+                    other.cancel()
+                self._remember(key, futures[future])
+                return value
+
+            # either the hedge delay passed or a store failed, continue with the next store
+            if next_index < len(self.stores):
+                pending.add(launch(next_index))
+                next_index += 1
+
+        raise self._chain_error(key, errors)
+
+    def _chain_error(self, key: str, errors: list[Exception]) -> Exception:
+        # surface unexpected errors over a plain miss
+        for error in errors:
+            if not isinstance(error, SecretNotFoundError):
+                return error
+        return SecretNotFoundError(f"Secret {key} was not found in any of the chained stores")
+
+    def get(self, key: str, timeout: float | None = None):
+        deadline = Deadline(self._resolve_timeout(timeout))
+        if (value := self._get_from_owner(key, deadline)) is not None:
+            return value
+
+        logger.info("Getting key %s from chained store", key)
+        if self._hedge_after is None or len(self.stores) == 1:
+            return self._get_sequential(key, deadline)
+        return self._get_hedged(key, self._hedge_after, deadline)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        deadline = Deadline(self._resolve_timeout(timeout))
+        res: dict[str, SecretValue] = {}
+        remaining = list(dict.fromkeys(keys))
+
+        # known owners are queried first, misses fall through to the full chain
+        owned: dict[int, list[str]] = {}
+        for key in remaining:
+            if (index := self._owners.get(key)) is not None:
+                owned.setdefault(index, []).append(key)
+        for index, owned_keys in owned.items():
+            try:
+                res.update(self.stores[index].get_many(owned_keys, timeout=deadline.remaining()))
+            except SecretTimeoutError:
+                raise
+            except Exception as e:
+                owner = self.stores[index].__class__.__name__
+                logger.debug("Failed to get %s keys from owner %s: %s", len(owned_keys), owner, e)
+                for key in owned_keys:
+                    self._owners.pop(key, None)
+
+        remaining = [k for k in remaining if k not in res]
+        errors: list[Exception] = []
+        for index, store in enumerate(self.stores):
+            if not remaining:
+                break
+            try:
+                values = store.get_many(remaining, timeout=deadline.remaining())
+            except SecretTimeoutError:
+                raise
+            except Exception as e:
+                logger.debug("Failed to get %s keys from %s: %s", len(remaining), store.__class__.__name__, e)
+                errors.append(e)
+                continue
+            for key in values:
+                self._remember(key, index)
+            res.update(values)
+            remaining = [k for k in remaining if k not in values]
+        # keys which no store returned are only omitted if no store failed, otherwise they may exist
+        if remaining and errors:
+            raise errors[0]
+        return res
+
+    def add(self, key: str, value: JsonValue):
+        raise NotImplementedError("This store only supports reading")
+
+    def update(self, key: str, value: JsonValue):
+        raise NotImplementedError("This store only supports reading")
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in chained store")
+        keys: set[str] = set()
+        for store in self.stores:
+            keys |= store.list_secret_keys()
+        return keys
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError("This store only supports reading")
@@ -1,11 +1,14 @@
 import logging
+from collections.abc import Iterable
 from pathlib import Path
 
 from pydantic import JsonValue
 
+from secretmanager import tracing
 from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError
 from secretmanager.settings import DotEnvSettings, Settings
 from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+from secretmanager.watch import FileSnapshotDiff, Watch, WatchCallback
 
 logger = logging.getLogger(__name__)
 
@@ -26,17 +29,39 @@ class DotEnvStore(AbstractSecretStore[DotEnvSettings]):
         self._client = dotenv
         self._file = _file
 
-    def get(self, key: str):
+    def get(self, key: str, timeout: float | None = None):
         if cached_value := self._get_cache(key):
-            return SecretValue(self._deserialize(cached_value))
+            return self._to_secret_value(cached_value)
 
         logger.info("Getting %s from dotenv store at %s", key, self._file)
-        value = self._client.get_key(self._file, key)
+        with tracing.span("dotenv.read"):
+            value = self._client.get_key(self._file, key)
 
         if value is None:
             raise SecretNotFoundError(f"Secret {key} was not found in {self._file}")
         self._put_cache(key, value)
-        return SecretValue(self._deserialize(value))
+        return self._to_secret_value(value)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        res: dict[str, SecretValue] = {}
+        missing: list[str] = []
+        for key in keys:
+            if cached_value := self._get_cache(key):
+                res[key] = self._to_secret_value(cached_value)
+            else:
+                missing.append(key)
+
+        if not missing:
+            return res
+
+        logger.info("Getting %s keys from dotenv store at %s", len(missing), self._file)
+        with tracing.span("dotenv.read", keys=len(missing)):
+            values = self._client.dotenv_values(self._file)
+        for key in missing:
+            if (value := values.get(key)) is not None:
+                self._put_cache(key, value)
+                res[key] = self._to_secret_value(value)
+        return res
 
     def add(self, key: str, value: JsonValue):
         if self._client.get_key(self._file, key):
@@ -61,3 +86,10 @@ class DotEnvStore(AbstractSecretStore[DotEnvSettings]):
         logger.info("Deleting %s from dotenv store at %s", key, self._file)
         self._client.unset_key(self._file, key)
         self._drop_cache(key)
+
+    def watch(
+        self, keys: Iterable[str] | None = None, callback: WatchCallback | None = None, interval: float | None = None
+    ):
+        # the file is only parsed again once it has been modified
+        poll = FileSnapshotDiff(self._file, lambda: self._client.dotenv_values(self._file))
+        return Watch(self, keys, callback, poll, interval or self.settings.watch_interval)
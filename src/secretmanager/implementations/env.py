@@ -1,5 +1,6 @@
 import logging
 import os
+from collections.abc import Iterable, Mapping
 
 from pydantic import JsonValue
 
@@ -15,15 +16,15 @@ class EnvVarStore(AbstractSecretStore[StoreSettings]):
         self.settings = Settings.env
         self.capabilities = StoreCapabilities(cacheable=True, read=True, write=True)
 
-    def get(self, key: str):
+    def get(self, key: str, timeout: float | None = None):
         if cached_value := self._get_cache(key):
-            return SecretValue(self._deserialize(cached_value))
+            return self._to_secret_value(cached_value)
 
         if (value := os.environ.get(key)) is None:
             raise SecretNotFoundError(f"Secret {key} was not found in environment variables")
         logger.info("Getting key %s from environment variable store", key)
         self._put_cache(key, value)
-        return SecretValue(self._deserialize(value))
+        return self._to_secret_value(value)
 
     def add(self, key: str, value: JsonValue):
         logger.info("Adding key %s to environment variable store", key)
@@ -39,6 +40,28 @@ class EnvVarStore(AbstractSecretStore[StoreSettings]):
         self._put_cache(key, self._serialize(value))
         return SecretValue(value)
 
+    def put_many(self, values: Mapping[str, JsonValue]) -> dict[str, Exception | None]:
+        logger.info("Putting %s keys to environment variable store", len(values))
+        serialized = {key: self._serialize(value) for key, value in values.items()}
+        try:
+            os.environ.update(serialized)
+        except Exception:
+            # attribute the failure to the keys which cannot be written
+            return super().put_many(values)
+        self._put_cache_many(serialized)
+        return dict.fromkeys(serialized)
+
+    def delete_many(self, keys: Iterable[str]) -> dict[str, Exception | None]:
+        res: dict[str, Exception | None] = {}
+        for key in keys:
+            logger.info("Deleting key %s from environment variable store", key)
+            if os.environ.pop(key, None) is None:
+                res[key] = SecretNotFoundError(f"Secret {key} was not found in environment variables")
+            else:
+                res[key] = None
+        self._drop_cache_many(key for key, error in res.items() if error is None)
+        return res
+
     def list_secret_keys(self):
         logger.info("List all secrets keys in environment variable store")
         return set(os.environ.keys())
@@ -0,0 +1,222 @@
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from google.api_core import exceptions
+from google.cloud import secretmanager
+from pydantic import JsonValue
+
+from secretmanager import tracing
+from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError, SecretTimeoutError
+from secretmanager.fork import ClientPool
+from secretmanager.settings import GoogleSettings, Settings
+from secretmanager.store import AbstractSecretStore, Deadline, SecretValue, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+# errors after which a stale cache entry is served
+_BACKEND_FAILURES = (exceptions.ServiceUnavailable, exceptions.InternalServerError, exceptions.TooManyRequests)
+
+# clients hold a long-lived channel, hence there is a single client per transport and client options
+_clients: ClientPool[tuple[str | None, str], secretmanager.SecretManagerServiceClient] = ClientPool()
+
+
+def _get_shared_client(
+    transport: str | None, client_options: dict[str, Any] | None
+) -> secretmanager.SecretManagerServiceClient:
+    def create() -> secretmanager.SecretManagerServiceClient:
+        with tracing.span("google.create_client"):
+            return secretmanager.SecretManagerServiceClient(transport=transport, client_options=client_options)
+
+    return _clients.get((transport, repr(sorted((client_options or {}).items()))), create)
+
+
+class GoogleSecretStore(AbstractSecretStore[GoogleSettings]):
+    """
+    A store backed by Google Cloud Secret Manager
+
+    The client and its channel are shared by all stores of the process. Secrets are accessed via the configured
+    version, which defaults to the latest alias. The version resolved from the latest alias is pinned per secret
+    for `alias_ttl` seconds, such that all reads within that window see the same version.
+    """
+
+    def __init__(
+        self,
+        project: str | None = None,
+        transport: str | None = None,
+        client_options: dict[str, Any] | None = None,
+        client: secretmanager.SecretManagerServiceClient | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            project: Project of the secrets. Defaults to the store settings or the project of the credentials.
+            transport: Transport of the client, either grpc or rest. Defaults to grpc.
+            client_options: Options of the client such as the api endpoint. Defaults to None.
+            client: Client to use instead of the shared client. Defaults to None.
+        """
+        self.capabilities = StoreCapabilities(cacheable=True, read=True, write=True)
+        self.settings = Settings.gc
+
+        self._custom_client = client
+        self._transport = transport
+        self._client_options = client_options
+        if client is None:
+            _get_shared_client(transport, client_options)
+        project = project or self.settings.project
+        if project is None:
+            import google.auth
+
+            _, project = google.auth.default()
+        if not project:
+            raise ValueError("No Google Cloud project has been provided")
+        self._project = project
+        self._pinned: dict[str, tuple[str, float]] = {}
+        self._pinned_lock = threading.Lock()
+
+    @property
+    def _client(self) -> secretmanager.SecretManagerServiceClient:
+        return self._custom_client or _get_shared_client(self._transport, self._client_options)
+
+    def _secret_name(self, key: str) -> str:
+        return f"projects/{self._project}/secrets/{key}"
+
+    def _version_name(self, key: str) -> str:
+        if self.settings.version != "latest":
+            return f"{self._secret_name(key)}/versions/{self.settings.version}"
+        with self._pinned_lock:
+            pinned = self._pinned.get(key)
+        if pinned is not None and pinned[1] > time.monotonic():
+            return pinned[0]
+        return f"{self._secret_name(key)}/versions/latest"
+
+    def _pin(self, key: str, version_name: str) -> None:
+        if self.settings.version == "latest" and self.settings.alias_ttl > 0:
+            with self._pinned_lock:
+                self._pinned[key] = (version_name, time.monotonic() + self.settings.alias_ttl)
+
+    def _unpin(self, key: str) -> None:
+        with self._pinned_lock:
+            self._pinned.pop(key, None)
+
+    def _access(self, key: str, timeout: float | None) -> str:
+        try:
+            # without a timeout the default timeout and retry policy of the client apply
+            kwargs = {"timeout": timeout} if timeout is not None else {}
+            with tracing.span("google.access_secret_version"):
+                response = self._client.access_secret_version(request={"name": self._version_name(key)}, **kwargs)
+        except exceptions.NotFound as e:
+            self._unpin(key)
+            raise SecretNotFoundError(f"Secret {key} was not found in Google Secret Manager") from e
+        except exceptions.DeadlineExceeded as e:
+            raise SecretTimeoutError(
+                f"Getting secret {key} from Google Secret Manager timed out after {timeout}s"
+            ) from e
+        self._pin(key, response.name)
+        return response.payload.data.decode()
+
+    def get(self, key: str, timeout: float | None = None):
+        logger.info("Getting key %s from google secret manager", key)
+
+        if cached_value := self._get_cache(key):
+            return self._to_secret_value(cached_value)
+
+        try:
+            value = self._access(key, self._resolve_timeout(timeout))
+        except (SecretTimeoutError, *_BACKEND_FAILURES) as e:
+            return self._serve_stale(key, e)
+        self._put_cache(key, value)
+        return self._to_secret_value(value)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        res: dict[str, SecretValue] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            if cached_value := self._get_cache(key):
+                res[key] = self._to_secret_value(cached_value)
+            else:
+                missing.append(key)
+
+        if not missing:
+            return res
+
+        logger.info("Getting %s keys from google secret manager", len(missing))
+        deadline = Deadline(self._resolve_timeout(timeout))
+
+        failures: dict[str, Exception] = {}
+
+        def access(key: str) -> SecretValue | None:
+            try:
+                value = self._access(key, deadline.remaining())
+            except SecretNotFoundError:
+                logger.debug("Secret %s was not found in Google Secret Manager", key)
+                return None
+            except (SecretTimeoutError, *_BACKEND_FAILURES) as e:
+                # a failed key does not fail the other keys, failures are served stale once all keys are read
+                failures[key] = e
+                return None
+            self._put_cache(key, value)
+            return self._to_secret_value(value)
+
+        workers = min(self.settings.max_workers, len(missing))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="secretmanager-google") as pool:
+            for key, value in zip(missing, pool.map(access, missing)):
+                if value is not None:
+                    res[key] = value
+        if failures:
+            return self._serve_stale_many(res, failures)
+        return res
+
+    def add(self, key: str, value: JsonValue):
+        logger.info("Adding key %s to google secret manager", key)
+        try:
+            self._client.create_secret(
+                request={
+                    "parent": f"projects/{self._project}",
+                    "secret_id": key,
+                    "secret": {"replication": {"automatic": {}}},
+                }
+            )
+        # grpc raises AlreadyExists, the rest transport only maps the status code to its parent Conflict
+        except exceptions.Conflict as e:
+            raise SecretAlreadyExistsError(f"Secret {key} already exists") from e
+        return self.update(key, value)
+
+    def update(self, key: str, value: JsonValue):
+        logger.info("Updating key %s in google secret manager", key)
+        raw_value = self._serialize(value)
+        try:
+            version = self._client.add_secret_version(
+                request={"parent": self._secret_name(key), "payload": {"data": raw_value.encode()}}
+            )
+        except exceptions.NotFound as e:
+            raise SecretNotFoundError(f"Secret {key} was not found in Google Secret Manager") from e
+        self._pin(key, version.name)
+        self._put_cache(key, raw_value)
+        return SecretValue(value)
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in google secret manager")
+        return set(self.iter_secret_keys())
+
+    def iter_secret_keys(self):
+        request = {"parent": f"projects/{self._project}", "page_size": self.settings.page_size}
+        if self.settings.list_filter:
+            request["filter"] = self.settings.list_filter
+        # the pager requests the next page once the current one is exhausted
+        for secret in self._client.list_secrets(request=request):
+            yield secret.name.rpartition("/")[2]
+
+    def delete(self, key: str) -> None:
+        logger.info("Deleting key %s from google secret manager", key)
+        try:
+            self._client.delete_secret(request={"name": self._secret_name(key)})
+        except exceptions.NotFound as e:
+            raise SecretNotFoundError(f"Secret {key} was not found in Google Secret Manager") from e
+        finally:
+            self._unpin(key)
+            self._drop_cache(key)
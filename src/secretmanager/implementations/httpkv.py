@@ -0,0 +1,311 @@
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+from pydantic import JsonValue
+
+from secretmanager import tracing
+from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError, SecretTimeoutError
+from secretmanager.fork import ClientPool
+from secretmanager.settings import HttpSettings, Settings
+from secretmanager.store import AbstractSecretStore, Deadline, SecretValue, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+# clients hold the connection pool, hence there is a single client per service and connection settings
+_clients: ClientPool[tuple[Any, ...], httpx.Client] = ClientPool()
+
+# renewers do not survive a fork, the parent keeps renewing the tokens
+_renewers: ClientPool[tuple[int, str], "_TokenRenewer"] = ClientPool()
+
+# delay before renewing again after a failed renewal
+_RENEW_RETRY = 10.0
+
+
+def _is_backend_failure(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (httpx.TransportError, SecretTimeoutError))
+
+
+def _get_shared_client(url: str, settings: HttpSettings) -> httpx.Client:
+    def create() -> httpx.Client:
+        limits = httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+        with tracing.span("http.create_client"):
+            return httpx.Client(base_url=url, http2=settings.http2, verify=settings.verify, limits=limits)
+
+    key = (
+        url,
+        settings.http2,
+        settings.verify,
+        settings.max_connections,
+        settings.max_keepalive_connections,
+        settings.keepalive_expiry,
+    )
+    return _clients.get(key, create)
+
+
+class _TokenRenewer:
+    """
+    Renews a token in the background once two thirds of its time to live have passed
+    """
+
+    def __init__(self, client: httpx.Client, headers: dict[str, str]) -> None:
+        self._client = client
+        self._headers = headers
+        self._stop = threading.Event()
+        self.renewals = 0
+        threading.Thread(target=self._run, name="secretmanager-http-renew", daemon=True).start()
+
+    def _delay(self, ttl: Any, renewable: Any) -> float | None:
+        # tokens without a time to live, e.g. root tokens, never expire
+        if not renewable or not ttl:
+            return None
+        return float(ttl) * 2 / 3
+
+    def _lookup(self) -> float | None:
+        response = self._client.get("/v1/auth/token/lookup-self", headers=self._headers)
+        response.raise_for_status()
+        data = response.json()["data"]
+        return self._delay(data.get("ttl"), data.get("renewable"))
+
+    def _renew(self) -> float | None:
+        with tracing.span("http.renew_token"):
+            response = self._client.post("/v1/auth/token/renew-self", headers=self._headers, json={})
+        response.raise_for_status()
+        auth = response.json()["auth"]
+        self.renewals += 1
+        logger.debug("Renewed token for %ss", auth.get("lease_duration"))
+        return self._delay(auth.get("lease_duration"), auth.get("renewable"))
+
+    def _run(self) -> None:
+        try:
+            delay = self._lookup()
+        except httpx.HTTPError as e:
+            logger.warning("Failed to look up token, it is not renewed: %s", e)
+            return
+        while delay is not None and not self._stop.wait(delay):
+            try:
+                delay = self._renew()
+            except httpx.HTTPError as e:
+                logger.warning("Failed to renew token, retrying in %ss: %s", _RENEW_RETRY, e)
+                delay = _RENEW_RETRY
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def _start_renewer(client: httpx.Client, headers: dict[str, str]) -> _TokenRenewer:
+    return _renewers.get((id(client), headers["X-Vault-Token"]), lambda: _TokenRenewer(client, headers))
+
+
+class HttpKVStore(AbstractSecretStore[HttpSettings]):
+    """
+    A store backed by an HTTP secret service with a HashiCorp Vault style KV API
+
+    Requests go through a pooled keep-alive client, which is shared by all stores of the same service and can
+    multiplex requests over HTTP/2. Renewable tokens are renewed in the background. Batch reads request the
+    secrets in parallel, listing all secrets combines a recursive list with a batch read.
+    """
+
+    def __init__(self, url: str | None = None, token: str | None = None, client: httpx.Client | None = None) -> None:
+        """
+        Constructor
+
+        Args:
+            url: Address of the service. Defaults to the store settings or the environment variable VAULT_ADDR.
+            token: Token of the service. Defaults to the store settings or the environment variable VAULT_TOKEN.
+            client: Client to use instead of the shared client of the service. Defaults to None.
+        """
+        self.capabilities = StoreCapabilities(cacheable=True, read=True, write=True)
+        self.settings = Settings.http
+
+        url = url or self.settings.url or os.environ.get("VAULT_ADDR")
+        if url is None:
+            raise ValueError("No secret service url has been provided")
+        if token is None and self.settings.token is not None:
+            token = self.settings.token.get_secret_value()
+        token = token or os.environ.get("VAULT_TOKEN")
+        if token is None:
+            raise ValueError("No secret service token has been provided")
+
+        self._url = url
+        self._custom_client = client
+        # the connection settings of the client are fixed once the store is created
+        self._client_settings = self.settings.model_copy()
+        self._headers = {"X-Vault-Token": token}
+        if self.settings.namespace:
+            self._headers["X-Vault-Namespace"] = self.settings.namespace
+        self._renewer = _start_renewer(self._client, self._headers) if self.settings.renew_token else None
+
+    @property
+    def _client(self) -> httpx.Client:
+        return self._custom_client or _get_shared_client(self._url, self._client_settings)
+
+    def _path(self, key: str, kind: str = "data") -> str:
+        mount = self.settings.mount.strip("/")
+        if self.settings.kv_version == 1:
+            return f"/v1/{mount}/{quote(key)}"
+        return f"/v1/{mount}/{kind}/{quote(key)}"
+
+    def _request(self, method: str, path: str, timeout: float | None = None, **kwargs: Any) -> httpx.Response:
+        # without a timeout the default timeout of the client applies
+        request_timeout = timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        try:
+            with tracing.span("http.request", method=method):
+                return self._client.request(method, path, headers=self._headers, timeout=request_timeout, **kwargs)
+        except httpx.TimeoutException as e:
+            raise SecretTimeoutError(f"Request to {path} timed out after {timeout}s") from e
+
+    def _encode(self, value: JsonValue) -> dict[str, Any]:
+        # objects are stored as the fields of the secret, any other value in a single value field
+        if isinstance(value, dict):
+            return value
+        return {"value": value if isinstance(value, str) else self._serialize(value)}
+
+    def _decode(self, data: dict[str, Any]) -> str:
+        if data.keys() == {"value"} and isinstance(data["value"], str):
+            return data["value"]
+        return json.dumps(data, separators=(",", ":"))
+
+    def _read(self, key: str, timeout: float | None) -> str:
+        response = self._request("GET", self._path(key), timeout)
+        if response.status_code == 404:
+            raise SecretNotFoundError(f"Secret {key} was not found in {self._client.base_url}")
+        response.raise_for_status()
+        data = response.json()["data"]
+        return self._decode(data["data"] if self.settings.kv_version == 2 else data)
+
+    def get(self, key: str, timeout: float | None = None):
+        logger.info("Getting key %s from %s", key, self._client.base_url)
+
+        if cached_value := self._get_cache(key):
+            return self._to_secret_value(cached_value)
+
+        try:
+            value = self._read(key, self._resolve_timeout(timeout))
+        except (httpx.HTTPError, SecretTimeoutError) as e:
+            if not _is_backend_failure(e):
+                raise
+            return self._serve_stale(key, e)
+        self._put_cache(key, value)
+        return self._to_secret_value(value)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        res: dict[str, SecretValue] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            if cached_value := self._get_cache(key):
+                res[key] = self._to_secret_value(cached_value)
+            else:
+                missing.append(key)
+
+        if not missing:
+            return res
+
+        logger.info("Getting %s keys from %s", len(missing), self._client.base_url)
+        deadline = Deadline(self._resolve_timeout(timeout))
+
+        failures: dict[str, Exception] = {}
+        errors: dict[str, Exception] = {}
+
+        def read(key: str) -> SecretValue | None:
+            try:
+                value = self._read(key, deadline.remaining())
+            except SecretNotFoundError:
+                logger.debug("Secret %s was not found in %s", key, self._client.base_url)
+                return None
+            except (httpx.HTTPError, SecretTimeoutError) as e:
+                # a failed key does not fail the other keys, errors are raised together once all keys are read
+                if _is_backend_failure(e):
+                    failures[key] = e
+                else:
+                    errors[key] = e
+                return None
+            self._put_cache(key, value)
+            return self._to_secret_value(value)
+
+        workers = min(self.settings.max_workers, len(missing))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="secretmanager-http") as pool:
+            for key, value in zip(missing, pool.map(read, missing)):
+                if value is not None:
+                    res[key] = value
+        if failures or errors:
+            return self._serve_stale_many(res, failures, errors)
+        return res
+
+    def _write(self, key: str, value: JsonValue, cas: int | None = None) -> str:
+        data = self._encode(value)
+        body: dict[str, Any] = data
+        if self.settings.kv_version == 2:
+            body = {"data": data}
+            if cas is not None:
+                body["options"] = {"cas": cas}
+        response = self._request("POST", self._path(key), json=body)
+        # a check-and-set of 0 only succeeds if the secret does not exist yet
+        if cas == 0 and response.status_code == 400 and "check-and-set" in response.text:
+            raise SecretAlreadyExistsError(f"Secret {key} already exists")
+        response.raise_for_status()
+        raw_value = self._decode(data)
+        self._put_cache(key, raw_value)
+        return raw_value
+
+    def add(self, key: str, value: JsonValue):
+        logger.info("Adding key %s to %s", key, self._client.base_url)
+        if self.settings.kv_version == 1:
+            try:
+                self._read(key, self._resolve_timeout(None))
+            except SecretNotFoundError:
+                pass
+            else:
+                raise SecretAlreadyExistsError(f"Secret {key} already exists")
+        self._write(key, value, cas=0 if self.settings.kv_version == 2 else None)
+        return SecretValue(value)
+
+    def update(self, key: str, value: JsonValue):
+        logger.info("Updating key %s in %s", key, self._client.base_url)
+        self._write(key, value)
+        return SecretValue(value)
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in %s", self._client.base_url)
+        return set(self.iter_secret_keys())
+
+    def iter_secret_keys(self):
+        folders = [""]
+        while folders:
+            folder = folders.pop()
+            response = self._request("GET", self._path(folder, "metadata"), params={"list": "true"})
+            # an empty folder does not exist
+            if response.status_code == 404:
+                continue
+            response.raise_for_status()
+            for name in response.json()["data"]["keys"]:
+                if name.endswith("/"):
+                    folders.append(folder + name)
+                else:
+                    yield folder + name
+
+    def list_secrets(self):
+        return self.get_many(list(self.iter_secret_keys()))
+
+    def delete(self, key: str) -> None:
+        logger.info("Deleting key %s from %s", key, self._client.base_url)
+        try:
+            # deleting a missing secret succeeds, hence its existence is checked first
+            self._read(key, self._resolve_timeout(None))
+            # the metadata of version 2 secrets is deleted, which deletes all versions
+            response = self._request("DELETE", self._path(key, "metadata"))
+            response.raise_for_status()
+        finally:
+            self._drop_cache(key)
@@ -0,0 +1,322 @@
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import weakref
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from pydantic import JsonValue
+
+from secretmanager import tracing
+from secretmanager.error import SecretAlreadyExistsError, SecretDecryptionError, SecretNotFoundError
+from secretmanager.fork import register_at_fork
+from secretmanager.settings import LocalSettings, Settings
+from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+# A vault is a single file consisting of a fixed-size header followed by records. Each record is a random nonce
+# followed by AES-GCM ciphertext. Entries are authenticated with their key, the index with _INDEX_AAD.
+# The index maps keys to the offset and length of their entry and is appended after every write, only then the
+# header is updated to point to the new index. Hence an interrupted write leaves the previous state intact.
+MAGIC = b"SMVAULT\x00"
+VERSION = 1
+# magic, version, reserved, salt of the key derivation, offset and length of the current index
+_HEADER = struct.Struct(">8sHH16sQQ")
+HEADER_SIZE = 64
+_NONCE_SIZE = 12
+_INDEX_AAD = b"\x00index"
+# obsolete records are only compacted away once they take up a relevant amount of space
+_MIN_COMPACT_SIZE = 1 << 20
+
+
+def derive_key(passphrase: str | bytes, salt: bytes) -> bytes:
+    """
+    Derive the encryption key of a vault from a passphrase, a key of exactly 32 bytes is used as-is
+    """
+    if isinstance(passphrase, bytes) and len(passphrase) == 32:
+        return passphrase
+    if isinstance(passphrase, str):
+        passphrase = passphrase.encode()
+    return Scrypt(salt=salt, length=32, n=2**15, r=8, p=1).derive(passphrase)
+
+
+@dataclass(frozen=True)
+class _VaultState:
+    mm: mmap.mmap
+    index: dict[str, tuple[int, int]]
+    identity: tuple[int, int, int]
+    size: int
+    index_length: int
+
+    @property
+    def garbage(self) -> int:
+        live = HEADER_SIZE + self.index_length + sum(length for _, length in self.index.values())
+        return self.size - live
+
+
+def _identity(stat: os.stat_result) -> tuple[int, int, int]:
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+# the read-only mapping stays valid in a forked child, only the lock may have been held by another thread
+_stores: "weakref.WeakValueDictionary[int, LocalVaultStore]" = weakref.WeakValueDictionary()
+
+
+def _reset_locks() -> None:
+    for store in list(_stores.values()):
+        store._lock = threading.Lock()
+
+
+register_at_fork(after_in_child=_reset_locks)
+
+
+class LocalVaultStore(AbstractSecretStore[LocalSettings]):
+    """
+    A store backed by a single local file in which every entry is encrypted and authenticated individually
+
+    The file is memory-mapped, hence a lookup only decrypts the requested entry. Writes append to the file and
+    are visible to all stores of the same file, also across processes. Once obsolete entries exceed the
+    compaction threshold, the vault is rewritten and atomically replaced. Decrypted values are not cached.
+    """
+
+    def __init__(self, file: str | Path | None = None, key: str | bytes | None = None, create: bool = False) -> None:
+        """
+        Constructor
+
+        Args:
+            file: Path of the vault. Defaults to the store settings.
+            key: Passphrase or 32-byte key of the vault. Defaults to the store settings key or key_file.
+            create: Whether to create an empty vault if the file does not exist. Defaults to False.
+        """
+        self.capabilities = StoreCapabilities(cacheable=False, read=True, write=True)
+        self.settings = Settings.local
+
+        file = file or self.settings.file
+        if file is None:
+            raise ValueError("No vault file has been provided")
+        self._file = Path(file).expanduser().resolve()
+
+        if key is None and self.settings.key is not None:
+            key = self.settings.key.get_secret_value()
+        if key is None and self.settings.key_file is not None:
+            key = Path(self.settings.key_file).expanduser().read_text().strip()
+        if key is None:
+            raise ValueError("No vault key has been provided")
+        self._passphrase = key
+
+        self._salt: bytes | None = None
+        self._aead: AESGCM | None = None
+        self._lock = threading.Lock()
+        _stores[id(self)] = self
+
+        if not self._file.exists():
+            if not create:
+                raise ValueError(f"{self._file} does not exist")
+            self._create()
+        if not self._file.is_file():
+            raise ValueError(f"{self._file} is not a file")
+        self._state = self._open()
+
+    def _encrypt(self, data: bytes, aad: bytes) -> bytes:
+        assert self._aead is not None
+        nonce = os.urandom(_NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, data, aad)
+
+    def _decrypt(self, record: bytes, aad: bytes) -> bytes:
+        assert self._aead is not None
+        try:
+            return self._aead.decrypt(record[:_NONCE_SIZE], record[_NONCE_SIZE:], aad)
+        except InvalidTag as e:
+            raise SecretDecryptionError(f"Failed to decrypt {self._file}, the key is wrong or the file corrupt") from e
+
+    def _use_salt(self, salt: bytes) -> None:
+        if salt != self._salt:
+            self._aead = AESGCM(derive_key(self._passphrase, salt))
+            self._salt = salt
+
+    def _header(self, index_offset: int, index_length: int) -> bytes:
+        assert self._salt is not None
+        return _HEADER.pack(MAGIC, VERSION, 0, self._salt, index_offset, index_length).ljust(HEADER_SIZE, b"\x00")
+
+    def _create(self) -> None:
+        logger.info("Creating vault at %s", self._file)
+        self._use_salt(os.urandom(16))
+        index = self._encrypt(b"{}", _INDEX_AAD)
+        self._replace(self._header(HEADER_SIZE, len(index)) + index)
+
+    def _replace(self, content: bytes) -> None:
+        # write a temporary file next to the vault and atomically swap it in
+        fd, tmp = tempfile.mkstemp(prefix=f".{self._file.name}.", dir=self._file.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            Path(tmp).replace(self._file)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        dir_fd = os.open(self._file.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _open(self) -> _VaultState:
+        with self._file.open("rb") as f:
+            stat = os.fstat(f.fileno())
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+                raise ValueError(f"{self._file} is not a vault")
+            _, version, _, salt, index_offset, index_length = _HEADER.unpack_from(header)
+            if version != VERSION:
+                raise ValueError(f"Vault version {version} is not supported")
+            # the mapping stays valid after closing the file and after the file is replaced
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._use_salt(salt)
+        with tracing.span("local.read_index"):
+            raw_index = json.loads(self._decrypt(mm[index_offset : index_offset + index_length], _INDEX_AAD))
+        index = {key: (offset, length) for key, (offset, length) in raw_index.items()}
+        return _VaultState(mm, index, _identity(stat), stat.st_size, index_length)
+
+    def _current(self) -> _VaultState:
+        # a changed file, e.g. written by another process, is mapped again
+        state = self._state
+        if _identity(self._file.stat()) != state.identity:
+            with self._lock:
+                if _identity(self._file.stat()) != self._state.identity:
+                    self._state = self._open()
+                state = self._state
+        return state
+
+    def _read(self, state: _VaultState, key: str) -> str:
+        offset, length = state.index[key]
+        return self._decrypt(state.mm[offset : offset + length], key.encode()).decode()
+
+    def get(self, key: str, timeout: float | None = None):
+        state = self._current()
+        if key not in state.index:
+            raise SecretNotFoundError(f"Secret {key} was not found in {self._file}")
+        logger.info("Getting key %s from vault at %s", key, self._file)
+        return self._to_secret_value(self._read(state, key))
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        state = self._current()
+        return {key: self._to_secret_value(self._read(state, key)) for key in keys if key in state.index}
+
+    def _write(self, changes: dict[str, str | None], exists: bool | None = None) -> None:
+        """
+        Append entries and a new index, a value of None removes the key
+
+        Args:
+            changes: New values by key
+            exists: Whether the keys must exist (True) or must not exist (False). Defaults to None.
+        """
+        with self._lock:
+            while True:
+                with self._file.open("r+b") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    # the vault may have been compacted by another process while waiting for the lock
+                    if os.fstat(f.fileno()).st_ino != self._file.stat().st_ino:
+                        continue
+                    state = self._state = self._open()
+                    for key in changes:
+                        if exists is True and key not in state.index:
+                            raise SecretNotFoundError(f"Secret {key} was not found in {self._file}")
+                        if exists is False and key in state.index:
+                            raise SecretAlreadyExistsError(f"Secret {key} already exists")
+
+                    index = dict(state.index)
+                    offset = f.seek(0, os.SEEK_END)
+                    records = bytearray()
+                    for key, value in changes.items():
+                        if value is None:
+                            index.pop(key, None)
+                            continue
+                        record = self._encrypt(value.encode(), key.encode())
+                        index[key] = (offset + len(records), len(record))
+                        records += record
+                    raw_index = self._encrypt(json.dumps(index, separators=(",", ":")).encode(), _INDEX_AAD)
+                    index_offset = offset + len(records)
+
+                    f.write(records + raw_index)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    # the header is only updated once the new records are durable
+                    f.seek(0)
+                    f.write(self._header(index_offset, len(raw_index)))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                    state = self._state = self._open()
+                    threshold = self.settings.compact_threshold
+                    if threshold and state.garbage >= _MIN_COMPACT_SIZE and state.garbage / state.size > threshold:
+                        self._compact(state)
+                    return
+
+    def compact(self) -> None:
+        """
+        Rewrite the vault without obsolete entries and atomically replace it
+        """
+        with self._lock, self._file.open("rb") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            self._compact(self._open())
+
+    def _compact(self, state: _VaultState) -> None:
+        logger.info("Compacting vault at %s", self._file)
+        records = bytearray()
+        index: dict[str, tuple[int, int]] = {}
+        for key, (offset, length) in state.index.items():
+            # entries are bound to their key but not to their offset, hence they are copied as they are
+            index[key] = (HEADER_SIZE + len(records), length)
+            records += state.mm[offset : offset + length]
+        raw_index = self._encrypt(json.dumps(index, separators=(",", ":")).encode(), _INDEX_AAD)
+        header = self._header(HEADER_SIZE + len(records), len(raw_index))
+        self._replace(header + records + raw_index)
+        self._state = self._open()
+
+    def add(self, key: str, value: JsonValue):
+        logger.info("Adding key %s to vault at %s", key, self._file)
+        self._write({key: self._serialize(value)}, exists=False)
+        return SecretValue(value)
+
+    def update(self, key: str, value: JsonValue):
+        logger.info("Updating key %s in vault at %s", key, self._file)
+        self._write({key: self._serialize(value)})
+        return SecretValue(value)
+
+    def put_many(self, values: Mapping[str, JsonValue]):
+        # all values are appended and made durable at once, a failed batch is retried per key to attribute errors
+        logger.info("Putting %s keys to vault at %s", len(values), self._file)
+        try:
+            self._write({key: self._serialize(value) for key, value in values.items()})
+        except Exception:
+            return super().put_many(values)
+        return dict.fromkeys(values)
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in vault at %s", self._file)
+        return set(self._current().index)
+
+    def delete(self, key: str) -> None:
+        logger.info("Deleting key %s from vault at %s", key, self._file)
+        self._write({key: None}, exists=True)
+
+    def delete_many(self, keys: Iterable[str]):
+        keys = list(dict.fromkeys(keys))
+        logger.info("Deleting %s keys from vault at %s", len(keys), self._file)
+        try:
+            self._write(dict.fromkeys(keys), exists=True)
+        except Exception:
+            return super().delete_many(keys)
+        return dict.fromkeys(keys)
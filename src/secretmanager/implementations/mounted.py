@@ -0,0 +1,287 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from pydantic import JsonValue
+
+from secretmanager import tracing
+from secretmanager.error import SecretNotFoundError
+from secretmanager.fork import register_at_fork
+from secretmanager.settings import MountedSettings, Settings
+from secretmanager.store import AbstractSecretStore, StoreCapabilities
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) flags, a swap of the `..data` symlink by Kubernetes is reported as IN_MOVED_TO
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_MASK = (
+    0x2  # IN_MODIFY
+    | 0x4  # IN_ATTRIB
+    | 0x8  # IN_CLOSE_WRITE
+    | 0x40  # IN_MOVED_FROM
+    | 0x80  # IN_MOVED_TO
+    | 0x100  # IN_CREATE
+    | 0x200  # IN_DELETE
+    | 0x400  # IN_DELETE_SELF
+    | 0x800  # IN_MOVE_SELF
+)
+_IN_IGNORED = 0x8000
+_EVENT = struct.Struct("iIII")
+
+_indexes: dict[Path, "_DirectoryIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def _signature(directory: Path) -> tuple:
+    """
+    Get a signature of the secret files of the directory, which changes whenever a file is changed
+    """
+    signature = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # hidden entries include the `..data` symlink and the timestamped directories of Kubernetes
+            if entry.name.startswith("."):
+                continue
+            try:
+                # symlinks are followed, e.g. Kubernetes links every key to `..data/<key>`
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.is_file():
+                signature.append((entry.name, stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(signature))
+
+
+def _snapshot(directory: Path) -> tuple[dict[str, str], tuple]:
+    """
+    Read all secret files of the directory
+
+    Returns:
+        The contents by filename and the signature of the files
+    """
+    signature = _signature(directory)
+    index: dict[str, str] = {}
+    for name, *_ in signature:
+        try:
+            index[name] = (directory / name).read_text()
+        except FileNotFoundError:
+            continue
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning("Skipping mounted secret %s: %s", directory / name, e)
+    return index, signature
+
+
+class _Inotify:
+    """
+    Minimal inotify binding via ctypes watching a single directory
+    """
+
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Failed to watch {directory}")
+
+    def read(self) -> list[int]:
+        """
+        Read all pending events
+
+        Returns:
+            The masks of the events
+        """
+        masks = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return masks
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, offset)
+                masks.append(mask)
+                offset += _EVENT.size + length
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _DirectoryIndex:
+    """
+    In-memory contents of a directory of secret files, shared by all stores of the directory
+
+    With inotify, a background thread reloads the index as soon as the directory changes.
+    Otherwise the directory is checked for changes on lookup, at most every `poll_interval`.
+    """
+
+    def __init__(self, directory: Path, watch: str) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self.index, self._signature = self._load()
+        self._inotify: _Inotify | None = None
+        self.lost = False
+        self._stop_r, self._stop_w = -1, -1
+        if watch != "poll":
+            try:
+                self._inotify = _Inotify(directory)
+            except (OSError, AttributeError) as e:
+                if watch == "inotify":
+                    raise
+                logger.info("Polling %s as inotify is not available: %s", directory, e)
+            else:
+                self._stop_r, self._stop_w = os.pipe()
+                threading.Thread(target=self._watch, name="secretmanager-mounted", daemon=True).start()
+
+    @property
+    def watching(self) -> bool:
+        return self._inotify is not None
+
+    def _load(self) -> tuple[dict[str, str], tuple]:
+        with tracing.span("mounted.load"):
+            return _snapshot(self.directory)
+
+    def reload(self) -> None:
+        with self._lock:
+            self.index, self._signature = self._load()
+            self._checked_at = time.monotonic()
+
+    def _watch(self) -> None:
+        assert self._inotify is not None
+        inotify = self._inotify
+        while True:
+            ready, _, _ = select.select([inotify.fd, self._stop_r], [], [])
+            if self._stop_r in ready:
+                break
+            masks = inotify.read()
+            if any(mask & _IN_IGNORED for mask in masks):
+                # the directory itself is gone, e.g. unmounted, continue by polling
+                logger.warning("Lost watch of %s, falling back to polling", self.directory)
+                self._inotify = None
+                self.lost = True
+                os.close(self._stop_w)
+                break
+            logger.debug("Reloading %s after %s changes", self.directory, len(masks))
+            try:
+                self.reload()
+            except OSError as e:
+                logger.warning("Failed to reload %s: %s", self.directory, e)
+        inotify.close()
+        os.close(self._stop_r)
+
+    def refresh_if_due(self, interval: float) -> None:
+        if self.watching or time.monotonic() - self._checked_at < interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._checked_at < interval:
+                return
+            self._checked_at = time.monotonic()
+            if _signature(self.directory) != self._signature:
+                self.index, self._signature = self._load()
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify = None
+            os.write(self._stop_w, b"\x00")
+            os.close(self._stop_w)
+
+    def _after_fork(self) -> None:
+        # the watch thread does not exist in a forked child, the index is polled until it is replaced.
+        # Signaling the stop pipe would stop the thread of the parent, hence the descriptors are only closed.
+        self._lock = threading.Lock()
+        if self._inotify is not None:
+            for fd in (self._inotify.fd, self._stop_r, self._stop_w):
+                os.close(fd)
+            self._inotify = None
+            self.lost = True
+
+
+def _get_shared_index(directory: Path, watch: str) -> _DirectoryIndex:
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        # an index which lost its watch is replaced as soon as the directory is available again
+        if index is None or (index.lost and directory.is_dir()):
+            if index is not None:
+                index.close()
+            index = _indexes[directory] = _DirectoryIndex(directory, watch)
+        return index
+
+
+def _reset_indexes() -> None:
+    global _indexes_lock
+    _indexes_lock = threading.Lock()
+    for index in _indexes.values():
+        index._after_fork()
+
+
+register_at_fork(after_in_child=_reset_indexes)
+
+
+class MountedSecretStore(AbstractSecretStore[MountedSettings]):
+    """
+    A read-only store of secrets mounted as files into a directory, e.g. by Kubernetes or Docker Swarm
+
+    Every file name is a key and its content the value. All files are kept in memory, hence lookups do not
+    touch the disk. The index is reloaded on changes to the directory, including the atomic swaps of the
+    `..data` symlink by Kubernetes, such that rotated secrets are picked up immediately.
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        """
+        Constructor
+
+        Args:
+            directory: Directory of the secret files. Defaults to the store settings.
+        """
+        self.capabilities = StoreCapabilities(cacheable=False, read=True, write=False)
+        self.settings = Settings.mounted
+
+        self._directory = Path(directory or self.settings.directory).expanduser().resolve()
+        if not self._directory.exists():
+            raise ValueError(f"{self._directory} does not exist")
+        if not self._directory.is_dir():
+            raise ValueError(f"{self._directory} is not a directory")
+        self._index = _get_shared_index(self._directory, self.settings.watch)
+
+    def _current(self) -> dict[str, str]:
+        if self._index.lost:
+            self._index = _get_shared_index(self._directory, self.settings.watch)
+        self._index.refresh_if_due(self.settings.poll_interval)
+        return self._index.index
+
+    def get(self, key: str, timeout: float | None = None):
+        if (raw_value := self._current().get(key)) is None:
+            raise SecretNotFoundError(f"Secret {key} was not found in {self._directory}")
+        logger.info("Getting key %s from mounted secrets at %s", key, self._directory)
+        return self._to_secret_value(raw_value)
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        index = self._current()
+        return {key: self._to_secret_value(index[key]) for key in keys if key in index}
+
+    def add(self, key: str, value: JsonValue):
+        raise NotImplementedError("This store only supports reading")
+
+    def update(self, key: str, value: JsonValue):
+        raise NotImplementedError("This store only supports reading")
+
+    def list_secret_keys(self):
+        logger.info("List all secrets keys in mounted secrets at %s", self._directory)
+        return set(self._current())
+
+    def list_secrets(self):
+        return {key: self._to_secret_value(value) for key, value in self._current().items()}
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError("This store only supports reading")
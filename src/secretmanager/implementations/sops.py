@@ -1,15 +1,18 @@
 import logging
 import re
 import subprocess
+from collections.abc import Iterable
 from functools import lru_cache
 from pathlib import Path
 from typing import Literal
 
 from pydantic import JsonValue
 
-from secretmanager.error import SecretNotFoundError
+from secretmanager import tracing
+from secretmanager.error import SecretNotFoundError, SecretTimeoutError
 from secretmanager.settings import Settings, SopsSettings
 from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+from secretmanager.watch import FileSnapshotDiff, Watch, WatchCallback
 
 logger = logging.getLogger(__name__)
 
@@ -58,25 +61,41 @@ class SOPSSecretStore(AbstractSecretStore[SopsSettings]):
 
         self._options += ["--output-type=json"]
 
-    def _decrypt(self):
-        proc = subprocess.run([self._binary, "-d", *self._options, str(self._file)], capture_output=True)
+    def _decrypt(self, timeout: float | None = None):
+        try:
+            with tracing.span("sops.decrypt"):
+                proc = subprocess.run(
+                    [self._binary, "-d", *self._options, str(self._file)], capture_output=True, timeout=timeout
+                )
+        except subprocess.TimeoutExpired as e:
+            raise SecretTimeoutError(f"Decrypting {self._file} with sops timed out after {timeout}s") from e
         try:
             proc.check_returncode()
         except subprocess.CalledProcessError:
             raise RuntimeError(f"Failure in calling sops: {proc.stderr.decode()}")
         return proc.stdout
 
-    def get(self, key: str):
-        if cached_value := self._get_cache(key):
-            return SecretValue(self._deserialize(cached_value))
-
+    def _load(self, timeout: float | None = None) -> JsonValue:
         # put file content for caching
         raw_data = self._get_cache(str(self._file))
         if raw_data is None:
-            logger.info("Getting %s from sops store at %s", key, self._file)
-            raw_data = self._decrypt().decode()
-            self._put_cache(str(self._file), raw_data)
-        data = self._deserialize(raw_data)
+            logger.info("Decrypting sops store at %s", self._file)
+            try:
+                raw_data = self._decrypt(timeout=self._resolve_timeout(timeout)).decode()
+            except SecretTimeoutError as e:
+                if (raw_data := self._get_stale_cache(str(self._file))) is None:
+                    raise
+                logger.warning("Serving stale content of %s due to: %s", self._file, e)
+            else:
+                self._put_cache(str(self._file), raw_data)
+        return self._deserialize(raw_data)
+
+    def get(self, key: str, timeout: float | None = None):
+        if cached_value := self._get_cache(key):
+            return self._to_secret_value(cached_value)
+
+        logger.info("Getting %s from sops store at %s", key, self._file)
+        data = self._load(timeout=timeout)
 
         if isinstance(data, dict):
             value: JsonValue = data.get(key)
@@ -88,6 +107,16 @@ class SOPSSecretStore(AbstractSecretStore[SopsSettings]):
 
         return SecretValue(value)
 
+    def get_many(self, keys: Iterable[str], timeout: float | None = None):
+        logger.info("Getting multiple keys from sops store at %s", self._file)
+        data = self._load(timeout=timeout)
+        if not isinstance(data, dict):
+            raise NotImplementedError(
+                "This method only works if the encrypted file can be loaded as a dict, "
+                "e.g. it must contain key=value paris."
+            )
+        return {key: SecretValue(data[key]) for key in keys if data.get(key) is not None}
+
     def add(self, key: str, value: JsonValue):
         raise NotImplementedError("This store only supports reading")
 
@@ -96,8 +125,7 @@ class SOPSSecretStore(AbstractSecretStore[SopsSettings]):
 
     def list_secret_keys(self):
         logger.info("List all secrets keys in SOPS secret store")
-        raw_data = self._get_cache(str(self._file)) or self._decrypt().decode()
-        data = self._deserialize(raw_data)
+        data = self._load()
         if isinstance(data, dict):
             return set(data.keys())
 
@@ -111,3 +139,15 @@ class SOPSSecretStore(AbstractSecretStore[SopsSettings]):
 
     def delete(self, key: str) -> None:
         raise NotImplementedError("This store only supports reading")
+
+    def watch(
+        self, keys: Iterable[str] | None = None, callback: WatchCallback | None = None, interval: float | None = None
+    ):
+        def load() -> dict[str, JsonValue]:
+            # the cached content of the file is outdated once the file has been modified
+            self._drop_cache(str(self._file))
+            data = self._load()
+            return data if isinstance(data, dict) else {}
+
+        # the file is only decrypted again once it has been modified
+        return Watch(self, keys, callback, FileSnapshotDiff(self._file, load), interval or self.settings.watch_interval)
@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from secretmanager.bundle import SecretBundle
+from secretmanager.cache import CACHE
+from secretmanager.secret import Secret
+from secretmanager.settings import Settings, StoreSettings
+from secretmanager.store import AbstractSecretStore, SecretValue
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class SecretInjector:
+    """
+    Resolves a set of secrets once and injects them as keyword arguments into a function
+
+    Resolved values are reused for subsequent calls until they are older than the cache's `expires_in` setting
+    or cached values have been invalidated, e.g. by an update or a watcher. Without caching, every call resolves.
+    Keyword arguments passed explicitly by the caller take precedence over injected secrets.
+    """
+
+    def __init__(
+        self,
+        secrets: dict[str, str | Secret],
+        store: AbstractSecretStore | None = None,
+        settings: StoreSettings | None = None,
+        timeout: float | None = None,
+        raw: bool = False,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            secrets: Mapping of the function's parameter name to a key or Secret
+            store: Overwrites the global default store for secrets that do not define their own store.
+                Defaults to None.
+            settings: Settings that are used for all keys that are not already a Secret. Defaults to None.
+            timeout: Timeout in seconds for resolving all secrets. Defaults to None.
+            raw: Whether to inject the SecretValue instead of the parsed value. Defaults to False.
+        """
+        self.secrets = secrets
+        self.timeout = timeout
+        self.raw = raw
+        self.bundle = SecretBundle(
+            [s if isinstance(s, Secret) else Secret(s, settings=settings) for s in secrets.values()], store=store
+        )
+        self._keys = {param: s.key if isinstance(s, Secret) else s for param, s in secrets.items()}
+        self._values: dict[str, SecretValue | None] | None = None
+        self._resolved_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def resolve(self) -> dict[str, Any]:
+        """
+        Get the keyword arguments to inject, resolving the secrets if necessary
+        """
+        with self._lock:
+            if self._expired():
+                logger.debug("Resolving %s injected secrets", len(self.bundle))
+                # taken before resolving, such that an invalidation while resolving is not missed
+                generation = CACHE.generation
+                self._values = self.bundle._resolve(timeout=self.timeout)
+                self._resolved_at = time.monotonic()
+                self._generation = generation
+            values = self._values
+
+        if self.raw:
+            return {param: values[key] for param, key in self._keys.items()}
+        return {
+            param: values[key].get_secret_value() if values[key] is not None else None
+            for param, key in self._keys.items()
+        }
+
+    def _expired(self) -> bool:
+        return (
+            self._values is None
+            or not Settings.cache.enabled
+            or self._generation != CACHE.generation
+            or time.monotonic() - self._resolved_at > Settings.cache.expires_in
+        )
+
+    def refresh(self) -> None:
+        """Drop the resolved values, they are resolved again on the next call"""
+        with self._lock:
+            self._values = None
+
+    def __call__(self, func: F) -> F:
+        signature = inspect.signature(func)
+        if missing := [p for p in self.secrets if p not in signature.parameters]:
+            raise TypeError(f"{func.__name__} has no parameter(s) {', '.join(missing)} to inject secrets into")
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if self._expired() and not self._given(signature, args, kwargs).issuperset(self.secrets):
+                    # resolving reads from the stores, which must not block the event loop
+                    await asyncio.to_thread(self.resolve)
+                return await func(*args, **self._merge(signature, args, kwargs))
+
+            async_wrapper.injector = self  # type: ignore[attr-defined]
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return func(*args, **self._merge(signature, args, kwargs))
+
+        wrapper.injector = self  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    def _given(self, signature: inspect.Signature, args: tuple, kwargs: dict[str, Any]) -> set[str]:
+        # parameters given by the caller, either positional or as keyword, are not injected
+        return set(signature.bind_partial(*args, **kwargs).arguments)
+
+    def _merge(self, signature: inspect.Signature, args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+        given = self._given(signature, args, kwargs)
+        if given.issuperset(self.secrets):
+            return kwargs
+        injected = self.resolve()
+        return {**{k: v for k, v in injected.items() if k not in given}, **kwargs}
+
+
+def inject(
+    store: AbstractSecretStore | None = None,
+    settings: StoreSettings | None = None,
+    timeout: float | None = None,
+    raw: bool = False,
+    **secrets: str | Secret,
+) -> Callable[[F], F]:
+    """
+    Decorator to inject secrets as keyword arguments into a function
+
+    Example:
+        ```python
+        @inject(password="DB_PASSWORD", token=Secret("API_TOKEN", store=store))
+        def connect(host: str, password: str, token: str): ...
+        ```
+
+    Args:
+        store: Overwrites the global default store for secrets that do not define their own store. Defaults to None.
+        settings: Settings that are used for all keys that are not already a Secret. Defaults to None.
+        timeout: Timeout in seconds for resolving all secrets. Defaults to None.
+        raw: Whether to inject the SecretValue instead of the parsed value. Defaults to False.
+        secrets: Mapping of the function's parameter name to a key or Secret
+    """
+    return SecretInjector(secrets, store=store, settings=settings, timeout=timeout, raw=raw)
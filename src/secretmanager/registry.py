@@ -1,69 +1,156 @@
+import importlib
 import importlib.util
+import logging
 import shutil
+import threading
 import types
 from collections.abc import Callable
-from random import choice
 
-from secretmanager.implementations.aws import AWSSecretStore
-from secretmanager.implementations.dotenv import DotEnvStore
-from secretmanager.implementations.env import EnvVarStore
-from secretmanager.implementations.sops import SOPSSecretStore
+from secretmanager.error import BaseSecretError
 from secretmanager.settings import Settings, StoreChoice
 from secretmanager.store import AbstractSecretStore
 
+logger = logging.getLogger(__name__)
+
 # hugely inspired by fsspec registry implementation
 
 _registry: dict[str, Callable[..., AbstractSecretStore]] = {}
 registry = types.MappingProxyType(_registry)
+# lookups read the registry without locking, only registering takes the lock
+_registry_lock = threading.Lock()
 
 
 def register_implementation(name: str, implementation: Callable[..., AbstractSecretStore], replace=False):
-    if name in registry and replace is False:
-        if _registry[name] is not implementation:
-            raise ValueError(f"Name ({name}) already in the registry and replace is False")
-    else:
-        _registry[name] = implementation
+    with _registry_lock:
+        if name in registry and replace is False:
+            if _registry[name] is not implementation:
+                raise ValueError(f"Name ({name}) already in the registry and replace is False")
+        else:
+            _registry[name] = implementation
 
 
-def get_store_class(implementation: str | StoreChoice) -> Callable[..., AbstractSecretStore]:
+def is_available(implementation: str | StoreChoice) -> bool:
+    """
+    Whether a store is registered or its dependencies are installed, without importing the store
+    """
     if isinstance(implementation, StoreChoice):
         implementation = implementation.value
 
     if implementation in registry:
-        return registry[implementation]
-    else:
-        msg = f"Store {choice} is not registered."
-        if choice in _known_implementations:
-            msg += " " + _known_implementations[choice]["error"]
-        raise NotImplementedError(msg)
+        return True
+    if (known := _known_implementations.get(implementation)) is None or "class" not in known:
+        return False
+    if implementation == StoreChoice.SOPS.value:
+        return shutil.which(Settings.sops.binary or "sops") is not None
+    return all(_has_module(module) for module in known.get("requires", []))
+
+
+def _has_module(name: str) -> bool:
+    # find_spec imports the parent packages of a submodule, which fails if they are not installed
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+def get_store_class(implementation: str | StoreChoice) -> Callable[..., AbstractSecretStore]:
+    if isinstance(implementation, StoreChoice):
+        implementation = implementation.value
+
+    if (cls := registry.get(implementation)) is not None:
+        return cls
+
+    # known implementations are only imported once they are used to keep imports fast
+    if is_available(implementation):
+        module_name, _, class_name = _known_implementations[implementation]["class"].rpartition(".")
+        cls = getattr(importlib.import_module(module_name), class_name)
+        register_implementation(implementation, cls)
+        return cls
+
+    msg = f"Store {implementation} is not registered."
+    if implementation in _known_implementations:
+        msg += " " + _known_implementations[implementation]["error"]
+    raise NotImplementedError(msg)
 
 
 def get_store(implementation: str | StoreChoice, **kwargs) -> AbstractSecretStore:
     return get_store_class(implementation)(**kwargs)
 
 
+def get_default_store() -> AbstractSecretStore:
+    """
+    Get the global default store. If an agent socket is configured and reachable, the agent is used instead.
+    """
+    if Settings.agent_sock:
+        from secretmanager.agent import AgentStore
+
+        store = AgentStore(Settings.agent_sock)
+        try:
+            store.connect()
+        except BaseSecretError as e:
+            logger.debug("Agent is not reachable, using the default store directly: %s", e)
+        else:
+            return store
+    return get_store(Settings.default_store, **Settings.default_store_kwargs)
+
+
 _known_implementations = {
     StoreChoice.AWS.value: {
+        "class": "secretmanager.implementations.aws.AWSSecretStore",
+        "requires": ["botocore"],
         "dependency": "pip intsall secretmanager[aws]",
         "error": "Install required dependencies via secretmanager[aws]",
     },
     StoreChoice.AZURE.value: {
+        "class": "secretmanager.implementations.azure.AzureKeyVaultStore",
+        "requires": ["aiohttp", "azure.identity", "azure.keyvault.secrets"],
         "dependency": "pip intsall secretmanager[azure]",
         "error": "Install required dependencies via secretmanager[azure]",
     },
     StoreChoice.BITWARDEN.value: {
+        "class": "secretmanager.implementations.bitwarden.BitwardenSecretStore",
+        "requires": ["bitwarden_sdk"],
         "dependency": "pip intsall secretmanager[bitwarden]",
         "error": "Install required dependencies via secretmanager[bitwarden]",
     },
+    StoreChoice.CHAIN.value: {
+        "class": "secretmanager.implementations.chain.ChainedSecretStore",
+        "dependency": "",
+        "error": "Make sure that all stores of the chain are available.",
+    },
     StoreChoice.DOTENV.value: {
+        "class": "secretmanager.implementations.dotenv.DotEnvStore",
+        "requires": ["dotenv"],
         "dependency": "pip intsall secretmanager[dotenv]",
         "error": "Install required dependencies via secretmanager[dotenv]",
     },
+    StoreChoice.ENV.value: {"class": "secretmanager.implementations.env.EnvVarStore", "dependency": "", "error": ""},
     StoreChoice.GOOGLE.value: {
+        "class": "secretmanager.implementations.gc.GoogleSecretStore",
+        "requires": ["google.cloud.secretmanager"],
         "dependency": "pip intsall secretmanager[gc]",
         "error": "Install required dependencies via secretmanager[gc]",
     },
+    StoreChoice.HTTP.value: {
+        "class": "secretmanager.implementations.httpkv.HttpKVStore",
+        "requires": ["httpx"],
+        "dependency": "pip intsall secretmanager[http]",
+        "error": "Install required dependencies via secretmanager[http]",
+    },
+    StoreChoice.LOCAL.value: {
+        "class": "secretmanager.implementations.local.LocalVaultStore",
+        # writers lock the vault with flock, which is only available on POSIX systems
+        "requires": ["cryptography", "fcntl"],
+        "dependency": "pip intsall secretmanager[local]",
+        "error": "Install required dependencies via secretmanager[local], the store is not supported on Windows",
+    },
+    StoreChoice.MOUNTED.value: {
+        "class": "secretmanager.implementations.mounted.MountedSecretStore",
+        "dependency": "",
+        "error": "",
+    },
     StoreChoice.SOPS.value: {
+        "class": "secretmanager.implementations.sops.SOPSSecretStore",
         "dependency": "Install sops binary @ https://github.com/getsops/sops/releases",
         "error": (
             "Make sure the `sops` binary is installed and available via PATH. "
@@ -71,11 +158,3 @@ _known_implementations = {
         ),
     },
 }
-
-register_implementation(StoreChoice.ENV.value, EnvVarStore)
-if importlib.util.find_spec("dotenv"):
-    register_implementation(StoreChoice.DOTENV.value, DotEnvStore)
-if importlib.util.find_spec("botocore"):
-    register_implementation(StoreChoice.AWS.value, AWSSecretStore)
-if shutil.which(Settings.sops.binary or "sops"):
-    register_implementation(StoreChoice.SOPS.value, SOPSSecretStore)
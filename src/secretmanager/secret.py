@@ -1,7 +1,9 @@
 import logging
 from typing import Any
 
-from secretmanager.registry import get_store
+from secretmanager import tracing
+from secretmanager.decoding import decode_as
+from secretmanager.registry import get_default_store
 from secretmanager.settings import Settings, StoreSettings
 from secretmanager.store import AbstractSecretStore, SecretValue
 
@@ -17,7 +19,11 @@ class Secret:
     """
 
     def __init__(
-        self, key: str, store: AbstractSecretStore | None = None, settings: StoreSettings | None = None
+        self,
+        key: str,
+        store: AbstractSecretStore | None = None,
+        settings: StoreSettings | None = None,
+        type: Any = None,
     ) -> None:
         """
         Constructor
@@ -27,38 +33,46 @@ class Secret:
             store: Overwrites the global default store. Defaults to None.
             settings: Settings that overwrite the default store-sepcific StoreSettings as well as
                 the global StoreSettings. Defaults to None.
+            type: Type of the value, e.g. a pydantic model, which it is validated against. Defaults to any JSON value.
         """
         self.store = store
         self.key = key
+        self.type = type
         self._key = key  # potentially re-mapped key
         self.value: SecretValue | None = None
         self.settings = settings or StoreSettings()
         self._last_used_store: AbstractSecretStore | None = None
 
-    def __call__(self, store: AbstractSecretStore | None = None):
+    def __call__(self, store: AbstractSecretStore | None = None, timeout: float | None = None):
         """
         Retrieve secret from a store
 
         Args:
             store: Overwrites the Secret's default store as well as the global default store
+            timeout: Timeout in seconds, overwrites the store-specific and global timeout settings.
+                If it expires, a stale cache entry is served if available (see CacheSettings.max_staleness).
 
         Returns:
-            Parsed secret value
+            Parsed secret value, validated against the type of the secret if set
 
         Raises:
             NotImplementedError: If the Setting.default_store is not a valid store
+            SecretTimeoutError: If the timeout expired and there is no stale cache entry
             Exception: Any erorr when retrieving the secret from the store. Depends on the store implementation
         """
-        store = store or self.store or get_store(Settings.default_store, **Settings.default_store_kwargs)
+        store = self._resolve_store(store)
         self._last_used_store = store
 
         if self._filter_key(store.settings):
             return None
 
-        self._get_mapped_key(store.settings)
+        # the mapped key is kept local, as the same secret may be resolved by other threads with other stores
+        key = self._get_mapped_key(store.settings)
 
-        self.value = store.get(self._key)
+        self.value = store.get(key, timeout=timeout)
 
+        if self.type is not None:
+            return decode_as(self.value, self.type)
         return self.value.get_secret_value()
 
     def __eq__(self, other: Any) -> bool:
@@ -75,17 +89,19 @@ class Secret:
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.key})"
 
+    def _resolve_store(self, store: AbstractSecretStore | None = None) -> AbstractSecretStore:
+        return store or self.store or get_default_store()
+
     def _get_mapped_key(self, store_settings: StoreSettings) -> str:
         prefix = self.settings.prefix or store_settings.prefix or Settings.prefix
         suffix = self.settings.suffix or store_settings.suffix or Settings.suffix
 
-        mapped_key = self.key
-        if self.key in self.settings.mapping:
-            mapped_key = self.settings.mapping[self.key]
-        elif self.key in store_settings.mapping:
-            mapped_key = store_settings.mapping[self.key]
-        elif self.key in Settings.mapping:
-            mapped_key = Settings.mapping[self.key]
+        # every mapping is read once, such that settings updated by another thread cannot raise a KeyError
+        for mapping in (self.settings.mapping, store_settings.mapping, Settings.mapping):
+            if (mapped_key := mapping.get(self.key)) is not None:
+                break
+        else:
+            mapped_key = self.key
 
         self._key = prefix + mapped_key + suffix
         return self._key
@@ -96,3 +112,8 @@ class Secret:
             or self.key in store_settings.filter_key
             or self.key in Settings.filter_key
         )
+
+
+tracing.instrument(Secret, "__call__", "secret.resolve", attributes=lambda secret, *args, **kwargs: {"key": secret.key})
+tracing.instrument(Secret, "_resolve_store", "secret.resolve_store")
+tracing.instrument(Secret, "_get_mapped_key", "secret.map_key")
@@ -2,7 +2,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Annotated, Literal
 
-from pydantic import BaseModel, ConfigDict, Field, JsonValue
+from pydantic import BaseModel, ConfigDict, Field, JsonValue, SecretStr
 from pydantic_settings import (
     BaseSettings,
     JsonConfigSettingsSource,
@@ -25,9 +25,13 @@ class StoreChoice(str, Enum):
     AWS = "AWS"
     AZURE = "AZURE"
     BITWARDEN = "BITWARDEN"
+    CHAIN = "CHAIN"
     DOTENV = "DOTENV"
     ENV = "ENV"
     GOOGLE = "GC"
+    HTTP = "HTTP"
+    LOCAL = "LOCAL"
+    MOUNTED = "MOUNTED"
     SOPS = "SOPS"
 
 
@@ -39,6 +43,11 @@ class CacheSettings(ModelSettings):
     expires_in: int = Field(
         default=1 * 60 * 60, description="Time in seconds since last access after which the cache entry expires"
     )
+    max_staleness: int = Field(
+        default=0,
+        ge=0,
+        description="Time in seconds after expiry during which an entry is retained and served if a store fails",
+    )
 
 
 class StoreSettings(ModelSettings):
@@ -50,18 +59,127 @@ class StoreSettings(ModelSettings):
     filter_key: list[str] = Field(
         default_factory=list, description="List of keys to filter, is applied on an unmapped key"
     )
+    timeout: float | None = Field(
+        default=None, gt=0, description="Timeout in seconds for retrieving secrets, specific to this store"
+    )
+    watch_interval: float = Field(
+        default=1, gt=0, description="Time in seconds between two checks for changes of watched secrets"
+    )
+
+
+class CircuitBreakerSettings(ModelSettings):
+    enabled: bool = Field(default=False, description="Whether to enable the circuit breaker")
+    failure_threshold: int = Field(
+        default=5, ge=1, description="Number of consecutive failures after which the circuit opens"
+    )
+    reset_timeout: float = Field(
+        default=30, gt=0, description="Time in seconds after which an open circuit lets a trial request through"
+    )
+    max_staleness: int | None = Field(
+        default=None,
+        ge=0,
+        description="Time in seconds after expiry during which cached values are served on errors, "
+        "defaults to the cache setting and is limited by it",
+    )
 
 
 class AWSSettings(StoreSettings):
+    watch_interval: float = Field(
+        default=60, gt=0, description="Time in seconds between two checks for changes of watched secrets"
+    )
+    circuit_breaker: CircuitBreakerSettings = Field(
+        default_factory=CircuitBreakerSettings, description="Circuit breaker settings"
+    )
     deletion_policy: Literal["force"] | Annotated[int, Field(ge=7, le=30)] | None = Field(
         default=None, description="Deletion policy, either 'force' or an integer between 7-30."
     )
+    max_concurrency: int = Field(default=8, ge=1, description="Maximum number of concurrent writes of a batch")
+    max_retries: int = Field(
+        default=3, ge=0, description="Maximum number of retries of a throttled write, with exponential backoff"
+    )
+
+
+class AzureSettings(StoreSettings):
+    vault_url: str | None = Field(default=None, description="Url of the key vault, e.g. https://<name>.vault.azure.net")
+    max_concurrency: int = Field(default=16, ge=1, description="Maximum number of concurrent requests to the vault")
+    max_retries: int = Field(
+        default=3, ge=0, description="Maximum number of retries of a throttled request, respecting its Retry-After"
+    )
+    page_size: int | None = Field(default=None, ge=1, description="Number of secrets per page when listing")
+
+
+class BitwardenSettings(StoreSettings):
+    organization_id: str | None = Field(default=None, description="Organization of the secrets")
+    project_id: str | None = Field(default=None, description="Only serve secrets of this project, defaults to all")
+    api_url: str = Field(default="https://api.bitwarden.com", description="Url of the Bitwarden api")
+    identity_url: str = Field(default="https://identity.bitwarden.com", description="Url of the Bitwarden identity")
+    state_file: str | Path | None = Field(default=None, description="File to persist the authentication state in")
+    sync_interval: float = Field(
+        default=300, ge=0, description="Time in seconds after which the local index is synced with Bitwarden"
+    )
+    miss_sync_interval: float = Field(
+        default=5, ge=0, description="Minimum time in seconds between syncs triggered by a missing key"
+    )
 
 
 class DotEnvSettings(StoreSettings):
     file: str | Path | None = Field(default=None, description="Default .env filepath")
 
 
+class GoogleSettings(StoreSettings):
+    project: str | None = Field(
+        default=None, description="Google Cloud project of the secrets, defaults to the project of the credentials"
+    )
+    version: str = Field(default="latest", description="Version or alias of the secrets to access")
+    alias_ttl: float = Field(
+        default=300,
+        ge=0,
+        description="Time in seconds for which the version resolved from the latest alias is pinned per secret",
+    )
+    list_filter: str | None = Field(
+        default=None, description="Server-side filter applied when listing secrets, e.g. labels.env=prod"
+    )
+    page_size: int = Field(default=250, ge=1, le=25000, description="Number of secrets per page when listing")
+    max_workers: int = Field(default=8, ge=1, description="Maximum number of concurrent requests of a batch read")
+
+
+class HttpSettings(StoreSettings):
+    url: str | None = Field(default=None, description="Address of the secret service, defaults to VAULT_ADDR")
+    token: SecretStr | None = Field(default=None, description="Token of the secret service, defaults to VAULT_TOKEN")
+    namespace: str | None = Field(default=None, description="Namespace sent as X-Vault-Namespace header")
+    mount: str = Field(default="secret", description="Mount path of the KV secrets engine")
+    kv_version: Literal[1, 2] = Field(default=2, description="Version of the KV secrets engine")
+    http2: bool = Field(default=False, description="Whether to multiplex requests over HTTP/2, requires h2")
+    verify: bool | str = Field(default=True, description="Whether to verify TLS certificates or a CA bundle path")
+    max_connections: int = Field(default=20, ge=1, description="Maximum number of pooled connections")
+    max_keepalive_connections: int = Field(default=10, ge=0, description="Maximum number of idle connections")
+    keepalive_expiry: float = Field(default=30, ge=0, description="Seconds after which idle connections are closed")
+    max_workers: int = Field(default=8, ge=1, description="Maximum number of concurrent requests of a batch read")
+    renew_token: bool = Field(default=True, description="Whether to renew renewable tokens in the background")
+
+
+class LocalSettings(StoreSettings):
+    file: str | Path | None = Field(default=None, description="Default encrypted vault file")
+    key: SecretStr | None = Field(default=None, description="Passphrase of the vault")
+    key_file: str | Path | None = Field(default=None, description="File containing the passphrase of the vault")
+    compact_threshold: float = Field(
+        default=0.5,
+        ge=0,
+        le=1,
+        description="Share of obsolete bytes in the vault after which a write compacts the vault, 0 disables it",
+    )
+
+
+class MountedSettings(StoreSettings):
+    directory: str | Path = Field(default="/run/secrets", description="Directory of the mounted secret files")
+    watch: Literal["auto", "inotify", "poll"] = Field(
+        default="auto", description="How changes are detected, auto uses inotify if available and polls otherwise"
+    )
+    poll_interval: float = Field(
+        default=1.0, ge=0, description="Minimum seconds between two checks of the directory when polling"
+    )
+
+
 class SopsSettings(StoreSettings):
     binary: str | Path = Field(default="sops", description="Path to sops binary")
     file: str | Path | None = Field(default=None, description="Default encrypted sops file")
@@ -70,6 +188,23 @@ class SopsSettings(StoreSettings):
     )
 
 
+class ChainSettings(StoreSettings):
+    stores: list[str] = Field(
+        default_factory=lambda: [StoreChoice.ENV.value], description="Ordered list of stores to query one after another"
+    )
+    store_kwargs: dict[str, dict[str, JsonValue]] = Field(
+        default_factory=dict, description="Kwargs passed to the stores of the chain, keyed by the store name"
+    )
+    hedge_after: float | None = Field(
+        default=None,
+        ge=0,
+        description="Time in milliseconds after which the next store is queried in parallel, disabled if not set",
+    )
+    remember_owner: bool = Field(
+        default=True, description="Whether to remember which store owns a key and query it directly afterwards"
+    )
+
+
 class SettingsFactory(BaseSettings):
     default_store: str = Field(default=StoreChoice.ENV.value, description="Default store to use")
     default_store_kwargs: dict[str, JsonValue] = Field(
@@ -83,12 +218,28 @@ class SettingsFactory(BaseSettings):
     filter_key: list[str] = Field(
         default_factory=list, description="List of keys to filter globally, is applied on an unmapped key"
     )
+    timeout: float | None = Field(
+        default=None, gt=0, description="Timeout in seconds for retrieving secrets globally, disabled if not set"
+    )
+    agent_sock: str | None = Field(
+        default=None, description="Unix socket of a running secret agent, used instead of the default store if set"
+    )
+    lazy_decoding: bool = Field(
+        default=False, description="Whether to decode secret values on first access instead of when retrieved"
+    )
 
     cache: CacheSettings = Field(default_factory=CacheSettings, description="Cache settings")
 
     aws: AWSSettings = Field(default_factory=AWSSettings, description="AWS store settings")
+    azure: AzureSettings = Field(default_factory=AzureSettings, description="Azure key vault store settings")
+    bitwarden: BitwardenSettings = Field(default_factory=BitwardenSettings, description="Bitwarden store settings")
+    chain: ChainSettings = Field(default_factory=ChainSettings, description="Chained store settings")
     dotenv: DotEnvSettings = Field(default_factory=DotEnvSettings, description="Dotenv store settings")
     env: StoreSettings = Field(default_factory=StoreSettings, description="Environment variable store settings")
+    gc: GoogleSettings = Field(default_factory=GoogleSettings, description="Google Cloud store settings")
+    http: HttpSettings = Field(default_factory=HttpSettings, description="HTTP KV store settings")
+    local: LocalSettings = Field(default_factory=LocalSettings, description="Local encrypted vault store settings")
+    mounted: MountedSettings = Field(default_factory=MountedSettings, description="Mounted secrets store settings")
     sops: SopsSettings = Field(default_factory=SopsSettings, description="SOPS store settings")
 
     model_config = SettingsConfigDict(
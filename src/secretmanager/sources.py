@@ -0,0 +1,114 @@
+import logging
+import typing
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+from pydantic_settings import BaseSettings, PydanticBaseSettingsSource
+
+from secretmanager.bundle import SecretBundle
+from secretmanager.error import SecretBundleError, SecretNotFoundError
+from secretmanager.settings import StoreSettings
+from secretmanager.store import AbstractSecretStore
+
+logger = logging.getLogger(__name__)
+
+
+def _get_model(annotation: Any) -> type[BaseModel] | None:
+    # unwrap Optional[Model] and Annotated[Model, ...] to find a nested model
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    models = [m for arg in typing.get_args(annotation) if (m := _get_model(arg)) is not None]
+    return models[0] if len(models) == 1 else None
+
+
+class SecretManagerSettingsSource(PydanticBaseSettingsSource):
+    """
+    A pydantic-settings source that loads all fields of a settings class from secret stores
+
+    Every field, including the fields of nested models, is mapped to a key and all keys are resolved
+    with one batched fetch per store. Nested keys are joined via the `env_nested_delimiter` of the settings class,
+    e.g. the field `password` of a nested model in field `db` is looked up as `db__password`.
+    Keys that are not found are left to other sources or the field's default.
+
+    Example:
+        ```python
+        class AppSettings(BaseSettings):
+            @classmethod
+            def settings_customise_sources(
+                cls, settings_cls, init_settings, env_settings, dotenv_settings, file_secret_settings
+            ):
+                return (init_settings, env_settings, SecretManagerSettingsSource(settings_cls))
+        ```
+    """
+
+    def __init__(
+        self,
+        settings_cls: type[BaseSettings],
+        store: AbstractSecretStore | None = None,
+        settings: StoreSettings | None = None,
+        nested_delimiter: str | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            settings_cls: The settings class
+            store: Overwrites the global default store. Defaults to None.
+            settings: Settings that overwrite the default store-specific StoreSettings, e.g. to map field names
+                to other keys. Defaults to None.
+            nested_delimiter: Delimiter for keys of nested models. Defaults to the settings class's
+                `env_nested_delimiter` or `__`.
+            timeout: Timeout in seconds for resolving all fields. Defaults to None.
+        """
+        super().__init__(settings_cls)
+        self.store = store
+        self.settings = settings
+        self.nested_delimiter = nested_delimiter or self.config.get("env_nested_delimiter") or "__"
+        self.timeout = timeout
+        self._values: dict[str, Any] | None = None
+
+    def _collect_keys(self, model: type[BaseModel], prefix: str = "") -> dict[str, tuple[str, ...]]:
+        keys: dict[str, tuple[str, ...]] = {}
+        for name, field in model.model_fields.items():
+            field_key = field.alias or name
+            key = prefix + field_key
+            if (nested := _get_model(field.annotation)) is not None:
+                for nested_key, path in self._collect_keys(nested, prefix=key + self.nested_delimiter).items():
+                    keys[nested_key] = (field_key, *path)
+            else:
+                keys[key] = (field_key,)
+        return keys
+
+    def _load(self) -> dict[str, Any]:
+        keys = self._collect_keys(self.settings_cls)
+        bundle = SecretBundle(keys, store=self.store, settings=self.settings)
+        try:
+            bundle._resolve(timeout=self.timeout)
+        except SecretBundleError as e:
+            if errors := {k: v for k, v in e.errors.items() if not isinstance(v, SecretNotFoundError)}:
+                raise SecretBundleError(errors, e.values) from e
+            logger.debug("Secrets %s were not found for %s", ", ".join(e.errors), self.settings_cls.__name__)
+
+        data: dict[str, Any] = {}
+        for key, value in bundle.values.items():
+            if value is None:
+                continue
+            *parents, field_key = keys[key]
+            target = data
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[field_key] = value.get_secret_value()
+        return data
+
+    def get_field_value(self, field: FieldInfo, field_name: str) -> tuple[Any, str, bool]:
+        if self._values is None:
+            self._values = self._load()
+        field_key = field.alias or field_name
+        return self._values.get(field_key), field_key, False
+
+    def __call__(self) -> dict[str, Any]:
+        if self._values is None:
+            self._values = self._load()
+        return self._values
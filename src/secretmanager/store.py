@@ -1,19 +1,56 @@
 import logging
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from typing import Any, Protocol, TypeVar
 
-from pydantic import BaseModel, JsonValue, TypeAdapter, ValidationError
-from pydantic import Secret as PydanticSecret
+from pydantic import BaseModel, JsonValue, TypeAdapter
 
+from secretmanager import tracing
 from secretmanager.cache import CACHE
+from secretmanager.decoding import JSON_VALUE, LazySecretValue, decode
+from secretmanager.error import SecretAlreadyExistsError, SecretBundleError, SecretNotFoundError, SecretTimeoutError
 from secretmanager.settings import AWSSettings, DotEnvSettings, Settings, StoreSettings
+from secretmanager.value import SecretValue
+from secretmanager.watch import Watch, WatchCallback
 
 logger = logging.getLogger(__name__)
 
-SecretValue = PydanticSecret[JsonValue]
-
 
 S = TypeVar("S", StoreSettings, AWSSettings, DotEnvSettings)
 
+# operations of every store implementation which are traced, see secretmanager.tracing
+TRACED_OPERATIONS = ("get", "get_many", "add", "update", "delete", "list_secret_keys")
+
+
+def _key_attributes(store: Any, key: Any = None, *args: Any, **kwargs: Any) -> dict[str, Any]:
+    # only the key is recorded, never values
+    return {"store": store.__class__.__name__, "key": key}
+
+
+class Deadline:
+    """Tracks the remaining time of a timeout that spans multiple calls"""
+
+    def __init__(self, timeout: float | None) -> None:
+        self.timeout = timeout
+        self._expires_at = time.monotonic() + timeout if timeout is not None else None
+
+    def remaining(self) -> float | None:
+        """
+        Remaining time in seconds or None if there is no deadline
+
+        Raises:
+            SecretTimeoutError: If the deadline has already passed
+        """
+        if self._expires_at is None:
+            return None
+        remaining = self._expires_at - time.monotonic()
+        if remaining <= 0:
+            raise SecretTimeoutError(f"Deadline of {self.timeout}s exceeded")
+        return remaining
+
 
 class StoreCapabilities(BaseModel):
     """Model to indicate store's capabilities such as caching, read, writing"""
@@ -35,25 +72,141 @@ class AbstractSecretStore(Protocol[S]):
 
     capabilities: StoreCapabilities
     settings: S
-    # TODO: can we make this dynamic as such user can provide their own TypeAdapter?
-    parser = TypeAdapter[JsonValue](JsonValue)
+    # values are decoded as generic JSON, specific types are declared per key, see Secret
+    parser: TypeAdapter[JsonValue] = JSON_VALUE
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        for operation in TRACED_OPERATIONS:
+            if operation in cls.__dict__:
+                tracing.instrument(cls, operation, f"store.{operation}", attributes=_key_attributes)
 
-    def get(self, key: str) -> SecretValue: ...
+    def get(self, key: str, timeout: float | None = None) -> SecretValue: ...
+
+    def get_many(self, keys: Iterable[str], timeout: float | None = None) -> dict[str, SecretValue]:
+        """
+        Retrieve multiple secrets at once. Keys that are not found in the store are omitted from the result.
+
+        Stores should overwrite this method if their backend supports fetching multiple secrets in one call.
+        The timeout is a deadline for the entire batch.
+        """
+        deadline = Deadline(self._resolve_timeout(timeout))
+        res: dict[str, SecretValue] = {}
+        for key in keys:
+            try:
+                res[key] = self.get(key, timeout=deadline.remaining())
+            except SecretNotFoundError:
+                logger.debug("Secret %s was not found in %s", key, self.__class__.__name__)
+        return res
 
     def add(self, key: Any, value: JsonValue) -> SecretValue: ...
 
     def update(self, key: Any, value: JsonValue) -> SecretValue: ...
 
+    def put_many(self, values: Mapping[str, JsonValue]) -> dict[str, Exception | None]:
+        """
+        Write multiple secrets at once, secrets are added or updated if they already exist.
+
+        A failed write does not abort the batch. Stores should overwrite this method if their backend supports
+        writing multiple secrets in one call or concurrently.
+
+        Returns:
+            A mapping of every key to the error of its write, None if the write succeeded
+        """
+        res: dict[str, Exception | None] = {}
+        for key, value in values.items():
+            try:
+                try:
+                    self.add(key, value)
+                except SecretAlreadyExistsError:
+                    self.update(key, value)
+                res[key] = None
+            except Exception as e:
+                logger.warning("Failed to write secret %s to %s: %s", key, self.__class__.__name__, e)
+                res[key] = e
+        return res
+
+    def delete_many(self, keys: Iterable[str]) -> dict[str, Exception | None]:
+        """
+        Delete multiple secrets at once, a failed delete does not abort the batch.
+
+        Stores should overwrite this method if their backend supports deleting multiple secrets in one call or
+        concurrently.
+
+        Returns:
+            A mapping of every key to the error of its delete, None if the delete succeeded
+        """
+        res: dict[str, Exception | None] = {}
+        for key in keys:
+            try:
+                self.delete(key)
+                res[key] = None
+            except Exception as e:
+                logger.warning("Failed to delete secret %s from %s: %s", key, self.__class__.__name__, e)
+                res[key] = e
+        return res
+
     def list_secret_keys(self) -> set[str]: ...
 
+    def iter_secret_keys(self) -> Iterator[str]:
+        """
+        Iterate over all secret keys in the store.
+
+        Stores with a paginated backend should overwrite this method to yield keys while paginating.
+        """
+        yield from self.list_secret_keys()
+
     def list_secrets(self) -> dict[str, SecretValue]:
         """
         Lists all secrets in the store including their value.
         """
         return {k: self.get(k) for k in self.list_secret_keys()}
 
+    def iter_secrets(
+        self, keys: Iterable[str] | None = None, batch_size: int = 100, max_workers: int = 4
+    ) -> Iterator[tuple[str, SecretValue]]:
+        """
+        Iterate over secrets including their value while keeping memory usage flat.
+
+        Keys are fetched in batches via `get_many`, at most `max_workers` batches are in flight at a time.
+        Secrets are yielded in the order of the keys, keys that are not found are skipped.
+
+        Args:
+            keys: Keys to iterate over. Defaults to all keys of the store.
+            batch_size: Number of keys per `get_many` call. Defaults to 100.
+            max_workers: Maximum number of concurrent batches. Defaults to 4.
+        """
+        key_iter = iter(keys) if keys is not None else self.iter_secret_keys()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="secretmanager-iter") as pool:
+            in_flight: deque[tuple[list[str], Future[dict[str, SecretValue]]]] = deque()
+            while True:
+                while len(in_flight) < max_workers and (batch := list(islice(key_iter, batch_size))):
+                    in_flight.append((batch, pool.submit(self.get_many, batch)))
+                if not in_flight:
+                    break
+                batch, future = in_flight.popleft()
+                values = future.result()
+                for key in batch:
+                    if key in values:
+                        yield key, values[key]
+
     def delete(self, key: str) -> None: ...
 
+    def watch(
+        self, keys: Iterable[str] | None = None, callback: WatchCallback | None = None, interval: float | None = None
+    ) -> Watch:
+        """
+        Watch secrets for changes, changed secrets are dropped from the cache as soon as the change is detected.
+
+        Stores which can detect changes cheaply should overwrite this method, others do not support watching.
+
+        Args:
+            keys: Keys to watch. Defaults to all keys of the store.
+            callback: Called for every changed key with its new value, None if the secret was deleted.
+            interval: Time in seconds between two checks. Defaults to the store setting `watch_interval`.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support watching")
+
     def __eq__(self, other: Any) -> bool:
         return (
             isinstance(other, self.__class__)
@@ -67,11 +220,17 @@ class AbstractSecretStore(Protocol[S]):
 
     def _deserialize(self, raw_value: str) -> JsonValue:
         # value could be invalid-json, e.g. the store returns just a plain-text string
-        try:
-            value = self.parser.validate_json(raw_value)
-        except ValidationError:
-            value = self.parser.validate_python(raw_value)
-        return value
+        return decode(raw_value, self.parser)
+
+    def _to_secret_value(self, raw_value: str) -> SecretValue:
+        if Settings.lazy_decoding:
+            return LazySecretValue(raw_value, self.parser)
+        return SecretValue(self._deserialize(raw_value))
+
+    def _resolve_timeout(self, timeout: float | None) -> float | None:
+        if timeout is not None:
+            return timeout
+        return self.settings.timeout if self.settings.timeout is not None else Settings.timeout
 
     def _construct_key(self, key: str) -> str:
         # considered duplicated keys for same class name!?
@@ -83,12 +242,65 @@ class AbstractSecretStore(Protocol[S]):
             value_json = value if value is not None else None
             return CACHE.put(key=key, value=value_json)
 
+    def _put_cache_many(self, values: Mapping[str, str | None]) -> None:
+        if values and self.capabilities.cacheable and Settings.cache.enabled:
+            return CACHE.put_many({self._construct_key(key): value for key, value in values.items()})
+
     def _get_cache(self, key: str) -> str | None:
         if self.capabilities.cacheable and Settings.cache.enabled:
             key = self._construct_key(key)
             return CACHE.get(key=key)
 
+    def _get_stale_cache(self, key: str, max_staleness: float | None = None) -> str | None:
+        if self.capabilities.cacheable and Settings.cache.enabled:
+            key = self._construct_key(key)
+            return CACHE.get_stale(key=key, max_staleness=max_staleness)
+
+    def _serve_stale(self, key: str, error: Exception, max_staleness: float | None = None) -> SecretValue:
+        """
+        Serve an expired cache entry if available, otherwise raise the given error
+        """
+        if (stale_value := self._get_stale_cache(key, max_staleness=max_staleness)) is None:
+            raise error
+        logger.warning("Serving stale value for key %s due to: %s", key, error)
+        return self._to_secret_value(stale_value)
+
+    def _serve_stale_many(
+        self,
+        res: dict[str, SecretValue],
+        failures: Mapping[str, Exception],
+        errors: Mapping[str, Exception] | None = None,
+        max_staleness: float | None = None,
+    ) -> dict[str, SecretValue]:
+        """
+        Serve expired cache entries for keys whose retrieval failed due to the backend
+
+        Raises:
+            SecretBundleError: With the values retrieved so far, if a failed key has no stale entry or there are
+                other errors
+        """
+        failed = dict(errors or {})
+        for key, error in failures.items():
+            if (stale_value := self._get_stale_cache(key, max_staleness=max_staleness)) is None:
+                failed[key] = error
+                continue
+            logger.warning("Serving stale value for key %s due to: %s", key, error)
+            res[key] = self._to_secret_value(stale_value)
+        if failed:
+            raise SecretBundleError(failed, res)
+        return res
+
     def _drop_cache(self, key: str) -> None:
         if self.capabilities.cacheable and Settings.cache.enabled:
             key = self._construct_key(key)
             return CACHE.remove(key=key)
+
+    def _drop_cache_many(self, keys: Iterable[str]) -> None:
+        if self.capabilities.cacheable and Settings.cache.enabled:
+            return CACHE.remove_many(self._construct_key(key) for key in keys)
+
+
+tracing.instrument(AbstractSecretStore, "_get_cache", "cache.get", result_attributes=lambda v: {"hit": v is not None})
+tracing.instrument(AbstractSecretStore, "_put_cache", "cache.put")
+tracing.instrument(AbstractSecretStore, "_deserialize", "store.deserialize")
+tracing.instrument(AbstractSecretStore, "_to_secret_value", "store.to_secret_value")
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from itertools import islice
+
+from pydantic import JsonValue
+
+from secretmanager.settings import StoreSettings
+from secretmanager.store import AbstractSecretStore, SecretValue
+
+logger = logging.getLogger(__name__)
+
+
+class SyncAction(str, Enum):
+    ADD = "add"
+    UPDATE = "update"
+    UNCHANGED = "unchanged"
+
+
+@dataclass(frozen=True)
+class SyncChange:
+    """
+    Outcome of syncing a single secret, `error` is set if writing it to the target failed
+    """
+
+    key: str
+    target_key: str
+    action: SyncAction
+    error: BaseException | None = None
+
+
+def digest(value: JsonValue) -> bytes:
+    """
+    Content hash of a value, independent of the formatting and key order of the stored JSON
+    """
+    content = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(content.encode(), digest_size=16).digest()
+
+
+def map_key(key: str, settings: StoreSettings, source_prefix: str = "") -> str | None:
+    """
+    Map a key of the source to the key of the target
+
+    Only keys starting with `source_prefix` are synced, the prefix is removed before the key is mapped.
+    Keys in `settings.filter_key` are skipped, others are renamed by `settings.mapping` and get the
+    prefix and suffix of the settings, the same way as Secret maps a key to a store.
+
+    Returns:
+        The key of the target or None if the key is not synced
+    """
+    if not key.startswith(source_prefix):
+        return None
+    key = key[len(source_prefix) :]
+    if key in settings.filter_key:
+        return None
+    return settings.prefix + settings.mapping.get(key, key) + settings.suffix
+
+
+def _diff(
+    target: AbstractSecretStore, batch: list[tuple[str, str, SecretValue]], existing: set[str], timeout: float | None
+) -> list[tuple[str, str, SyncAction, JsonValue]]:
+    # only secrets which exist in the target are read from it, new secrets are added without a read
+    present = [target_key for _, target_key, _ in batch if target_key in existing]
+    for target_key in present:
+        # compare against the current value rather than a cached one
+        target._drop_cache(target_key)
+    current = {
+        key: digest(value.get_secret_value()) for key, value in target.get_many(present, timeout=timeout).items()
+    }
+
+    changes = []
+    for key, target_key, value in batch:
+        value = value.get_secret_value()
+        if target_key not in current:
+            changes.append((key, target_key, SyncAction.ADD, value))
+        elif current[target_key] != digest(value):
+            changes.append((key, target_key, SyncAction.UPDATE, value))
+        else:
+            changes.append((key, target_key, SyncAction.UNCHANGED, value))
+    return changes
+
+
+def _apply(
+    target: AbstractSecretStore,
+    batch: list[tuple[str, str, SecretValue]],
+    existing: set[str],
+    dry_run: bool,
+    timeout: float | None,
+) -> list[SyncChange]:
+    try:
+        changes = _diff(target, batch, existing, timeout)
+    except Exception as e:
+        # the batch cannot be compared, it is reported as failed without aborting the sync
+        logger.warning("Failed to read %s secrets from target: %s", len(batch), e)
+        return [
+            SyncChange(key, target_key, SyncAction.UPDATE if target_key in existing else SyncAction.ADD, e)
+            for key, target_key, _ in batch
+        ]
+
+    errors: dict[str, Exception | None] = {}
+    if not dry_run:
+        # changed secrets of the batch are written at once, the store reports the outcome per key
+        writes = {target_key: value for _, target_key, action, value in changes if action != SyncAction.UNCHANGED}
+        if writes:
+            errors = target.put_many(writes)
+    return [SyncChange(key, target_key, action, errors.get(target_key)) for key, target_key, action, _ in changes]
+
+
+def sync(
+    source: AbstractSecretStore,
+    target: AbstractSecretStore,
+    keys: Iterable[str] | None = None,
+    settings: StoreSettings | None = None,
+    source_prefix: str = "",
+    dry_run: bool = False,
+    batch_size: int = 100,
+    max_workers: int = 4,
+    timeout: float | None = None,
+) -> Iterator[SyncChange]:
+    """
+    Replicate secrets from one store to another, only changed secrets are written
+
+    Secrets of the source are streamed in batches. For every batch, the secrets which already exist in the
+    target are read from it and compared by their content hash, new secrets are added without reading them.
+    Batches are compared and written concurrently by at most `max_workers` workers, the changed secrets of a
+    batch are written by a single `put_many` call. A failed write does not abort the sync but is reported by its
+    change.
+
+    Args:
+        source: Store to read the secrets from
+        target: Store to write the secrets to
+        keys: Keys of the source to sync. Defaults to all keys of the source.
+        settings: Rules to map keys of the source to keys of the target, see `map_key`. Defaults to None.
+        source_prefix: Only keys of the source with this prefix are synced, it is removed from the key.
+            Defaults to "".
+        dry_run: Whether to only compare the secrets without writing them. Defaults to False.
+        batch_size: Number of secrets per batch. Defaults to 100.
+        max_workers: Maximum number of batches in flight. Defaults to 4.
+        timeout: Timeout in seconds for reading a batch from the target. Defaults to None.
+
+    Returns:
+        An iterator of the changes in the order of the keys of the source, including unchanged secrets
+
+    Raises:
+        ValueError: If the target does not support writing and it is not a dry run
+    """
+    if not dry_run and not target.capabilities.write:
+        raise ValueError(f"{target.__class__.__name__} does not support writing")
+    return _sync(
+        source, target, keys, settings or StoreSettings(), source_prefix, dry_run, batch_size, max_workers, timeout
+    )
+
+
+def _sync(
+    source: AbstractSecretStore,
+    target: AbstractSecretStore,
+    keys: Iterable[str] | None,
+    settings: StoreSettings,
+    source_prefix: str,
+    dry_run: bool,
+    batch_size: int,
+    max_workers: int,
+    timeout: float | None,
+) -> Iterator[SyncChange]:
+    existing = set(target.iter_secret_keys())
+    key_iter = keys if keys is not None else source.iter_secret_keys()
+    source_keys = (key for key in key_iter if map_key(key, settings, source_prefix) is not None)
+    secrets = (
+        (key, map_key(key, settings, source_prefix), value)
+        for key, value in source.iter_secrets(source_keys, batch_size=batch_size, max_workers=max_workers)
+    )
+    logger.info("Syncing secrets from %s to %s", source.__class__.__name__, target.__class__.__name__)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="secretmanager-sync") as pool:
+        in_flight: deque[Future[list[SyncChange]]] = deque()
+        while True:
+            while len(in_flight) < max_workers and (batch := list(islice(secrets, batch_size))):
+                in_flight.append(pool.submit(_apply, target, batch, existing, dry_run, timeout))
+            if not in_flight:
+                break
+            yield from in_flight.popleft().result()
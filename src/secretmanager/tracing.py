@@ -0,0 +1,356 @@
+import functools
+import itertools
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Mapping
+from contextvars import ContextVar, Token
+from typing import Any, Protocol
+
+from pydantic import Secret as PydanticSecret
+
+from secretmanager.value import SecretValue
+
+AttributeValue = str | bool | int | float
+_ATTRIBUTE_TYPES = (str, bool, int, float)
+# SecretValue, and hence LazySecretValue, is not a pydantic Secret
+_SECRET_TYPES = (PydanticSecret, SecretValue)
+
+# attributes with these names are never recorded, spans must only describe the lookup, never its result
+_DENIED_ATTRIBUTES = frozenset({"value", "values", "secret", "secret_value", "raw_value"})
+
+
+class Span(Protocol):
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+    def end(self, error: BaseException | None = None) -> None: ...
+
+
+class Tracer(Protocol):
+    """
+    A tracer receives a span for every traced operation, e.g. an OpenTelemetry tracer or the SamplingProfiler
+    """
+
+    def start_span(self, name: str, attributes: dict[str, AttributeValue]) -> Span: ...
+
+
+AttributesFunc = Callable[..., dict[str, Any]]
+
+_tracer: Tracer | None = None
+
+# instrumented methods (class, attribute, span name, attributes of the call, attributes of the result)
+_instrumented: list[tuple[type, str, str, AttributesFunc | None, AttributesFunc | None]] = []
+_originals: dict[tuple[type, str], Any] = {}
+_lock = threading.RLock()
+
+
+def set_tracer(tracer: Tracer | None) -> Tracer | None:
+    """
+    Set the global tracer, None disables tracing. Returns the previous tracer.
+
+    Instrumented methods are only wrapped while a tracer is set, hence tracing has no overhead when disabled.
+    """
+    global _tracer
+    with _lock:
+        previous, _tracer = _tracer, tracer
+        if previous is None and tracer is not None:
+            for instrumented in _instrumented:
+                _wrap(*instrumented)
+        elif previous is not None and tracer is None:
+            for (cls, attribute), original in _originals.items():
+                setattr(cls, attribute, original)
+            _originals.clear()
+    return previous
+
+
+def get_tracer() -> Tracer | None:
+    return _tracer
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def _is_safe(key: str, value: Any) -> bool:
+    return (
+        key not in _DENIED_ATTRIBUTES and isinstance(value, _ATTRIBUTE_TYPES) and not isinstance(value, _SECRET_TYPES)
+    )
+
+
+def safe_attributes(attributes: Mapping[str, Any]) -> dict[str, AttributeValue]:
+    """
+    Drop attributes that could contain secret values, only scalar attributes are kept
+    """
+    return {k: v for k, v in attributes.items() if _is_safe(k, v)}
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self, error: BaseException | None = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("_span",)
+
+    def __init__(self, span: Span) -> None:
+        self._span = span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if _is_safe(key, value):
+            self._span.set_attribute(key, value)
+
+    def end(self, error: BaseException | None = None) -> None:
+        self._span.end(error)
+
+    def __enter__(self) -> "_ActiveSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        self._span.end(exc)
+
+
+def span(name: str, **attributes: Any) -> _ActiveSpan | _NoopSpan:
+    """
+    Context manager which traces the enclosed block. If tracing is disabled, a shared no-op span is returned.
+
+    Attributes must not contain secret values, attributes that could contain secret values are dropped.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _ActiveSpan(_tracer.start_span(name, safe_attributes(attributes)))
+
+
+def _wrap(
+    cls: type, attribute: str, name: str, attributes: AttributesFunc | None, result_attributes: AttributesFunc | None
+) -> None:
+    original = cls.__dict__[attribute]
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        with span(name, **(attributes(*args, **kwargs) if attributes else {})) as active:
+            result = original(*args, **kwargs)
+            if result_attributes is not None:
+                for key, value in result_attributes(result).items():
+                    active.set_attribute(key, value)
+            return result
+
+    _originals[(cls, attribute)] = original
+    setattr(cls, attribute, wrapper)
+
+
+def instrument(
+    cls: type,
+    attribute: str,
+    name: str,
+    attributes: AttributesFunc | None = None,
+    result_attributes: AttributesFunc | None = None,
+) -> None:
+    """
+    Trace calls of a method defined on a class while a tracer is set
+
+    Args:
+        cls: Class which defines the method
+        attribute: Name of the method
+        name: Name of the span
+        attributes: Called with the arguments of the method, returns attributes of the span. Defaults to None.
+        result_attributes: Called with the result of the method, returns attributes of the span. Defaults to None.
+    """
+    with _lock:
+        _instrumented.append((cls, attribute, name, attributes, result_attributes))
+        if _tracer is not None:
+            _wrap(cls, attribute, name, attributes, result_attributes)
+
+
+class OpenTelemetryTracer:
+    """
+    Forwards spans to an OpenTelemetry tracer, requires opentelemetry-api
+
+    Errors are recorded by their type only, as messages could contain sensitive data.
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        """
+        Constructor
+
+        Args:
+            tracer: An OpenTelemetry tracer. Defaults to the tracer of the global tracer provider.
+        """
+        from opentelemetry import context, trace
+
+        from secretmanager.version import __version__
+
+        self._context = context
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("secretmanager", __version__)
+
+    def start_span(self, name: str, attributes: dict[str, AttributeValue]) -> "_OpenTelemetrySpan":
+        span = self._tracer.start_span(name, attributes=attributes)
+        # make the span current, such that spans of nested operations become its children
+        token = self._context.attach(self._trace.set_span_in_context(span))
+        return _OpenTelemetrySpan(self, span, token)
+
+
+class _OpenTelemetrySpan:
+    __slots__ = ("_tracer", "_span", "_token")
+
+    def __init__(self, tracer: OpenTelemetryTracer, span: Any, token: object) -> None:
+        self._tracer = tracer
+        self._span = span
+        self._token = token
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._span.set_attribute(key, value)
+
+    def end(self, error: BaseException | None = None) -> None:
+        if error is not None:
+            self._span.set_attribute("error.type", error.__class__.__name__)
+            self._span.set_status(self._tracer._trace.Status(self._tracer._trace.StatusCode.ERROR))
+        self._span.end()
+        self._tracer._context.detach(self._token)
+
+
+# id and stack of the innermost span of the SamplingProfiler in the current context
+_profiler_stack: ContextVar[tuple[int | None, tuple[str, ...]]] = ContextVar(
+    "secretmanager_profiler_stack", default=(None, ())
+)
+
+
+class SamplingProfiler:
+    """
+    A tracer which samples the active spans of all threads in a fixed interval
+
+    Besides the samples, the number of calls and the total wall time of each span name are recorded.
+    Use it as a context manager to install it as the global tracer while profiling.
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        """
+        Constructor
+
+        Args:
+            interval: Sampling interval in seconds. Defaults to 0.001.
+        """
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.calls: Counter[str] = Counter()
+        self.durations: Counter[str] = Counter()
+        # stacks of the active spans by span id, spans with active children are not sampled
+        self._active: dict[int, tuple[str, ...]] = {}
+        self._children: Counter[int] = Counter()
+        self._span_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._previous: Tracer | None = None
+
+    def start_span(self, name: str, attributes: dict[str, AttributeValue]) -> "_ProfilerSpan":
+        # the stack follows the context rather than the thread, such that coroutines on one loop do not interleave
+        parent, stack = _profiler_stack.get()
+        span_id = next(self._span_ids)
+        stack = (*stack, name)
+        with self._lock:
+            self._active[span_id] = stack
+            if parent is not None:
+                self._children[parent] += 1
+        token = _profiler_stack.set((span_id, stack))
+        return _ProfilerSpan(self, token, span_id, parent, name)
+
+    def _end_span(self, token: Token, span_id: int, parent: int | None, name: str, duration: float) -> None:
+        try:
+            _profiler_stack.reset(token)
+        except ValueError:
+            # the span ended in another context than it started in, which keeps its own stack
+            pass
+        with self._lock:
+            del self._active[span_id]
+            if parent is not None:
+                self._children[parent] -= 1
+                if not self._children[parent]:
+                    del self._children[parent]
+            self.calls[name] += 1
+            self.durations[name] += duration
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                self.samples.update(stack for span_id, stack in self._active.items() if not self._children[span_id])
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="secretmanager-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._previous = set_tracer(self)
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+        set_tracer(self._previous)
+
+    def folded(self) -> str:
+        """
+        Samples in the folded stack format, which is understood by most flame graph tools
+        """
+        with self._lock:
+            return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common())
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Number of calls, total and mean wall time in seconds and share of samples per span name
+        """
+        with self._lock:
+            total = sum(self.samples.values()) or 1
+            own_samples: Counter[str] = Counter()
+            for stack, count in self.samples.items():
+                own_samples[stack[-1]] += count
+            return {
+                name: {
+                    "calls": calls,
+                    "total": self.durations[name],
+                    "mean": self.durations[name] / calls,
+                    "samples": own_samples[name] / total,
+                }
+                for name, calls in self.calls.most_common()
+            }
+
+
+class _ProfilerSpan:
+    __slots__ = ("_profiler", "_token", "_span_id", "_parent", "_name", "_start")
+
+    def __init__(self, profiler: SamplingProfiler, token: Token, span_id: int, parent: int | None, name: str) -> None:
+        self._profiler = profiler
+        self._token = token
+        self._span_id = span_id
+        self._parent = parent
+        self._name = name
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self, error: BaseException | None = None) -> None:
+        self._profiler._end_span(
+            self._token, self._span_id, self._parent, self._name, time.perf_counter() - self._start
+        )
@@ -0,0 +1,49 @@
+from typing import Any
+
+from pydantic import GetCoreSchemaHandler, JsonValue
+from pydantic_core import core_schema
+
+_MASK = "**********"
+
+
+class SecretValue:
+    """
+    A secret value which is masked in its repr and str, use `get_secret_value` to access the value
+
+    Compatible with pydantic's `Secret`, but slotted such that an instance only holds a reference to its value.
+    As a field of a pydantic model it accepts any JSON value and is masked when dumped to JSON.
+    """
+
+    __slots__ = ("_secret_value",)
+
+    def __init__(self, secret_value: JsonValue) -> None:
+        self._secret_value = secret_value
+
+    def get_secret_value(self) -> JsonValue:
+        return self._secret_value
+
+    def _display(self) -> str:
+        return _MASK if self.get_secret_value() else ""
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._display()!r})"
+
+    def __str__(self) -> str:
+        return self._display()
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, SecretValue) and self.get_secret_value() == other.get_secret_value()
+
+    def __hash__(self) -> int:
+        return hash(self.get_secret_value())
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        from_json = core_schema.no_info_after_validator_function(cls, handler.generate_schema(JsonValue))
+        return core_schema.json_or_python_schema(
+            json_schema=from_json,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_json]),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda value, info: value._display() if info.mode == "json" else value, info_arg=True
+            ),
+        )
@@ -0,0 +1,151 @@
+import logging
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from secretmanager.error import SecretNotFoundError
+
+if TYPE_CHECKING:
+    from secretmanager.store import AbstractSecretStore, SecretValue
+
+logger = logging.getLogger(__name__)
+
+# called with the key and its new value, None if the secret was deleted
+WatchCallback = Callable[[str, "SecretValue | None"], None]
+
+
+class SnapshotDiff:
+    """
+    Detects changed keys by comparing snapshots, e.g. of values or of modification dates
+    """
+
+    def __init__(self, load: Callable[[], Mapping[str, Any]]) -> None:
+        self._load = load
+        self._snapshot = dict(load())
+
+    def __call__(self) -> set[str]:
+        snapshot = dict(self._load())
+        changed = {
+            key for key in snapshot.keys() | self._snapshot.keys() if snapshot.get(key) != self._snapshot.get(key)
+        }
+        self._snapshot = snapshot
+        return changed
+
+
+class FileSnapshotDiff(SnapshotDiff):
+    """
+    Detects changed keys of a file, which is only loaded again once it has been modified
+    """
+
+    def __init__(self, file: Path, load: Callable[[], Mapping[str, Any]]) -> None:
+        self._file = file
+        self._stat = self._signature()
+        super().__init__(load)
+
+    def _signature(self) -> tuple[int, int, int] | None:
+        try:
+            stat = self._file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def __call__(self) -> set[str]:
+        signature = self._signature()
+        if signature == self._stat:
+            return set()
+        self._stat = signature
+        if signature is None:
+            changed, self._snapshot = set(self._snapshot), {}
+            return changed
+        return super().__call__()
+
+
+class Watch:
+    """
+    Checks a store for changes of secrets in a background thread
+
+    Changed secrets are dropped from the cache. If there is a callback, their new value is read,
+    which refreshes the cache, and passed to the callback. Use `stop` or the context manager to end the watch.
+    """
+
+    def __init__(
+        self,
+        store: "AbstractSecretStore",
+        keys: Iterable[str] | None,
+        callback: WatchCallback | None,
+        poll: Callable[[], set[str]],
+        interval: float,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            store: Store of the secrets
+            keys: Keys to watch, None watches all keys
+            callback: Called for every changed key with its new value, None if the secret was deleted
+            poll: Returns the keys which changed since it was last called
+            interval: Time in seconds between two checks
+        """
+        self.store = store
+        self.keys = set(keys) if keys is not None else None
+        self.interval = interval
+        self._callback = callback
+        self._poll = poll
+        self._stop = threading.Event()
+        # check is public and may run concurrently with the background thread, snapshots must not be interleaved
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="secretmanager-watch", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> set[str]:
+        """
+        Check for changes once and dispatch them
+
+        Returns:
+            The changed keys
+        """
+        with self._lock:
+            return self._check()
+
+    def _check(self) -> set[str]:
+        try:
+            changed = self._poll()
+        except Exception as e:
+            logger.warning("Failed to check %s for changes: %s", self.store.__class__.__name__, e)
+            return set()
+        if self.keys is not None:
+            changed &= self.keys
+
+        for key in sorted(changed):
+            logger.debug("Secret %s changed in %s", key, self.store.__class__.__name__)
+            self.store._drop_cache(key)
+            if self._callback is None:
+                continue
+            try:
+                value = self.store.get(key)
+            except SecretNotFoundError:
+                value = None
+            except Exception as e:
+                logger.warning("Failed to refresh changed secret %s: %s", key, e)
+                continue
+            try:
+                self._callback(key, value)
+            except Exception:
+                logger.exception("Watch callback failed for secret %s", key)
+        return changed
+
+    def stop(self) -> None:
+        self._stop.set()
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "Watch":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
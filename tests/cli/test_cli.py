@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from secretmanager.bench import bench_cli_startup
+from secretmanager.cli import app
+
+runner = CliRunner()
+
+CHECK_IMPORTS = """
+import json, sys
+from secretmanager.cli import app
+try:
+    app(sys.argv[1:])
+except SystemExit:
+    pass
+heavy = [
+    "botocore",
+    "yaml",
+    "secretmanager.cli.settings",
+    "secretmanager.cli.stores",
+    "secretmanager.cli.exec",
+    "secretmanager.cli.sync",
+]
+print(json.dumps([m for m in heavy if m in sys.modules]), file=sys.stderr)
+"""
+
+
+def imported_modules(*args: str) -> list[str]:
+    env = {**os.environ, "SM_DEFAULT_STORE": "ENV", "KEY": "VALUE"}
+    proc = subprocess.run([sys.executable, "-c", CHECK_IMPORTS, *args], env=env, capture_output=True, check=True)
+    return json.loads(proc.stderr.decode().strip().splitlines()[-1])
+
+
+def test_help_lists_lazy_commands():
+    result = runner.invoke(app, ["--help"])
+
+    assert result.exit_code == 0, result.output
+    for command in ("exec", "secret", "settings", "stores", "sync"):
+        assert command in result.output
+
+
+def test_help_is_lazy():
+    assert imported_modules("--help") == []
+
+
+def test_secret_get_is_lazy():
+    assert imported_modules("secret", "get", "KEY") == []
+
+
+def test_stores_list_plain():
+    result = runner.invoke(app, ["stores", "list", "--plain"])
+
+    assert result.exit_code == 0, result.output
+    assert "ENV\tTrue\t" in result.output
+
+
+def test_bench_cli_startup():
+    results = bench_cli_startup(repeat=1)
+
+    assert [r["name"] for r in results] == ["cli_help", "cli_secret_get"]
+    assert all(r["min"] > 0 for r in results)
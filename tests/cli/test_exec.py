@@ -0,0 +1,54 @@
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from secretmanager.cli import app
+from secretmanager.cli.exec import parse_mapping
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def execvpe(monkeypatch):
+    calls = []
+    monkeypatch.setattr(os, "environ", {"EXISTING": "1"})
+    monkeypatch.setenv("KEY", "VALUE")
+    monkeypatch.setenv("COMPLEX", r'{"LIST":[1,2,3]}')
+    monkeypatch.setattr(os, "execvpe", lambda file, args, env: calls.append((file, args, env)))
+    return calls
+
+
+def test_parse_mapping():
+    mapping = parse_mapping(["KEY", "NAME=OTHER_KEY", "export EXPORTED = KEY", "# comment", ""])
+
+    assert mapping == {"KEY": "KEY", "NAME": "OTHER_KEY", "EXPORTED": "KEY"}
+
+
+def test_exec(execvpe):
+    result = runner.invoke(app, ["exec", "-k", "KEY", "-k", "DATA=COMPLEX", "--", "env", "-0"])
+
+    assert result.exit_code == 0, result.output
+    [(file, args, env)] = execvpe
+    assert file == "env"
+    assert args == ["env", "-0"]
+    assert env["KEY"] == "VALUE"
+    assert env["DATA"] == '{"LIST":[1,2,3]}'
+    assert env["EXISTING"] == "1"
+
+
+def test_exec_file(execvpe, tmp_path):
+    file = tmp_path / "mapping.json"
+    file.write_text('{"EXISTING": "KEY"}')
+
+    result = runner.invoke(app, ["exec", "-f", str(file), "--no-override", "env"])
+
+    assert result.exit_code == 0, result.output
+    assert execvpe[0][2]["EXISTING"] == "1"
+
+
+def test_exec_missing_secret(execvpe):
+    result = runner.invoke(app, ["exec", "-k", "MISSING", "env"])
+
+    assert result.exit_code == 1
+    assert not execvpe
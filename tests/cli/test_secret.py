@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from secretmanager.cli import app
+
+runner = CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def _environ(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("KEY", "VALUE")
+    monkeypatch.setenv("COMPLEX", r'{"LIST":[1,2,3]}')
+
+
+def test_get_single():
+    result = runner.invoke(app, ["secret", "get", "KEY"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == "VALUE\n"
+
+
+def test_get_many():
+    result = runner.invoke(app, ["secret", "get", "KEY", "COMPLEX", "--format", "json"])
+
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert lines == [{"key": "KEY", "value": "VALUE"}, {"key": "COMPLEX", "value": {"LIST": [1, 2, 3]}}]
+
+
+def test_get_stdin():
+    result = runner.invoke(app, ["secret", "get", "-", "--format", "dotenv"], input="KEY\nCOMPLEX\n")
+
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == ['KEY="VALUE"', 'COMPLEX="{\\"LIST\\":[1,2,3]}"']
+
+
+def test_get_missing():
+    result = runner.invoke(app, ["secret", "get", "KEY", "MISSING"])
+
+    assert result.exit_code == 1
+    assert "KEY\tVALUE" in result.output
+
+
+def test_list_keys():
+    result = runner.invoke(app, ["secret", "list"])
+
+    assert result.exit_code == 0, result.output
+    assert {"KEY", "COMPLEX"} <= set(result.output.splitlines())
+
+
+def test_list_values():
+    result = runner.invoke(app, ["secret", "list", "--values", "--format", "json", "--batch-size", "1"])
+
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert {"key": "KEY", "value": "VALUE"} in lines
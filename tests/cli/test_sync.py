@@ -0,0 +1,49 @@
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from secretmanager.cli import app
+from secretmanager.cli.sync import parse_rename
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def file(monkeypatch, settings, tmp_path):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("NEW", "VALUE")
+    monkeypatch.setenv("SAME", "SAME")
+    file = tmp_path / ".env"
+    file.write_text("SAME=SAME\n")
+    settings.dotenv.file = str(file)
+    return file
+
+
+def test_parse_rename():
+    assert parse_rename(["A=B", " C = D "]) == {"A": "B", "C": "D"}
+
+
+def test_sync(file):
+    result = runner.invoke(app, ["sync", "env", "dotenv", "-k", "NEW", "-k", "SAME", "--map", "NEW=RENAMED"])
+
+    assert result.exit_code == 0, result.output
+    assert "add\tNEW -> RENAMED" in result.output
+    assert "SAME" not in result.stdout
+    assert "1 add, 0 update, 1 unchanged, 0 failed" in result.output
+    assert "RENAMED" in file.read_text()
+
+
+def test_sync_dry_run(file):
+    result = runner.invoke(app, ["sync", "env", "dotenv", "-k", "NEW", "-k", "SAME", "--dry-run", "--exclude", "SAME"])
+
+    assert result.exit_code == 0, result.output
+    assert "add\tNEW" in result.output
+    assert "1 add, 0 update, 0 unchanged, 0 failed (dry run)" in result.output
+    assert "NEW" not in file.read_text()
+
+
+def test_sync_invalid_map(file):
+    result = runner.invoke(app, ["sync", "env", "dotenv", "--map", "NEW"])
+
+    assert result.exit_code != 0
@@ -18,5 +18,6 @@ def settings():
 def cache(settings: SettingsFactory):
     CACHE.max_cache_size = settings.cache.max_size
     CACHE.expires_in = settings.cache.expires_in
+    CACHE.max_staleness = settings.cache.max_staleness
     yield CACHE
     CACHE.clear()
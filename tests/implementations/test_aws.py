@@ -1,11 +1,24 @@
+import time
 from typing import Callable
 
 import botocore.session
 import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
 from moto import mock_aws
 
-from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError
+from secretmanager import circuit
+from secretmanager.circuit import CircuitState
+from secretmanager.error import (
+    CircuitOpenError,
+    SecretAlreadyExistsError,
+    SecretBundleError,
+    SecretNotFoundError,
+    SecretTimeoutError,
+)
+from secretmanager.implementations import aws
 from secretmanager.implementations.aws import AWSSecretStore
+from secretmanager.settings import CircuitBreakerSettings
+from secretmanager.tracing import SamplingProfiler
 
 
 @pytest.fixture
@@ -64,6 +77,155 @@ def test_getting(store_factory):
     assert val.get_secret_value() == "VALUE"
 
 
+def test_getting_many(store_factory):
+    store = store_factory()
+    values = store.get_many(["KEY", "COMPLEX", "MISSING"])
+
+    assert set(values) == {"KEY", "COMPLEX"}
+    assert values["KEY"].get_secret_value() == "VALUE"
+    assert values["COMPLEX"].get_secret_value()["LIST"] == [1, 2, 3]
+
+
+def test_tracing(store_factory):
+    store = store_factory()
+    with SamplingProfiler() as profiler:
+        store.get("KEY")
+        store.get("KEY")
+
+    assert profiler.calls["store.get"] == 2
+    assert profiler.calls["aws.create_client"] == 1
+    assert profiler.calls["aws.get_secret_value"] == 1
+
+
+def test_timeout_config(store_factory):
+    store = store_factory()
+    client = store._get_client(timeout=2)
+
+    # connect and read timeout add up to the timeout
+    assert client.meta.config.connect_timeout == 1
+    assert client.meta.config.read_timeout == 1
+    assert store._get_client(timeout=2) is client
+
+
+def test_timeouts_share_clients(store_factory):
+    store = store_factory()
+    # remaining times of deadlines are rounded down, hence a client never waits longer than the deadline
+    clients = {id(store._get_client(timeout=timeout)) for timeout in (0.91, 0.87, 0.52)}
+
+    assert len(clients) == 1
+    assert store._get_client(timeout=0.52).meta.config.read_timeout == 0.25
+    assert store._get_client(timeout=0.01).meta.config.read_timeout == 0.05
+    assert len(store._clients) == 2
+
+
+def test_getting_many_bounds_batches_by_deadline(store_factory, monkeypatch):
+    store = store_factory()
+    get_client = store._get_client
+    timeouts = []
+
+    def recording_get_client(timeout=None):
+        timeouts.append(timeout)
+        time.sleep(0.05)
+        return get_client(timeout)
+
+    monkeypatch.setattr(store, "_get_client", recording_get_client)
+
+    store.get_many([f"KEY_{i}" for i in range(aws.BATCH_SIZE + 1)], timeout=5)
+
+    assert len(timeouts) == 2
+    assert 5 > timeouts[0] > timeouts[1]
+
+
+def test_clients_reset_after_fork(store_factory):
+    store = store_factory()
+    client = store._get_client()
+
+    aws._reset_clients()
+    assert store._clients == {}
+    assert store._get_client() is not client
+    assert store.get("KEY").get_secret_value() == "VALUE"
+
+
+def test_timeout_serves_stale(store_factory, cache, monkeypatch):
+    store = store_factory()
+    cache.expires_in = 0
+    cache.max_staleness = 60
+    store.get("KEY")
+
+    def get_secret_value(**kwargs):
+        raise ReadTimeoutError(endpoint_url="http://localhost")
+
+    monkeypatch.setattr(store._get_client(timeout=1), "get_secret_value", get_secret_value)
+    time.sleep(0.01)
+
+    assert store.get("KEY", timeout=1).get_secret_value() == "VALUE"
+    with pytest.raises(SecretTimeoutError, match="timed out"):
+        store.get("SIMPLE", timeout=1)
+
+
+def test_circuit_breaker_serves_stale(store_factory, cache, settings, monkeypatch):
+    monkeypatch.setattr(circuit, "_breakers", {})
+    settings.aws.circuit_breaker = CircuitBreakerSettings(enabled=True, failure_threshold=1, max_staleness=60)
+    store = store_factory()
+    cache.expires_in = 0
+    cache.max_staleness = 60
+    store.get("KEY")
+
+    calls = []
+
+    def get_secret_value(**kwargs):
+        calls.append(kwargs)
+        raise EndpointConnectionError(endpoint_url="http://localhost")
+
+    monkeypatch.setattr(store._get_client(), "get_secret_value", get_secret_value)
+    time.sleep(0.01)
+
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store._breaker.state == CircuitState.OPEN
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert len(calls) == 1
+    with pytest.raises(CircuitOpenError):
+        store.get("SIMPLE")
+
+
+def test_getting_many_serves_stale_per_key(store_factory, cache, monkeypatch):
+    store = store_factory()
+    cache.expires_in = 0
+    cache.max_staleness = 60
+    store.get("KEY")
+
+    def batch_get_secret_value(**kwargs):
+        raise EndpointConnectionError(endpoint_url="http://localhost")
+
+    monkeypatch.setattr(store._get_client(), "batch_get_secret_value", batch_get_secret_value)
+    time.sleep(0.01)
+
+    with pytest.raises(SecretBundleError) as e:
+        store.get_many(["KEY", "SIMPLE"])
+
+    assert e.value.values["KEY"].get_secret_value() == "VALUE"
+    assert isinstance(e.value.errors["SIMPLE"], EndpointConnectionError)
+
+
+def test_getting_many_with_failed_secret(store_factory, monkeypatch):
+    store = store_factory()
+    client = store._get_client()
+    batch_get_secret_value = client.batch_get_secret_value
+
+    def with_decryption_failure(**kwargs):
+        response = batch_get_secret_value(**kwargs)
+        response["Errors"].append({"SecretId": "BROKEN", "ErrorCode": "DecryptionFailure", "Message": "denied"})
+        return response
+
+    monkeypatch.setattr(client, "batch_get_secret_value", with_decryption_failure)
+
+    with pytest.raises(SecretBundleError) as e:
+        store.get_many(["KEY", "BROKEN"])
+
+    assert list(e.value.errors) == ["BROKEN"]
+    assert e.value.values["KEY"].get_secret_value() == "VALUE"
+
+
 def test_adding(store_factory, secretmanager):
     store = store_factory()
     store.add("OTHER_KEY", "VALUE")
@@ -87,6 +249,26 @@ def test_list_secret_keys(store_factory):
     assert "TEST" in secrets
 
 
+def test_iter_secret_keys_paginates(store_factory, secretmanager, monkeypatch):
+    store = store_factory()
+    for i in range(3):
+        store.add(f"TEST_{i}", "VALUE")
+    paginate_kwargs = []
+    get_paginator = store._get_client().get_paginator
+
+    def paginator(name):
+        paginator = get_paginator(name)
+        paginate = paginator.paginate
+        paginator.paginate = lambda **kwargs: paginate(**{**kwargs, "PaginationConfig": {"PageSize": 2}})
+        paginate_kwargs.append(name)
+        return paginator
+
+    monkeypatch.setattr(store._get_client(), "get_paginator", paginator)
+
+    assert {"KEY", "TEST_0", "TEST_1", "TEST_2"} <= set(store.iter_secret_keys())
+    assert paginate_kwargs == ["list_secrets"]
+
+
 def test_list_secrets(store_factory):
     store = store_factory()
     store.add("TEST", {"key": "value"})
@@ -103,3 +285,71 @@ def test_delete(store_factory):
     store.delete("KEY")
     secrets = store.list_secrets()
     assert "KEY" not in secrets
+
+
+def test_put_many(store_factory, secretmanager, cache):
+    store = store_factory()
+    store.get("KEY")
+
+    errors = store.put_many({"KEY": "UPDATED", "NEW": {"LIST": [1]}})
+
+    assert errors == {"KEY": None, "NEW": None}
+    assert secretmanager.get_secret_value(SecretId="NEW")["SecretString"] == r'{"LIST":[1]}'
+    # the cache is written through, hence no stale value is served
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+
+
+def test_put_many_retries_throttled_writes(store_factory, settings, monkeypatch):
+    settings.aws.max_retries = 1
+    store = store_factory()
+    client = store._get_client()
+    create_secret = client.create_secret
+    calls = []
+
+    def throttled_create_secret(**kwargs):
+        calls.append(kwargs["Name"])
+        if kwargs["Name"] == "THROTTLED" or len(calls) == 1:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "CreateSecret")
+        return create_secret(**kwargs)
+
+    monkeypatch.setattr(client, "create_secret", throttled_create_secret)
+    monkeypatch.setattr(aws.time, "sleep", lambda _: None)
+
+    errors = store.put_many({"NEW": "VALUE", "THROTTLED": "VALUE"})
+
+    assert errors["NEW"] is None
+    assert isinstance(errors["THROTTLED"], ClientError)
+    assert calls.count("THROTTLED") == 2
+    assert store.get("NEW").get_secret_value() == "VALUE"
+
+
+def test_delete_many(store_factory, cache):
+    store = store_factory()
+    store.get("KEY")
+
+    errors = store.delete_many(["KEY", "SIMPLE", "MISSING"])
+
+    assert errors["KEY"] is None
+
+    assert errors["SIMPLE"] is None
+    assert isinstance(errors["MISSING"], SecretNotFoundError)
+    assert store.list_secret_keys() == {"COMPLEX"}
+    assert store._get_cache("KEY") is None
+
+
+def test_watch(store_factory, secretmanager, cache):
+    store = store_factory()
+    store.get("KEY")
+    events = []
+
+    with store.watch(["KEY", "NEW"], lambda key, value: events.append((key, value.get_secret_value()))) as watch:
+        assert watch.interval == 60
+        assert watch.check() == set()
+        time.sleep(1)
+        secretmanager.update_secret(SecretId="KEY", SecretString="ROTATED")
+        secretmanager.update_secret(SecretId="SIMPLE", SecretString="ROTATED")
+        secretmanager.create_secret(Name="NEW", SecretString="NEW")
+        assert watch.check() == {"KEY", "NEW"}
+
+    assert events == [("KEY", "ROTATED"), ("NEW", "NEW")]
+    assert store.get("KEY").get_secret_value() == "ROTATED"
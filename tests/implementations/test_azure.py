@@ -0,0 +1,215 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("azure.keyvault.secrets.aio")
+
+from azure.core.credentials import AccessToken  # noqa: E402
+from azure.core.exceptions import HttpResponseError  # noqa: E402
+
+from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError  # noqa: E402
+from secretmanager.fork import ClientPool  # noqa: E402
+from secretmanager.implementations import azure  # noqa: E402
+from secretmanager.implementations.azure import AzureKeyVaultStore  # noqa: E402
+
+
+def throttled(retry_after: str) -> HttpResponseError:
+    error = HttpResponseError(message="Too Many Requests")
+    error.status_code = 429
+    error.response = SimpleNamespace(headers={"Retry-After": retry_after}, status_code=429)
+    return error
+
+
+class FakeKeyVault:
+    """In-memory state of the Key Vault REST API"""
+
+    def __init__(self) -> None:
+        self.secrets: dict[str, tuple[str, bool]] = {}
+        self.throttle = 0
+        self.url = ""
+
+    def _bundle(self, name: str) -> dict:
+        value, enabled = self.secrets[name]
+        return {"id": f"{self.url}/secrets/{name}/1", "value": value, "attributes": {"enabled": enabled}}
+
+    def route(self, request) -> tuple:
+        if not request.headers.get("Authorization"):
+            # the first request of a client is answered with the challenge which tells where to get a token
+            challenge = 'Bearer authorization="https://login.invalid/tenant", resource="https://vault.invalid"'
+            return 401, None, {"WWW-Authenticate": challenge}
+        if self.throttle:
+            self.throttle -= 1
+            return 429, {"error": {"code": "Throttled", "message": "Too Many Requests"}}, {"retry-after-ms": "50"}
+
+        name = request.path.removeprefix("/secrets").strip("/")
+        if request.method == "GET" and name == "":
+            names = sorted(self.secrets)
+            start = int(request.query.get("$skiptoken", 0))
+            end = start + int(request.query.get("maxresults", 25))
+            items = [{"id": f"{self.url}/secrets/{n}", "attributes": {"enabled": self.secrets[n][1]}} for n in names]
+            body: dict = {"value": items[start:end], "nextLink": None}
+            if end < len(names):
+                body["nextLink"] = f"{self.url}/secrets?maxresults={end - start}&$skiptoken={end}"
+            return 200, body
+        if request.method == "PUT":
+            self.secrets[name] = (request.json()["value"], True)
+            return 200, self._bundle(name)
+        if name not in self.secrets:
+            return 404, {"error": {"code": "SecretNotFound", "message": f"{name} was not found"}}
+        if request.method == "GET":
+            return 200, self._bundle(name)
+        if request.method == "DELETE":
+            # without a recovery id the vault does not soft-delete, hence the client does not poll
+            bundle = self._bundle(name)
+            del self.secrets[name]
+            return 200, bundle
+        return 400, {"error": {"code": "BadParameter", "message": "unsupported"}}
+
+
+class FakeCredential:
+    async def get_token(self, *scopes, **kwargs) -> AccessToken:
+        return AccessToken("token", int(time.time()) + 3600)
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake():
+    fake = FakeKeyVault()
+    fake.secrets = {"KEY": ("VALUE", True), "COMPLEX": (r'{"LIST":[1,2,3]}', True), "DISABLED": ("", False)}
+    return fake
+
+
+@pytest.fixture
+def server(fake, serve, certificate):
+    # the Key Vault client only sends its token over TLS
+    server = serve(fake.route, certificate)
+    fake.url = server.url
+    return server
+
+
+@pytest.fixture
+def store(server, monkeypatch):
+    monkeypatch.setattr(azure, "_clients", ClientPool())
+    client_options = {"connection_verify": False, "verify_challenge_resource": False}
+    yield AzureKeyVaultStore(server.url, credential=FakeCredential(), client_options=client_options)
+    azure._close_clients()
+
+
+def test_getting(store):
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+
+
+def test_getting_missing(store):
+    with pytest.raises(SecretNotFoundError, match="was not found"):
+        store.get("MISSING")
+
+
+def test_getting_is_cached(store, server):
+    store.get("KEY")
+    store.get("KEY")
+
+    # the challenge and the authorized request
+    assert server.requests == [("GET", "/secrets/KEY/")] * 2
+
+
+def test_getting_many_is_bounded(store, fake, server, settings):
+    settings.azure.max_concurrency = 3
+    fake.secrets.update({f"KEY_{i}": (f"VALUE_{i}", True) for i in range(10)})
+    server.delay = 0.02
+
+    values = store.get_many([*(f"KEY_{i}" for i in range(10)), "MISSING"])
+
+    assert {k: v.get_secret_value() for k, v in values.items()} == {f"KEY_{i}": f"VALUE_{i}" for i in range(10)}
+    assert server.max_in_flight == 3
+
+
+def test_throttling_respects_retry_after(store, fake, server):
+    store.get("COMPLEX")
+    server.requests.clear()
+    fake.throttle = 2
+    start = time.monotonic()
+
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert time.monotonic() - start >= 0.1
+    # the client does not retry on its own, the store retries after the Retry-After of the vault
+    assert server.requests == [("GET", "/secrets/KEY/")] * 3
+
+
+def test_throttling_retries_exhausted(store, fake, settings):
+    settings.azure.max_retries = 0
+    store.get("COMPLEX")
+    fake.throttle = 1
+
+    with pytest.raises(HttpResponseError) as e:
+        store.get("KEY")
+    assert e.value.status_code == 429
+
+
+def test_retry_after():
+    assert azure._retry_after(throttled("2")) == 2
+    error = throttled("2")
+    error.response.headers = {"retry-after-ms": "500"}
+    assert azure._retry_after(error) == 0.5
+
+
+def test_list_secret_keys_pages(store, server, settings):
+    settings.azure.page_size = 1
+
+    assert store.list_secret_keys() == {"KEY", "COMPLEX"}
+    # the challenge and one request per secret, the disabled secret is skipped
+    assert server.requests.count(("GET", "/secrets")) == 4
+
+
+def test_iter_secrets(store):
+    assert {k: v.get_secret_value() for k, v in store.iter_secrets(batch_size=1)} == {
+        "KEY": "VALUE",
+        "COMPLEX": {"LIST": [1, 2, 3]},
+    }
+
+
+def test_adding(store, fake):
+    store.add("NEW", {"a": 1})
+
+    assert fake.secrets["NEW"] == ('{"a":1}', True)
+    with pytest.raises(SecretAlreadyExistsError):
+        store.add("NEW", "VALUE")
+
+
+def test_updating(store, cache):
+    store.get("KEY")
+    store.update("KEY", "UPDATED")
+
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+
+
+def test_delete(store, fake):
+    store.get("KEY")
+    store.delete("KEY")
+
+    assert "KEY" not in fake.secrets
+    with pytest.raises(SecretNotFoundError):
+        store.get("KEY")
+
+
+def test_shared_client(monkeypatch):
+    created = []
+
+    def secret_client(vault_url, credential, **kwargs):
+        created.append((vault_url, kwargs))
+        return object()
+
+    monkeypatch.setattr(azure, "_clients", ClientPool())
+    monkeypatch.setattr(azure, "SecretClient", secret_client)
+    credential = object()
+
+    a = AzureKeyVaultStore("https://a.vault.azure.net", credential=credential)
+    b = AzureKeyVaultStore("https://a.vault.azure.net", credential=credential)
+    AzureKeyVaultStore("https://b.vault.azure.net", credential=credential)
+
+    assert a._vault is b._vault
+    assert [url for url, _ in created] == ["https://a.vault.azure.net", "https://b.vault.azure.net"]
+    assert created[0][1]["retry_status"] == 0
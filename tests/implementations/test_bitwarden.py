@@ -0,0 +1,197 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError
+from secretmanager.implementations import bitwarden
+from secretmanager.implementations.bitwarden import BitwardenSecretStore
+
+ORGANIZATION = str(uuid.uuid4())
+PROJECT = str(uuid.uuid4())
+
+
+def ok(data):
+    return SimpleNamespace(success=True, error_message=None, data=data)
+
+
+class FakeSecrets:
+    """Stub of the secrets client of the Bitwarden SDK"""
+
+    def __init__(self) -> None:
+        self.secrets: dict[str, SimpleNamespace] = {}
+        self.syncs: list[str | None] = []
+        self.changed = True
+
+    def put(self, key: str, value: str, project_id: str | None = PROJECT) -> SimpleNamespace:
+        secret = SimpleNamespace(
+            id=uuid.uuid4(),
+            key=key,
+            value=value,
+            project_id=uuid.UUID(project_id) if project_id else None,
+            revision_date=datetime.now(timezone.utc),
+        )
+        self.secrets[str(secret.id)] = secret
+        self.changed = True
+        return secret
+
+    def sync(self, organization_id, last_synced_date):
+        assert organization_id == ORGANIZATION
+        self.syncs.append(last_synced_date)
+        has_changes = last_synced_date is None or self.changed
+        self.changed = False
+        return ok(
+            SimpleNamespace(has_changes=has_changes, secrets=list(self.secrets.values()) if has_changes else None)
+        )
+
+    def create(self, organization_id, key, value, note, project_ids=None):
+        return ok(self.put(key, value, project_ids[0] if project_ids else None))
+
+    def update(self, organization_id, id, key, value, note, project_ids=None):
+        self.secrets.pop(id)
+        secret = self.put(key, value, project_ids[0] if project_ids else None)
+        return ok(secret)
+
+    def delete(self, ids):
+        for id in ids:
+            self.secrets.pop(id)
+        self.changed = True
+        return ok(None)
+
+
+@pytest.fixture
+def secrets():
+    secrets = FakeSecrets()
+    secrets.put("KEY", "VALUE")
+    secrets.put("COMPLEX", r'{"LIST":[1,2,3]}')
+    secrets.put("OTHER_PROJECT", "VALUE", project_id=str(uuid.uuid4()))
+    return secrets
+
+
+@pytest.fixture
+def store(secrets):
+    client = SimpleNamespace(secrets=lambda: secrets)
+    return BitwardenSecretStore(organization_id=ORGANIZATION, project_id=PROJECT, client=client)
+
+
+def test_getting(store):
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+
+
+def test_getting_missing(store):
+    with pytest.raises(SecretNotFoundError, match="was not found"):
+        store.get("MISSING")
+
+
+def test_other_projects_are_ignored(store):
+    assert store.list_secret_keys() == {"KEY", "COMPLEX"}
+
+
+def test_single_sync_for_many_reads(store, secrets):
+    store.get("KEY")
+    store.get("COMPLEX")
+    store.get_many(["KEY", "COMPLEX"])
+    store.list_secrets()
+
+    assert secrets.syncs == [None]
+
+
+def test_resync_on_interval(store, secrets, settings):
+    store.get("KEY")
+    settings.bitwarden.sync_interval = 0
+    secrets.put("KEY", "NEW")
+
+    assert store.get("KEY").get_secret_value() == "NEW"
+    assert len(secrets.syncs) == 2
+    assert secrets.syncs[1] is not None
+
+
+def test_resync_on_miss(store, secrets, settings):
+    settings.bitwarden.miss_sync_interval = 0
+    store.get("KEY")
+    secrets.put("NEW", "VALUE")
+
+    assert store.get("NEW").get_secret_value() == "VALUE"
+    assert len(secrets.syncs) == 2
+
+
+def test_resync_on_miss_is_limited(store, secrets):
+    store.get("KEY")
+    for _ in range(3):
+        with pytest.raises(SecretNotFoundError):
+            store.get("MISSING")
+
+    assert len(secrets.syncs) == 1
+
+
+def test_sync_without_changes_keeps_index(store, secrets):
+    store.get("KEY")
+
+    assert store.sync() is False
+    assert store.get("KEY").get_secret_value() == "VALUE"
+
+
+def test_duplicate_keys_use_latest_revision(store, secrets):
+    secrets.put("KEY", "NEWER")
+
+    assert store.get("KEY").get_secret_value() == "NEWER"
+
+
+def test_adding(store, secrets):
+    store.add("NEW", {"a": 1})
+
+    assert store.get("NEW").get_secret_value() == {"a": 1}
+    with pytest.raises(SecretAlreadyExistsError):
+        store.add("NEW", "VALUE")
+
+
+def test_updating(store, secrets):
+    store.update("KEY", "UPDATED")
+
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+    assert [s.value for s in secrets.secrets.values() if s.key == "KEY"] == ['"UPDATED"']
+
+
+def test_delete(store, secrets):
+    store.delete("KEY")
+
+    assert "KEY" not in store.list_secret_keys()
+    assert all(s.key != "KEY" for s in secrets.secrets.values())
+
+
+def test_failed_request(secrets):
+    client = SimpleNamespace(
+        secrets=lambda: SimpleNamespace(sync=lambda *args: SimpleNamespace(success=False, error_message="denied"))
+    )
+    store = BitwardenSecretStore(organization_id=ORGANIZATION, client=client)
+
+    with pytest.raises(RuntimeError, match="denied"):
+        store.get("KEY")
+
+
+def test_client_recreated_after_fork(secrets, monkeypatch):
+    logins: list[str | None] = []
+
+    def create_client(self, access_token):
+        logins.append(access_token)
+        return SimpleNamespace(secrets=lambda: secrets)
+
+    monkeypatch.setattr(BitwardenSecretStore, "_create_client", create_client)
+    store = BitwardenSecretStore(access_token="TOKEN", organization_id=ORGANIZATION, project_id=PROJECT)
+    lock = store._lock
+    assert logins == ["TOKEN"]
+
+    bitwarden._reset_clients()
+    assert store._lock is not lock
+    assert logins == ["TOKEN"]
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert logins == ["TOKEN", "TOKEN"]
+
+
+def test_passed_client_kept_after_fork(store):
+    client = store._client
+
+    bitwarden._reset_clients()
+    assert store._client is client
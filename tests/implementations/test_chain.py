@@ -0,0 +1,120 @@
+import os
+import time
+
+import pytest
+
+from secretmanager.error import SecretNotFoundError, SecretTimeoutError
+from secretmanager.implementations.chain import ChainedSecretStore
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.settings import Settings, StoreSettings
+from secretmanager.store import AbstractSecretStore, SecretValue, StoreCapabilities
+
+
+class DictStore(AbstractSecretStore[StoreSettings]):
+    def __init__(self, values: dict[str, str], delay: float = 0) -> None:
+        self.settings = StoreSettings()
+        self.capabilities = StoreCapabilities(read=True)
+        self.values = values
+        self.delay = delay
+        self.calls: list[str] = []
+
+    def get(self, key: str, timeout: float | None = None):
+        self.calls.append(key)
+        time.sleep(self.delay)
+        if key not in self.values:
+            raise SecretNotFoundError(f"Secret {key} was not found")
+        return SecretValue(self.values[key])
+
+    def list_secret_keys(self):
+        return set(self.values)
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("KEY", "VALUE")
+
+
+def test_fallback():
+    first, second = DictStore({"A": "first"}), DictStore({"A": "second", "B": "second"})
+    store = ChainedSecretStore([first, second])
+
+    assert store.get("A").get_secret_value() == "first"
+    assert store.get("B").get_secret_value() == "second"
+    assert store.list_secret_keys() == {"A", "B"}
+
+
+def test_missing():
+    store = ChainedSecretStore([DictStore({}), DictStore({})])
+
+    with pytest.raises(SecretNotFoundError, match="not found in any"):
+        store.get("A")
+
+
+def test_remember_owner():
+    first, second = DictStore({}), DictStore({"B": "second"})
+    store = ChainedSecretStore([first, second])
+
+    store.get("B")
+    store.get("B")
+
+    assert first.calls == ["B"]
+    assert second.calls == ["B", "B"]
+
+
+def test_failing_owner_falls_back():
+    flaky, other = DictStore({"A": "flaky"}), DictStore({"A": "other"})
+    store = ChainedSecretStore([flaky, other])
+    store.get("A")
+    store.get_many(["A"])
+
+    def fail(key, timeout=None):
+        raise ConnectionError("backend down")
+
+    flaky.get = fail
+
+    assert store.get("A").get_secret_value() == "other"
+    assert store._owners == {"A": 1}
+
+    store._owners["A"] = 0
+    assert store.get_many(["A"])["A"].get_secret_value() == "other"
+    assert store._owners == {"A": 1}
+
+
+def test_hedging():
+    slow, fast = DictStore({"A": "slow"}, delay=0.5), DictStore({"A": "fast"})
+    store = ChainedSecretStore([slow, fast], hedge_after=10)
+
+    start = time.monotonic()
+    assert store.get("A").get_secret_value() == "fast"
+    assert time.monotonic() - start < 0.5
+
+
+def test_hedging_falls_through_on_miss():
+    store = ChainedSecretStore([DictStore({}), DictStore({}), DictStore({"A": "last"})], hedge_after=1000)
+
+    assert store.get("A").get_secret_value() == "last"
+
+
+def test_deadline():
+    store = ChainedSecretStore([DictStore({}, delay=0.2), DictStore({"A": "second"})])
+
+    with pytest.raises(SecretTimeoutError, match="Deadline"):
+        store.get("A", timeout=0.1)
+
+
+def test_get_many():
+    first, second = DictStore({"A": "first"}), DictStore({"A": "second", "B": "second"})
+    store = ChainedSecretStore([first, second])
+
+    values = store.get_many(["A", "B", "C"])
+
+    assert {k: v.get_secret_value() for k, v in values.items()} == {"A": "first", "B": "second"}
+
+
+def test_from_settings(env):
+    Settings.chain.stores = ["ENV"]
+    store = ChainedSecretStore()
+
+    assert isinstance(store.stores[0], EnvVarStore)
+    assert store.get("KEY").get_secret_value() == "VALUE"
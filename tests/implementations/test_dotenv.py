@@ -44,6 +44,15 @@ def test_getting(store_factory):
     assert val.get_secret_value() == "VALUE"
 
 
+def test_getting_many(store_factory):
+    store = store_factory()
+    store.add("OTHER_KEY", "VALUE")
+    values = store.get_many(["KEY", "OTHER_KEY", "MISSING"])
+
+    assert set(values) == {"KEY", "OTHER_KEY"}
+    assert values["OTHER_KEY"].get_secret_value() == "VALUE"
+
+
 def test_adding(store_factory):
     store = store_factory()
     store.add("OTHER_KEY", "VALUE")
@@ -84,3 +93,16 @@ def test_delete(store_factory):
     store = store_factory()
     store.delete("KEY")
     assert not store.list_secrets()
+
+
+def test_watch(store_factory, tmp_path, cache):
+    store = store_factory()
+    store.get("KEY")
+    events = []
+
+    with store.watch(["KEY"], lambda key, value: events.append((key, value.get_secret_value())), 60) as watch:
+        (tmp_path / ".env").write_text("KEY=ROTATED\nOTHER=VALUE")
+        assert watch.check() == {"KEY"}
+
+    assert events == [("KEY", "ROTATED")]
+    assert store.get("KEY").get_secret_value() == "ROTATED"
@@ -67,3 +67,51 @@ def test_delete(store_factory):
     secrets = store.list_secrets()
     secrets.pop("PYTEST_CURRENT_TEST")  # injected by default
     assert not secrets
+
+
+def test_put_many(store_factory, cache):
+    store = store_factory
+
+    errors = store.put_many({"KEY": "UPDATED", "NEW": {"LIST": [1]}})
+
+    assert errors == {"KEY": None, "NEW": None}
+    assert os.environ["NEW"] == r'{"LIST":[1]}'
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+
+
+def test_put_many_partial_failure(store_factory, monkeypatch):
+    class Environ(dict):
+        # like os.environ, which rejects names it cannot pass to the process environment
+        def __setitem__(self, key, value):
+            if "=" in key:
+                raise ValueError("illegal environment variable name")
+            super().__setitem__(key, value)
+
+        def update(self, values):
+            for key, value in values.items():
+                self[key] = value
+
+    monkeypatch.setattr(os, "environ", Environ(os.environ))
+    store = store_factory
+
+    errors = store.put_many({"NEW": "VALUE", "IN=VALID": "VALUE"})
+
+    assert errors["NEW"] is None
+    assert isinstance(errors["IN=VALID"], ValueError)
+    assert os.environ["NEW"] == r'"VALUE"'
+
+
+def test_delete_many(store_factory):
+    store = store_factory
+    store.add("OTHER", "VALUE")
+    store.get("KEY")
+
+    errors = store.delete_many(["KEY", "OTHER", "MISSING"])
+
+    assert errors["KEY"] is None
+
+    assert errors["OTHER"] is None
+    assert isinstance(errors["MISSING"], SecretNotFoundError)
+    assert "KEY" not in os.environ
+    with pytest.raises(SecretNotFoundError):
+        store.get("KEY")
@@ -0,0 +1,186 @@
+import base64
+
+import pytest
+
+pytest.importorskip("google.cloud.secretmanager")
+
+from google.auth.credentials import AnonymousCredentials  # noqa: E402
+from google.cloud import secretmanager  # noqa: E402
+
+from secretmanager.error import SecretAlreadyExistsError, SecretNotFoundError  # noqa: E402
+from secretmanager.fork import ClientPool  # noqa: E402
+from secretmanager.implementations import gc  # noqa: E402
+from secretmanager.implementations.gc import GoogleSecretStore  # noqa: E402
+
+PROJECT = "project"
+
+
+SECRETS = f"/v1/projects/{PROJECT}/secrets"
+
+
+def error(status: int, code: str) -> tuple:
+    return status, {"error": {"code": status, "message": code, "status": code}}
+
+
+class FakeSecretManager:
+    """In-memory state of the Secret Manager REST API"""
+
+    def __init__(self) -> None:
+        self.secrets: dict[str, list[bytes]] = {}
+
+    def add(self, key: str, *values: str) -> None:
+        self.secrets.setdefault(key, []).extend(v.encode() for v in values)
+
+    def route(self, request) -> tuple:
+        method, path, query = request.method, request.path.removeprefix(SECRETS).lstrip("/"), request.query
+        if method == "GET" and path.endswith(":access"):
+            key, _, version = path.removesuffix(":access").partition("/versions/")
+            if key not in self.secrets:
+                return error(404, "NOT_FOUND")
+            number = len(self.secrets[key]) if version == "latest" else int(version)
+            data = base64.b64encode(self.secrets[key][number - 1]).decode()
+            return 200, {"name": f"projects/{PROJECT}/secrets/{key}/versions/{number}", "payload": {"data": data}}
+        if method == "GET" and path == "":
+            keys = sorted(self.secrets)
+            if flt := query.get("filter"):
+                keys = [k for k in keys if flt.removeprefix("name:") in k]
+            start = int(query.get("pageToken") or 0)
+            end = start + int(query.get("pageSize", 25000))
+            body: dict = {"secrets": [{"name": f"projects/{PROJECT}/secrets/{k}"} for k in keys[start:end]]}
+            if end < len(keys):
+                body["nextPageToken"] = str(end)
+            return 200, body
+        if method == "POST" and path == "":
+            key = query["secretId"]
+            if key in self.secrets:
+                return error(409, "ALREADY_EXISTS")
+            self.secrets[key] = []
+            return 200, {"name": f"projects/{PROJECT}/secrets/{key}"}
+        if method == "POST" and path.endswith(":addVersion"):
+            key = path.removesuffix(":addVersion")
+            if key not in self.secrets:
+                return error(404, "NOT_FOUND")
+            self.secrets[key].append(base64.b64decode(request.json()["payload"]["data"]))
+            return 200, {"name": f"projects/{PROJECT}/secrets/{key}/versions/{len(self.secrets[key])}"}
+        if method == "DELETE":
+            if self.secrets.pop(path, None) is None:
+                return error(404, "NOT_FOUND")
+            return 200, {}
+        return error(400, "INVALID_ARGUMENT")
+
+
+@pytest.fixture
+def fake():
+    fake = FakeSecretManager()
+    fake.add("KEY", "VALUE")
+    fake.add("COMPLEX", r'{"LIST":[1,2,3]}')
+    return fake
+
+
+@pytest.fixture
+def server(fake, serve):
+    return serve(fake.route)
+
+
+@pytest.fixture
+def store(server):
+    client = secretmanager.SecretManagerServiceClient(
+        credentials=AnonymousCredentials(), transport="rest", client_options={"api_endpoint": server.url}
+    )
+    return GoogleSecretStore(project=PROJECT, client=client)
+
+
+def test_getting(store):
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+
+
+def test_getting_missing(store):
+    with pytest.raises(SecretNotFoundError, match="was not found"):
+        store.get("MISSING")
+
+
+def test_getting_is_cached(store, server):
+    store.get("KEY")
+    store.get("KEY")
+
+    assert len(server.requests) == 1
+
+
+def test_latest_is_pinned(store, fake, server, cache, settings):
+    settings.gc.alias_ttl = 60
+    store.get("KEY")
+    fake.add("KEY", "NEW")
+    cache.clear()
+
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert server.requests[-1] == ("GET", f"{SECRETS}/KEY/versions/1:access")
+
+    settings.gc.alias_ttl = 0
+    store._unpin("KEY")
+    cache.clear()
+    assert store.get("KEY").get_secret_value() == "NEW"
+
+
+def test_getting_many_concurrently(store, fake, server):
+    for i in range(8):
+        fake.add(f"KEY_{i}", f"VALUE_{i}")
+    server.delay = 0.05
+
+    values = store.get_many([*(f"KEY_{i}" for i in range(8)), "MISSING"])
+
+    assert {k: v.get_secret_value() for k, v in values.items()} == {f"KEY_{i}": f"VALUE_{i}" for i in range(8)}
+    assert server.max_in_flight > 1
+
+
+def test_list_secret_keys_paginates(store, server, settings):
+    settings.gc.page_size = 1
+
+    assert store.list_secret_keys() == {"KEY", "COMPLEX"}
+    assert server.requests.count(("GET", SECRETS)) == 2
+
+
+def test_list_secret_keys_filter(store, settings):
+    settings.gc.list_filter = "name:COMP"
+
+    assert store.list_secret_keys() == {"COMPLEX"}
+
+
+def test_adding(store, fake):
+    store.add("NEW", {"a": 1})
+
+    assert fake.secrets["NEW"] == [b'{"a":1}']
+    with pytest.raises(SecretAlreadyExistsError):
+        store.add("NEW", "VALUE")
+
+
+def test_updating(store, fake, cache):
+    store.get("KEY")
+    store.update("KEY", "UPDATED")
+    cache.clear()
+
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+    assert len(fake.secrets["KEY"]) == 2
+
+
+def test_delete(store, fake):
+    store.get("KEY")
+    store.delete("KEY")
+
+    assert "KEY" not in fake.secrets
+    with pytest.raises(SecretNotFoundError):
+        store.get("KEY")
+
+
+def test_shared_client(monkeypatch):
+    created = []
+    monkeypatch.setattr(gc, "_clients", ClientPool())
+    monkeypatch.setattr(
+        gc.secretmanager, "SecretManagerServiceClient", lambda **kwargs: created.append(kwargs) or object()
+    )
+
+    GoogleSecretStore(project=PROJECT)
+    GoogleSecretStore(project=PROJECT)
+    GoogleSecretStore(project=PROJECT, transport="rest")
+
+    assert len(created) == 2
@@ -0,0 +1,259 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from secretmanager.error import SecretAlreadyExistsError, SecretBundleError, SecretNotFoundError  # noqa: E402
+from secretmanager.fork import ClientPool  # noqa: E402
+from secretmanager.implementations import httpkv  # noqa: E402
+from secretmanager.implementations.httpkv import HttpKVStore  # noqa: E402
+
+TOKEN = "s.token"
+
+
+class FakeVault:
+    """In-memory state of a KV version 2 engine mounted at secret/"""
+
+    def __init__(self) -> None:
+        self.secrets: dict[str, dict] = {"KEY": {"value": "VALUE"}, "COMPLEX": {"LIST": [1, 2, 3]}}
+        self.token_ttl = 0
+        self.renewals = 0
+        self.fail = False
+
+    def route(self, request) -> tuple:
+        if request.headers.get("X-Vault-Token") != TOKEN:
+            return 403, {"errors": ["permission denied"]}
+        if self.fail:
+            return 503, {"errors": ["sealed"]}
+        method, path = request.method, request.path
+        if path == "/v1/auth/token/lookup-self":
+            return 200, {"data": {"ttl": self.token_ttl, "renewable": self.token_ttl > 0}}
+        if path == "/v1/auth/token/renew-self":
+            self.renewals += 1
+            return 200, {"auth": {"lease_duration": self.token_ttl, "renewable": True}}
+        if path.startswith("/v1/secret/data/"):
+            key = path.removeprefix("/v1/secret/data/")
+            if method == "GET":
+                if key not in self.secrets:
+                    return 404, {"errors": []}
+                return 200, {"data": {"data": self.secrets[key], "metadata": {"version": 1}}}
+            body = request.json()
+            if body.get("options", {}).get("cas") == 0 and key in self.secrets:
+                return 400, {"errors": ["check-and-set parameter did not match the current version"]}
+            self.secrets[key] = body["data"]
+            return 200, {"data": {"version": 1}}
+        if path.startswith("/v1/secret/metadata/"):
+            key = path.removeprefix("/v1/secret/metadata/")
+            if method == "DELETE":
+                self.secrets.pop(key, None)
+                return 204, None
+            if request.query.get("list") == "true":
+                # direct children of the folder, sub folders end with a slash
+                names = {
+                    k.removeprefix(key).partition("/")[0] + k.removeprefix(key).partition("/")[1]
+                    for k in self.secrets
+                    if k.startswith(key)
+                }
+                if not names:
+                    return 404, {"errors": []}
+                return 200, {"data": {"keys": sorted(names)}}
+        return 400, {"errors": ["unsupported"]}
+
+
+@pytest.fixture
+def fake():
+    return FakeVault()
+
+
+@pytest.fixture
+def server(fake, serve):
+    return serve(fake.route)
+
+
+@pytest.fixture(autouse=True)
+def shared(monkeypatch):
+    monkeypatch.setattr(httpkv, "_clients", ClientPool())
+    monkeypatch.setattr(httpkv, "_renewers", ClientPool())
+    yield
+    for renewer in httpkv._renewers.values():
+        renewer.stop()
+    for client in httpkv._clients.values():
+        client.close()
+
+
+@pytest.fixture
+def store(server):
+    return HttpKVStore(server.url, token=TOKEN)
+
+
+def test_missing_url(monkeypatch):
+    monkeypatch.delenv("VAULT_ADDR", raising=False)
+    with pytest.raises(ValueError, match="No secret service url"):
+        HttpKVStore(token=TOKEN)
+
+
+def test_settings_from_environment(server, monkeypatch):
+    monkeypatch.setenv("VAULT_ADDR", server.url)
+    monkeypatch.setenv("VAULT_TOKEN", TOKEN)
+
+    assert HttpKVStore().get("KEY").get_secret_value() == "VALUE"
+
+
+def test_getting(store):
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+
+
+def test_getting_missing(store):
+    with pytest.raises(SecretNotFoundError, match="was not found"):
+        store.get("MISSING")
+
+
+def test_getting_is_cached(store, server):
+    store.get("KEY")
+    store.get("KEY")
+
+    assert server.requests.count(("GET", "/v1/secret/data/KEY")) == 1
+
+
+def test_serving_stale(store, fake, cache, settings):
+    settings.cache.max_staleness = 60
+    cache.max_staleness = 60
+    store.get("KEY")
+    cache.expires_in = 0
+    fake.fail = True
+
+    assert store.get("KEY").get_secret_value() == "VALUE"
+
+
+def test_getting_many_serves_stale_per_key(store, fake, cache, settings):
+    settings.cache.max_staleness = 60
+    cache.max_staleness = 60
+    store.get("KEY")
+    cache.expires_in = 0
+    fake.fail = True
+
+    with pytest.raises(SecretBundleError) as e:
+        store.get_many(["KEY", "COMPLEX"])
+
+    assert e.value.values["KEY"].get_secret_value() == "VALUE"
+    assert list(e.value.errors) == ["COMPLEX"]
+
+
+def test_connections_are_reused(store, server):
+    for _ in range(5):
+        with pytest.raises(SecretNotFoundError):
+            store.get("MISSING")
+    store.update("KEY", "UPDATED")
+    store.get_many(["KEY", "COMPLEX"])
+
+    assert len(server.connections) <= 2
+
+
+def test_getting_many_in_parallel(store, fake, server):
+    fake.secrets.update({f"KEY_{i}": {"value": f"VALUE_{i}"} for i in range(8)})
+    server.delay = 0.05
+
+    values = store.get_many([*(f"KEY_{i}" for i in range(8)), "MISSING"])
+
+    assert {k: v.get_secret_value() for k, v in values.items()} == {f"KEY_{i}": f"VALUE_{i}" for i in range(8)}
+    assert server.max_in_flight > 1
+
+
+def test_list_secrets(store, fake):
+    fake.secrets["app/db/PASSWORD"] = {"value": "PASSWORD"}
+
+    assert store.list_secret_keys() == {"KEY", "COMPLEX", "app/db/PASSWORD"}
+    assert {k: v.get_secret_value() for k, v in store.list_secrets().items()} == {
+        "KEY": "VALUE",
+        "COMPLEX": {"LIST": [1, 2, 3]},
+        "app/db/PASSWORD": "PASSWORD",
+    }
+
+
+def test_adding(store, fake):
+    store.add("NEW", {"a": 1})
+    store.add("LIST", [1, 2])
+
+    assert fake.secrets["NEW"] == {"a": 1}
+    assert store.get("LIST").get_secret_value() == [1, 2]
+    with pytest.raises(SecretAlreadyExistsError):
+        store.add("NEW", "VALUE")
+
+
+def test_updating(store, fake, cache):
+    store.get("KEY")
+    store.update("KEY", "UPDATED")
+
+    assert fake.secrets["KEY"] == {"value": "UPDATED"}
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+
+
+def test_delete(store, fake):
+    store.get("KEY")
+    store.delete("KEY")
+
+    assert "KEY" not in fake.secrets
+    with pytest.raises(SecretNotFoundError):
+        store.get("KEY")
+    with pytest.raises(SecretNotFoundError):
+        store.delete("KEY")
+
+
+def test_kv_version_1(server, settings):
+    settings.http.mount = "kv"
+    settings.http.kv_version = 1
+    store = HttpKVStore(server.url, token=TOKEN)
+
+    assert store._path("KEY") == "/v1/kv/KEY"
+    assert store._path("a b", "metadata") == "/v1/kv/a%20b"
+
+
+def test_token_renewal(fake, server):
+    fake.token_ttl = 0.15
+    store = HttpKVStore(server.url, token=TOKEN)
+
+    assert store._renewer is not None
+    deadline = time.monotonic() + 2
+    while store._renewer.renewals < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store._renewer.renewals >= 2
+    assert fake.renewals >= 2
+
+
+def test_token_without_ttl_is_not_renewed(store, fake):
+    time.sleep(0.05)
+
+    assert fake.renewals == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_client_not_shared_after_fork(store, cache):
+    parent = store._client
+    store.get("KEY")
+    cache.clear()
+
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            ok = store._client is not parent and store.get("KEY").get_secret_value() == "VALUE"
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert store._client is parent
+
+
+def test_shared_client(server, settings):
+    a = HttpKVStore(server.url, token=TOKEN)
+    b = HttpKVStore(server.url, token=TOKEN)
+    settings.http.http2 = True
+    c = HttpKVStore(server.url, token=TOKEN)
+
+    assert a._client is b._client
+    assert a._renewer is b._renewer
+    assert a._client is not c._client
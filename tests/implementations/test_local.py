@@ -0,0 +1,192 @@
+import os
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from secretmanager.error import SecretAlreadyExistsError, SecretDecryptionError, SecretNotFoundError  # noqa: E402
+from secretmanager.implementations import local  # noqa: E402
+from secretmanager.implementations.local import LocalVaultStore  # noqa: E402
+
+KEY = bytes(range(32))
+
+
+@pytest.fixture
+def file(tmp_path):
+    return tmp_path / "vault"
+
+
+@pytest.fixture
+def store(file):
+    store = LocalVaultStore(file, key=KEY, create=True)
+    store.add("KEY", "VALUE")
+    store.add("COMPLEX", {"LIST": [1, 2, 3]})
+    return store
+
+
+def test_missing_file(file):
+    with pytest.raises(ValueError, match="does not exist"):
+        LocalVaultStore(file, key=KEY)
+
+
+def test_missing_key(file):
+    with pytest.raises(ValueError, match="No vault key"):
+        LocalVaultStore(file, create=True)
+
+
+def test_not_a_vault(file):
+    file.write_text("KEY=VALUE")
+    with pytest.raises(ValueError, match="is not a vault"):
+        LocalVaultStore(file, key=KEY)
+
+
+def test_getting(store):
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+    assert store.get_many(["KEY", "MISSING"]).keys() == {"KEY"}
+
+
+def test_getting_missing(store):
+    with pytest.raises(SecretNotFoundError, match="was not found"):
+        store.get("MISSING")
+
+
+def test_values_are_encrypted(store, file):
+    assert b"VALUE" not in file.read_bytes()
+    assert b"KEY" not in file.read_bytes()
+
+
+def test_wrong_key(store, file):
+    with pytest.raises(SecretDecryptionError):
+        LocalVaultStore(file, key=bytes(32))
+
+
+def test_tampering_is_detected(store, file):
+    offset, length = store._state.index["KEY"]
+    data = bytearray(file.read_bytes())
+    data[offset + length - 1] ^= 1
+    file.write_bytes(bytes(data))
+
+    with pytest.raises(SecretDecryptionError):
+        store.get("KEY")
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+
+
+def test_swapped_entries_are_detected(store, file):
+    # entries are bound to their key, hence pointing a key to another entry fails
+    state = store._state
+    index = {"KEY": state.index["COMPLEX"], "COMPLEX": state.index["KEY"]}
+    store._state = local._VaultState(state.mm, index, state.identity, state.size, state.index_length)
+
+    with pytest.raises(SecretDecryptionError):
+        store.get("KEY")
+
+
+def test_passphrase(file):
+    LocalVaultStore(file, key="passphrase", create=True).add("KEY", "VALUE")
+
+    assert LocalVaultStore(file, key="passphrase").get("KEY").get_secret_value() == "VALUE"
+    with pytest.raises(SecretDecryptionError):
+        LocalVaultStore(file, key="wrong")
+
+
+def test_key_from_settings(file, tmp_path, settings):
+    key_file = tmp_path / "key"
+    key_file.write_text("passphrase\n")
+    settings.local.file = file
+    settings.local.key_file = key_file
+    LocalVaultStore(create=True).add("KEY", "VALUE")
+
+    assert LocalVaultStore(key="passphrase").get("KEY").get_secret_value() == "VALUE"
+
+
+def test_adding(store):
+    with pytest.raises(SecretAlreadyExistsError):
+        store.add("KEY", "VALUE")
+
+
+def test_updating(store, file):
+    store.update("KEY", "UPDATED")
+    store.update("NEW", "NEW")
+
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+    assert LocalVaultStore(file, key=KEY).get("NEW").get_secret_value() == "NEW"
+
+
+def test_delete(store):
+    store.delete("KEY")
+
+    assert store.list_secret_keys() == {"COMPLEX"}
+    with pytest.raises(SecretNotFoundError):
+        store.delete("KEY")
+
+
+def test_put_many(store, file):
+    errors = store.put_many({"KEY": "UPDATED", "NEW": [1]})
+
+    assert errors == {"KEY": None, "NEW": None}
+    other = LocalVaultStore(file, key=KEY)
+    assert other.get("KEY").get_secret_value() == "UPDATED"
+    assert other.get("NEW").get_secret_value() == [1]
+
+
+def test_delete_many(store):
+    errors = store.delete_many(["KEY", "MISSING"])
+
+    assert errors["KEY"] is None
+    assert isinstance(errors["MISSING"], SecretNotFoundError)
+    assert store.list_secret_keys() == {"COMPLEX"}
+
+
+def test_writes_are_visible_to_other_stores(store, file):
+    other = LocalVaultStore(file, key=KEY)
+    other.update("KEY", "UPDATED")
+    other.add("NEW", "NEW")
+
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+    assert store.list_secret_keys() == {"KEY", "COMPLEX", "NEW"}
+
+
+def test_compact(store, file):
+    for i in range(20):
+        store.update("KEY", f"VALUE_{i}")
+    size = file.stat().st_size
+    other = LocalVaultStore(file, key=KEY)
+
+    store.compact()
+
+    assert file.stat().st_size < size / 4
+    assert store.get("KEY").get_secret_value() == "VALUE_19"
+    assert other.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+    other.update("KEY", "UPDATED")
+    assert store.get("KEY").get_secret_value() == "UPDATED"
+
+
+def test_compact_automatically(store, file, settings, monkeypatch):
+    monkeypatch.setattr(local, "_MIN_COMPACT_SIZE", 0)
+    settings.local.compact_threshold = 0.9
+    for i in range(20):
+        store.update("KEY", f"VALUE_{i}")
+
+    assert file.stat().st_size < 1024
+    assert store.get("KEY").get_secret_value() == "VALUE_19"
+
+
+def test_interrupted_write(store, file):
+    # records appended without updating the header are ignored
+    with file.open("ab") as f:
+        f.write(os.urandom(100))
+
+    assert LocalVaultStore(file, key=KEY).get("KEY").get_secret_value() == "VALUE"
+    store.update("KEY", "UPDATED")
+    assert LocalVaultStore(file, key=KEY).get("KEY").get_secret_value() == "UPDATED"
+
+
+def test_lock_reset_after_fork(store):
+    lock = store._lock
+    lock.acquire()
+
+    local._reset_locks()
+    assert store._lock is not lock
+    store.add("OTHER", "VALUE")
+    assert store.get("OTHER").get_secret_value() == "VALUE"
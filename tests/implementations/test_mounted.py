@@ -0,0 +1,171 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from secretmanager.error import SecretNotFoundError
+from secretmanager.implementations import mounted
+from secretmanager.implementations.mounted import MountedSecretStore
+
+
+def eventually(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture(autouse=True)
+def indexes(monkeypatch):
+    monkeypatch.setattr(mounted, "_indexes", {})
+    yield
+    for index in mounted._indexes.values():
+        index.close()
+
+
+@pytest.fixture
+def directory(tmp_path):
+    directory = tmp_path / "secrets"
+    directory.mkdir()
+    (directory / "KEY").write_text("VALUE")
+    (directory / "COMPLEX").write_text(r'{"LIST":[1,2,3]}')
+    return directory
+
+
+def kubernetes_volume(directory, version: int, secrets: dict[str, str]) -> None:
+    """Atomically update the volume like the kubelet does, by swapping the `..data` symlink"""
+    data = directory / f"..{version}"
+    data.mkdir()
+    for key, value in secrets.items():
+        (data / key).write_text(value)
+    (directory / "..data_tmp").symlink_to(data.name)
+    previous = (directory / "..data").resolve() if (directory / "..data").exists() else None
+    (directory / "..data_tmp").rename(directory / "..data")
+    for key in secrets:
+        if not (directory / key).is_symlink():
+            (directory / key).symlink_to(f"..data/{key}")
+    if previous is not None:
+        shutil.rmtree(previous)
+
+
+def test_missing_directory(tmp_path):
+    with pytest.raises(ValueError, match="does not exist"):
+        MountedSecretStore(tmp_path / "missing")
+
+
+def test_not_a_directory(directory):
+    with pytest.raises(ValueError, match="is not a directory"):
+        MountedSecretStore(directory / "KEY")
+
+
+def test_getting(directory):
+    store = MountedSecretStore(directory)
+
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+    assert store.get_many(["KEY", "MISSING"]).keys() == {"KEY"}
+    assert store.list_secret_keys() == {"KEY", "COMPLEX"}
+
+
+def test_getting_missing(directory):
+    with pytest.raises(SecretNotFoundError, match="was not found"):
+        MountedSecretStore(directory).get("MISSING")
+
+
+def test_read_only(directory):
+    store = MountedSecretStore(directory)
+    with pytest.raises(NotImplementedError):
+        store.add("NEW", "VALUE")
+    with pytest.raises(NotImplementedError):
+        store.delete("KEY")
+
+
+def test_lookups_do_not_touch_disk(directory, monkeypatch):
+    store = MountedSecretStore(directory)
+    monkeypatch.setattr(mounted, "_snapshot", None)
+    monkeypatch.setattr(mounted, "_signature", None)
+
+    assert store.get("KEY").get_secret_value() == "VALUE"
+
+
+def test_index_is_shared(directory):
+    assert MountedSecretStore(directory)._index is MountedSecretStore(directory)._index
+
+
+def test_inotify_picks_up_changes(directory):
+    store = MountedSecretStore(directory)
+    if not store._index.watching:
+        pytest.skip("inotify is not available")
+
+    (directory / "KEY").write_text("ROTATED")
+    (directory / "NEW").write_text("NEW")
+    (directory / "COMPLEX").unlink()
+
+    assert eventually(lambda: store.list_secret_keys() == {"KEY", "NEW"})
+    assert eventually(lambda: store.get("KEY").get_secret_value() == "ROTATED")
+
+
+def test_kubernetes_symlink_swap(tmp_path):
+    directory = tmp_path / "volume"
+    directory.mkdir()
+    kubernetes_volume(directory, 1, {"KEY": "VALUE"})
+    store = MountedSecretStore(directory)
+    assert store.list_secret_keys() == {"KEY"}
+
+    kubernetes_volume(directory, 2, {"KEY": "ROTATED"})
+
+    assert eventually(lambda: store.get("KEY").get_secret_value() == "ROTATED")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_watch_after_fork(directory):
+    store = MountedSecretStore(directory)
+    index = store._index
+    if not index.watching:
+        pytest.skip("inotify is not available")
+
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            # the watch thread of the parent does not exist in the child, which starts a watch of its own
+            ok = index.lost and store.get("KEY").get_secret_value() == "VALUE"
+            ok = ok and store._index is not index and store._index.watching
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    # the watch of the parent is not affected by the child
+    (directory / "KEY").write_text("ROTATED")
+    assert store._index is index
+    assert eventually(lambda: store.get("KEY").get_secret_value() == "ROTATED")
+
+
+def test_polling(directory, settings):
+    settings.mounted.watch = "poll"
+    settings.mounted.poll_interval = 60
+    store = MountedSecretStore(directory)
+    assert not store._index.watching
+
+    (directory / "KEY").write_text("ROTATED")
+    assert store.get("KEY").get_secret_value() == "VALUE"
+
+    settings.mounted.poll_interval = 0
+    assert store.get("KEY").get_secret_value() == "ROTATED"
+
+
+def test_polling_kubernetes_symlink_swap(tmp_path, settings):
+    settings.mounted.watch = "poll"
+    settings.mounted.poll_interval = 0
+    directory = tmp_path / "volume"
+    directory.mkdir()
+    kubernetes_volume(directory, 1, {"KEY": "VALUE"})
+    store = MountedSecretStore(directory)
+
+    kubernetes_volume(directory, 2, {"KEY": "ROTATED"})
+
+    assert store.get("KEY").get_secret_value() == "ROTATED"
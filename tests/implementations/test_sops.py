@@ -1,6 +1,9 @@
+import subprocess
+import time
+
 import pytest
 
-from secretmanager.error import SecretNotFoundError
+from secretmanager.error import SecretNotFoundError, SecretTimeoutError
 from secretmanager.implementations.sops import SOPSSecretStore
 
 
@@ -20,7 +23,7 @@ def _set_sops_binary(monkeypatch):
 def store(monkeypatch, sops_file) -> SOPSSecretStore:
     monkeypatch.setattr(
         "secretmanager.implementations.sops.SOPSSecretStore._decrypt",
-        lambda x: b'{"KEY": "VALUE", "TEST": {"key": "value"}}',
+        lambda *args, **kwargs: b'{"KEY": "VALUE", "TEST": {"key": "value"}}',
     )
     return SOPSSecretStore(sops_file)
 
@@ -54,6 +57,13 @@ def test_getting(store):
     assert val.get_secret_value() == "VALUE"
 
 
+def test_getting_many(store):
+    values = store.get_many(["KEY", "TEST", "MISSING"])
+
+    assert set(values) == {"KEY", "TEST"}
+    assert values["TEST"].get_secret_value() == {"key": "value"}
+
+
 def test_list_secret_keys(store):
     secrets = store.list_secret_keys()
 
@@ -68,3 +78,40 @@ def test_list_secrets(store):
     assert secrets["KEY"].get_secret_value() == "VALUE"
     assert "TEST" in secrets
     assert secrets["TEST"].get_secret_value() == {"key": "value"}
+
+
+def test_decrypt_timeout(monkeypatch, sops_file):
+    def run(*args, timeout=None, **kwargs):
+        raise subprocess.TimeoutExpired(args[0], timeout)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    store = SOPSSecretStore(sops_file)
+
+    with pytest.raises(SecretTimeoutError, match="timed out after 0.1s"):
+        store.get("KEY", timeout=0.1)
+
+
+def test_decrypt_timeout_serves_stale(monkeypatch, store, cache):
+    cache.expires_in = 0
+    cache.max_staleness = 60
+    store.get("KEY")
+
+    def decrypt(*args, **kwargs):
+        raise SecretTimeoutError("timed out")
+
+    monkeypatch.setattr(store, "_decrypt", decrypt)
+    time.sleep(0.01)
+
+    assert store.get("KEY", timeout=0.1).get_secret_value() == "VALUE"
+
+
+def test_watch(monkeypatch, store, sops_file, cache):
+    store.get("TEST")
+
+    with store.watch(interval=60) as watch:
+        assert watch.check() == set()
+        monkeypatch.setattr(store, "_decrypt", lambda *args, **kwargs: b'{"KEY": "VALUE", "TEST": {"key": "rotated"}}')
+        sops_file.write_text("rotated")
+        assert watch.check() == {"TEST"}
+
+    assert store.get("TEST").get_secret_value() == {"key": "rotated"}
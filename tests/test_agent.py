@@ -0,0 +1,77 @@
+import os
+import stat
+import threading
+
+import pytest
+
+from secretmanager.agent import AgentServer, AgentStore
+from secretmanager.error import SecretNotFoundError
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.registry import get_default_store
+from secretmanager.secret import Secret
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("KEY", "VALUE")
+    monkeypatch.setenv("COMPLEX", r'{"LIST":[1,2,3]}')
+    return EnvVarStore()
+
+
+@pytest.fixture
+def server(store, tmp_path):
+    server = AgentServer(tmp_path / "agent.sock", store=store)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_socket_permissions(server):
+    assert stat.S_IMODE(server.path.stat().st_mode) == 0o600
+
+
+def test_get(server):
+    store = AgentStore(server.path)
+
+    assert store.get("KEY").get_secret_value() == "VALUE"
+    assert store.get("COMPLEX").get_secret_value() == {"LIST": [1, 2, 3]}
+    with pytest.raises(SecretNotFoundError, match="was not found"):
+        store.get("MISSING")
+
+
+def test_get_many(server):
+    values = AgentStore(server.path).get_many(["KEY", "COMPLEX", "MISSING"])
+
+    assert {k: v.get_secret_value() for k, v in values.items()} == {"KEY": "VALUE", "COMPLEX": {"LIST": [1, 2, 3]}}
+
+
+def test_list_secret_keys(server):
+    assert {"KEY", "COMPLEX"} <= AgentStore(server.path).list_secret_keys()
+
+
+def test_secret_uses_agent(server, settings, monkeypatch):
+    settings.agent_sock = str(server.path)
+    monkeypatch.setattr(server.store, "get", lambda key, timeout=None: EnvVarStore().get("COMPLEX"))
+
+    assert isinstance(get_default_store(), AgentStore)
+    assert Secret("KEY")() == {"LIST": [1, 2, 3]}
+
+
+def test_fallback_without_agent(store, settings, tmp_path):
+    settings.agent_sock = str(tmp_path / "missing.sock")
+
+    assert isinstance(get_default_store(), EnvVarStore)
+    assert Secret("KEY")() == "VALUE"
+
+
+def test_fallback_when_agent_stops(server, store):
+    agent_store = AgentStore(server.path)
+    agent_store.get("KEY")
+    server.shutdown()
+    server.server_close()
+    agent_store._client.close()
+
+    assert agent_store.get("KEY").get_secret_value() == "VALUE"
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from secretmanager.bench import BENCHMARKS, compare, run_benchmarks
+from secretmanager.cli import app
+
+runner = CliRunner()
+
+
+@pytest.mark.parametrize("name", [name for name in BENCHMARKS if name != "cli"])
+def test_benchmark(name: str):
+    report = run_benchmarks([name], repeat=1, size=5)
+
+    assert report["size"] == 5
+    assert report["results"]
+    for result in report["results"]:
+        assert result["runs"] == 1
+        assert 0 < result["min"] <= result["median"] <= result["max"]
+
+
+def test_benchmark_cold_and_warm():
+    names = [r["name"] for r in run_benchmarks(["env"], repeat=1, size=5)["results"]]
+
+    assert names == ["env.get[cold]", "env.get[warm]", "env.get_many[cold]", "env.get_many[warm]"]
+
+
+def test_benchmark_unknown():
+    with pytest.raises(ValueError, match="Unknown benchmark"):
+        run_benchmarks(["unknown"])
+
+
+def test_compare():
+    baseline = {"results": [{"name": "a", "median": 1.0}, {"name": "b", "median": 1.0}]}
+    current = {"results": [{"name": "a", "median": 2.0}, {"name": "c", "median": 1.0}, {"name": "d", "skipped": ""}]}
+
+    assert compare(baseline, current) == [{"name": "a", "baseline": 1.0, "current": 2.0, "ratio": 2.0}]
+
+
+def test_cli_bench(tmp_path):
+    output = tmp_path / "report.json"
+    result = runner.invoke(app, ["bench", "env", "--repeat", "1", "--size", "2", "--output", str(output)])
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(output.read_text())
+    assert {r["name"] for r in report["results"]} >= {"env.get[cold]", "env.get_many[warm]"}
+
+
+def test_cli_bench_regression(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": [{"name": "env.get[cold]", "median": 1e-12}]}))
+
+    result = runner.invoke(app, ["bench", "env", "--repeat", "1", "--baseline", str(baseline), "--max-ratio", "2"])
+
+    assert result.exit_code == 1
+    assert "Regression: env.get[cold]" in result.output
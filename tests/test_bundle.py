@@ -0,0 +1,108 @@
+import os
+
+import pytest
+from pydantic import BaseModel
+
+from secretmanager.bundle import SecretBundle, prefetch
+from secretmanager.error import SecretBundleError, SecretNotFoundError
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.secret import Secret
+from secretmanager.settings import StoreSettings
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("KEY", "VALUE")
+    monkeypatch.setenv("PREFIX_KEY", "PREFIXED_VALUE")
+    monkeypatch.setenv("COMPLEX", r'{"MAPPING":{"KEY":"VALUE"},"LIST":[1,2,3]}')
+    return EnvVarStore()
+
+
+def test_bundle(store):
+    bundle = SecretBundle(["KEY", "COMPLEX"], store=store)
+
+    assert bundle() == {"KEY": "VALUE", "COMPLEX": {"MAPPING": {"KEY": "VALUE"}, "LIST": [1, 2, 3]}}
+
+
+def test_bundle_mapping_and_filter(store):
+    bundle = SecretBundle(
+        ["KEY", Secret("COMPLEX", settings=StoreSettings(filter_key=["COMPLEX"]))],
+        store=store,
+        settings=StoreSettings(prefix="PREFIX_"),
+    )
+
+    assert bundle() == {"KEY": "PREFIXED_VALUE", "COMPLEX": None}
+
+
+def test_bundle_keys_mapped_to_same_key(store):
+    bundle = SecretBundle(["A", "B"], store=store, settings=StoreSettings(mapping={"A": "KEY", "B": "KEY"}))
+
+    assert bundle() == {"A": "VALUE", "B": "VALUE"}
+
+
+def test_bundle_collects_errors(store):
+    bundle = SecretBundle(["KEY", "MISSING", "OTHER_MISSING"], store=store)
+
+    with pytest.raises(SecretBundleError, match="2 secret") as exc_info:
+        bundle()
+
+    assert set(exc_info.value.errors) == {"MISSING", "OTHER_MISSING"}
+    assert all(isinstance(e, SecretNotFoundError) for e in exc_info.value.errors.values())
+    assert exc_info.value.values["KEY"].get_secret_value() == "VALUE"
+
+
+def test_bundle_keeps_partial_values_of_store(store, monkeypatch):
+    get_many = store.get_many
+
+    def partial_get_many(keys, timeout=None):
+        raise SecretBundleError({"COMPLEX": ConnectionError("backend down")}, get_many(["KEY"]))
+
+    monkeypatch.setattr(store, "get_many", partial_get_many)
+
+    with pytest.raises(SecretBundleError) as e:
+        SecretBundle(["KEY", "COMPLEX"], store=store)()
+
+    assert e.value.values["KEY"].get_secret_value() == "VALUE"
+    assert isinstance(e.value.errors["COMPLEX"], ConnectionError)
+
+
+def test_bundle_batches_per_store(store, monkeypatch):
+    other_store = EnvVarStore()
+    calls = []
+
+    def get_many(keys, timeout=None):
+        calls.append(list(keys))
+        return {k: store.get(k) for k in keys}
+
+    monkeypatch.setattr(store, "get_many", get_many)
+    monkeypatch.setattr(other_store, "get_many", get_many)
+    bundle = SecretBundle(["KEY", "COMPLEX", Secret("PREFIX_KEY", store=other_store)], store=store)
+
+    assert bundle()["PREFIX_KEY"] == "PREFIXED_VALUE"
+    assert sorted(calls) == [["KEY", "COMPLEX"], ["PREFIX_KEY"]]
+
+
+def test_bundle_from_model(store):
+    class Model(BaseModel):
+        KEY: str
+        COMPLEX: dict
+
+    bundle = SecretBundle.from_model(Model, store=store)
+
+    model = bundle.to_model()
+    assert model.KEY == "VALUE"
+    assert model.COMPLEX["LIST"] == [1, 2, 3]
+
+
+def test_prefetch_fills_cache(store, cache):
+    bundle = prefetch(["KEY", "COMPLEX"], store=store)
+
+    assert bundle.values["KEY"].get_secret_value() == "VALUE"
+    assert cache.get(store._construct_key("KEY")) == "VALUE"
+
+
+def test_prefetch_without_raising(store):
+    bundle = prefetch(SecretBundle(["KEY", "MISSING"], store=store), raise_errors=False)
+
+    assert set(bundle.values) == {"KEY"}
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from secretmanager.cache import LRUCache
+
+
+def test_expired_entry_is_served_stale(cache: LRUCache, monkeypatch):
+    cache.expires_in = 10
+    cache.max_staleness = 60
+    cache.put("KEY", "VALUE")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+
+    assert cache.get("KEY") is None
+    assert cache.get_stale("KEY") == "VALUE"
+    assert cache.get_stale("KEY", max_staleness=5) is None
+
+
+def test_expired_entry_is_dropped_after_max_staleness(cache: LRUCache, monkeypatch):
+    cache.expires_in = 10
+    cache.max_staleness = 0
+    cache.put("KEY", "VALUE")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+
+    assert cache.get("KEY") is None
+    assert cache.get_stale("KEY") is None
+
+
+def test_hit_gives_second_chance_on_eviction(cache: LRUCache):
+    cache.max_cache_size = 3
+    for key in ("A", "B", "C"):
+        cache.put(key, key)
+
+    cache.put("D", "D")
+    assert cache.get("A") is None
+
+    assert cache.get("B") == "B"
+    cache.put("E", "E")
+
+    assert cache.get("C") is None
+    assert [cache.get(key) for key in ("B", "D", "E")] == ["B", "D", "E"]
+
+
+def test_put_many_and_remove_many(cache: LRUCache):
+    cache.max_cache_size = 3
+    cache.put_many({"A": "A", "B": "B", "C": "C", "D": "D"})
+
+    assert len(cache.cache) == 3
+    assert [cache.get(key) for key in ("B", "C", "D")] == ["B", "C", "D"]
+
+    cache.remove_many(["B", "C", "MISSING"])
+    assert [cache.get(key) for key in ("B", "C", "D")] == [None, None, "D"]
+
+
+def test_generation_changes_on_invalidation(cache: LRUCache):
+    cache.put("A", "A")
+    generation = cache.generation
+
+    cache.put_many({"A": "A", "B": "B"})
+    cache.remove("MISSING")
+    assert cache.generation == generation
+
+    cache.put("A", "CHANGED")
+    assert cache.generation == generation + 1
+    cache.remove("B")
+    assert cache.generation == generation + 2
+    cache.clear()
+    assert cache.generation == generation + 3
+
+
+def test_singleton_is_created_once():
+    barrier = threading.Barrier(8)
+    instances = []
+
+    def create() -> None:
+        barrier.wait()
+        instances.append(LRUCache(max_size=1, expires_in=1, max_staleness=12345))
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(instance) for instance in instances}) == 1
+
+
+def test_concurrent_access(cache: LRUCache):
+    cache.max_cache_size = 64
+    errors = []
+
+    def worker(offset: int) -> None:
+        try:
+            for i in range(2000):
+                key = f"KEY_{(i + offset) % 100}"
+                if i % 3 == 0:
+                    cache.put(key, key)
+                elif i % 17 == 0:
+                    cache.remove(key)
+                # every hit returns the value of its own key
+                assert cache.get(key) in (None, key)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(cache.cache) <= 64
@@ -0,0 +1,75 @@
+import pytest
+
+from secretmanager.circuit import CircuitBreaker, CircuitState
+from secretmanager.error import CircuitOpenError
+from secretmanager.settings import CircuitBreakerSettings
+
+
+def fail():
+    raise ConnectionError("backend unavailable")
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker("test", CircuitBreakerSettings(enabled=True, failure_threshold=2, reset_timeout=0.05))
+
+
+def test_opens_after_threshold(breaker):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError, match="is open"):
+        breaker.call(lambda: "value")
+    assert breaker.metrics.short_circuits == 1
+
+
+def test_success_resets_failures(breaker):
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        assert breaker.call(lambda: "value") == "value"
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker._failures == 0
+
+
+def test_ignores_non_failures(breaker):
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail, is_failure=lambda e: False)
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_recovers(breaker, monkeypatch):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    monkeypatch.setattr(breaker, "_opened_at", breaker._opened_at - 1)
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.call(lambda: "value") == "value"
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_reopens_on_failure(breaker, monkeypatch):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    monkeypatch.setattr(breaker, "_opened_at", breaker._opened_at - 1)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.metrics.transitions[CircuitState.OPEN] == 2
+
+
+def test_disabled():
+    breaker = CircuitBreaker("test", CircuitBreakerSettings(enabled=False, failure_threshold=1))
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.state == CircuitState.CLOSED
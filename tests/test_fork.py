@@ -0,0 +1,94 @@
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable
+
+import pytest
+
+from secretmanager import circuit
+from secretmanager.bundle import prefetch
+from secretmanager.fork import ClientPool, register_at_fork
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.settings import CircuitBreakerSettings
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+
+
+def run_in_child(func: Callable[[], bool]) -> bool:
+    """
+    Run a check in a forked child, which is killed if it deadlocks
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            signal.alarm(5)
+            code = 0 if func() else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status) == 0
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(os, "environ", {"KEY": "VALUE", "COMPLEX": '{"LIST": [1, 2, 3]}'})
+    return EnvVarStore()
+
+
+def test_cache_lock_held_at_fork(cache):
+    def hold() -> None:
+        with cache.lock:
+            time.sleep(0.2)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    time.sleep(0.05)
+
+    def child() -> bool:
+        cache.put("KEY", "VALUE")
+        return cache.get("KEY") == "VALUE" and not cache.lock.locked()
+
+    assert run_in_child(child)
+    thread.join()
+    assert not cache.lock.locked()
+
+
+def test_prefetch_then_fork(store):
+    values = prefetch(["KEY", "COMPLEX"], store=store).values
+
+    def child() -> bool:
+        # the store itself is empty in the child, hence values can only be served from the inherited cache
+        os.environ.clear()
+        return store.get("KEY") == values["KEY"] and store.get_many(["COMPLEX"]) == {"COMPLEX": values["COMPLEX"]}
+
+    assert run_in_child(child)
+
+
+def test_circuit_breaker_lock_held_at_fork():
+    breaker = circuit.get_circuit_breaker("fork", CircuitBreakerSettings())
+    with breaker._lock:
+        assert run_in_child(lambda: breaker.call(lambda: True))
+
+
+def test_client_pool_is_reset_in_child():
+    closed = []
+    pool = ClientPool(on_fork=closed.append)
+    client = pool.get("KEY", object)
+    assert pool.get("KEY", pytest.fail) is client
+
+    def child() -> bool:
+        # the inherited client is handed to on_fork and the child creates its own
+        return closed == [client] and pool.get("KEY", object) is not client and len(pool) == 1
+
+    with pool._lock:
+        assert run_in_child(child)
+    assert closed == []
+    assert pool.values() == [client]
+
+
+def test_register_at_fork_without_fork(monkeypatch):
+    monkeypatch.delattr(os, "register_at_fork")
+
+    register_at_fork(after_in_child=pytest.fail)
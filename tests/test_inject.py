@@ -0,0 +1,143 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from secretmanager.error import SecretBundleError
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.inject import inject
+from secretmanager.secret import Secret
+from secretmanager.store import SecretValue
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("KEY", "VALUE")
+    monkeypatch.setenv("COMPLEX", r'{"LIST":[1,2,3]}')
+    return EnvVarStore()
+
+
+def test_inject(store):
+    @inject(store=store, value="KEY", other=Secret("COMPLEX"))
+    def func(value, other, unrelated=None):
+        return value, other, unrelated
+
+    assert func() == ("VALUE", {"LIST": [1, 2, 3]}, None)
+    assert func(unrelated=1) == ("VALUE", {"LIST": [1, 2, 3]}, 1)
+
+
+def test_inject_caller_overwrites(store):
+    @inject(store=store, value="KEY")
+    def func(value):
+        return value
+
+    assert func("OTHER") == "OTHER"
+    assert func(value="OTHER") == "OTHER"
+
+
+def test_inject_resolves_once(store, monkeypatch):
+    calls = []
+    get_many = store.get_many
+
+    def counting_get_many(keys, timeout=None):
+        calls.append(keys)
+        return get_many(keys, timeout=timeout)
+
+    monkeypatch.setattr(store, "get_many", counting_get_many)
+
+    @inject(store=store, value="KEY")
+    def func(value):
+        return value
+
+    func(), func(), func()
+    assert len(calls) == 1
+
+    func.injector.refresh()
+    func()
+    assert len(calls) == 2
+
+
+def test_inject_resolves_without_cache(store, settings, monkeypatch):
+    settings.cache.enabled = False
+
+    @inject(store=store, value="KEY")
+    def func(value):
+        return value
+
+    assert func() == "VALUE"
+    monkeypatch.setenv("KEY", "CHANGED")
+    assert func() == "CHANGED"
+
+
+def test_inject_resolves_after_invalidation(store):
+    @inject(store=store, value="KEY")
+    def func(value):
+        return value
+
+    assert func() == "VALUE"
+    store.update("KEY", "UPDATED")
+    assert func() == "UPDATED"
+
+    store.delete("KEY")
+    with pytest.raises(SecretBundleError):
+        func()
+
+
+def test_inject_raw(store):
+    @inject(store=store, raw=True, value="KEY")
+    def func(value):
+        return value
+
+    value = func()
+    assert isinstance(value, SecretValue)
+    assert value.get_secret_value() == "VALUE"
+
+
+def test_inject_async(store):
+    @inject(store=store, value="KEY")
+    async def func(value):
+        return value
+
+    assert asyncio.run(func()) == "VALUE"
+
+
+def test_inject_async_does_not_block_loop(store, monkeypatch):
+    get_many = store.get_many
+
+    def slow_get_many(keys, timeout=None):
+        time.sleep(0.2)
+        return get_many(keys, timeout=timeout)
+
+    monkeypatch.setattr(store, "get_many", slow_get_many)
+
+    @inject(store=store, value="KEY")
+    async def func(value):
+        return value
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        value = await func()
+        ticker.cancel()
+        return value, ticks
+
+    value, ticks = asyncio.run(main())
+    assert value == "VALUE"
+    assert ticks >= 5
+
+
+def test_inject_unknown_parameter(store):
+    with pytest.raises(TypeError, match="has no parameter"):
+
+        @inject(store=store, missing="KEY")
+        def func(value):
+            return value
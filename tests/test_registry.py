@@ -0,0 +1,58 @@
+import threading
+import types
+
+import pytest
+
+from secretmanager import registry
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.settings import StoreChoice
+
+
+def test_known_implementation_is_imported_lazily(monkeypatch):
+    monkeypatch.setattr(registry, "_registry", {})
+    monkeypatch.setattr(registry, "registry", {})
+
+    assert registry.get_store_class(StoreChoice.ENV) is EnvVarStore
+
+
+def test_unavailable_implementation(monkeypatch):
+    monkeypatch.setattr(registry, "_has_module", lambda name: False)
+
+    with pytest.raises(NotImplementedError, match="Store GC is not registered. Install required dependencies"):
+        registry.get_store_class(StoreChoice.GOOGLE)
+
+
+def test_local_requires_fcntl(monkeypatch):
+    monkeypatch.setattr(registry, "registry", {})
+    monkeypatch.setattr(registry, "_has_module", lambda name: name != "fcntl")
+
+    assert not registry.is_available(StoreChoice.LOCAL)
+
+
+def test_unknown_implementation():
+    assert not registry.is_available("UNKNOWN")
+    with pytest.raises(NotImplementedError, match="Store UNKNOWN is not registered."):
+        registry.get_store("UNKNOWN")
+
+
+def test_concurrent_registration(monkeypatch):
+    monkeypatch.setattr(registry, "_registry", {})
+    monkeypatch.setattr(registry, "registry", types.MappingProxyType(registry._registry))
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def register() -> None:
+        barrier.wait()
+        try:
+            registry.get_store_class(StoreChoice.ENV)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=register) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert registry.registry == {StoreChoice.ENV.value: EnvVarStore}
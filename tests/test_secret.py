@@ -1,4 +1,5 @@
 import os
+import threading
 
 import pytest
 
@@ -108,3 +109,27 @@ def test_filter_via_settings(store):
 
     assert a._filter_key(store.settings)
     assert a() is None
+
+
+def test_concurrent_calls_with_different_stores(store, monkeypatch):
+    monkeypatch.setenv("MAPPED_KEY", "MAPPED")
+
+    mapped = EnvVarStore()
+    mapped.settings = StoreSettings(mapping={"KEY": "MAPPED_KEY"})
+    secret = Secret("KEY")
+    errors = []
+
+    def worker(store, expected: str) -> None:
+        try:
+            for _ in range(500):
+                assert secret(store=store) == expected
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(s, v)) for s, v in [(store, "VALUE"), (mapped, "MAPPED")] * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings
+
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.sources import SecretManagerSettingsSource
+
+
+class Database(BaseModel):
+    user: str
+    password: str
+
+
+class AppSettings(BaseSettings):
+    token: str
+    port: int = 8080
+    db: Database
+
+    @classmethod
+    def settings_customise_sources(
+        cls, settings_cls, init_settings, env_settings, dotenv_settings, file_secret_settings
+    ):
+        return (init_settings, SecretManagerSettingsSource(settings_cls, store=EnvVarStore()))
+
+
+@pytest.fixture(autouse=True)
+def _environ(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("token", "TOKEN")
+    monkeypatch.setenv("db__user", "USER")
+    monkeypatch.setenv("db__password", "PASSWORD")
+
+
+def test_source():
+    settings = AppSettings()
+
+    assert settings.token == "TOKEN"
+    assert settings.port == 8080
+    assert settings.db == Database(user="USER", password="PASSWORD")
+
+
+def test_source_init_precedence():
+    settings = AppSettings(token="OTHER")
+
+    assert settings.token == "OTHER"
+
+
+def test_source_single_batch(monkeypatch):
+    calls = []
+    get_many = EnvVarStore.get_many
+
+    def counting_get_many(self, keys, timeout=None):
+        calls.append(list(keys))
+        return get_many(self, keys, timeout=timeout)
+
+    monkeypatch.setattr(EnvVarStore, "get_many", counting_get_many)
+    AppSettings()
+
+    assert calls == [["token", "port", "db__user", "db__password"]]
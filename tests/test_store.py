@@ -1,6 +1,9 @@
+import os
+
 import pytest
 
 from secretmanager.implementations.env import EnvVarStore
+from secretmanager.store import AbstractSecretStore
 
 
 @pytest.mark.parametrize(
@@ -42,3 +45,42 @@ def test_deserialize_value(raw, expected):
 def test_serialize_value(raw, expected):
     value = EnvVarStore()._serialize(raw)
     assert value == expected
+
+
+def test_iter_secrets(monkeypatch):
+    monkeypatch.setattr(os, "environ", {f"KEY_{i}": str(i) for i in range(25)})
+    store = EnvVarStore()
+    keys = [f"KEY_{i}" for i in range(25)] + ["MISSING"]
+
+    secrets = list(store.iter_secrets(keys, batch_size=4, max_workers=2))
+
+    assert [k for k, _ in secrets] == keys[:-1]
+    assert secrets[3][1].get_secret_value() == 3
+
+
+def test_put_many_and_delete_many_default(monkeypatch):
+    monkeypatch.setattr(os, "environ", {"KEY": "VALUE", "LOCKED": "VALUE"})
+    store = EnvVarStore()
+    update = store.update
+
+    def update_unless_locked(key, value):
+        if key == "LOCKED":
+            raise RuntimeError("denied")
+        return update(key, value)
+
+    monkeypatch.setattr(store, "update", update_unless_locked)
+
+    # existing secrets are updated, a failed write does not abort the batch
+    errors = AbstractSecretStore.put_many(store, {"KEY": "UPDATED", "LOCKED": 1, "NEW": [1]})
+
+    assert errors["KEY"] is None
+
+    assert errors["NEW"] is None
+    assert isinstance(errors["LOCKED"], RuntimeError)
+    assert os.environ == {"KEY": '"UPDATED"', "LOCKED": "VALUE", "NEW": "[1]"}
+
+    errors = AbstractSecretStore.delete_many(store, ["KEY", "MISSING"])
+
+    assert errors["KEY"] is None
+    assert isinstance(errors["MISSING"], KeyError)
+    assert "KEY" not in os.environ
@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from secretmanager.implementations.dotenv import DotEnvStore
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.settings import StoreSettings
+from secretmanager.sync import SyncAction, digest, map_key, sync
+
+
+@pytest.fixture
+def source(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("NEW", "VALUE")
+    monkeypatch.setenv("CHANGED", r'{"LIST":[1,2,3]}')
+    monkeypatch.setenv("SAME", r'{"B":1,"A":2}')
+    return EnvVarStore()
+
+
+@pytest.fixture
+def target(tmp_path):
+    file = tmp_path / ".env"
+    file.write_text('CHANGED=\'{"LIST": [1]}\'\nSAME=\'{"A": 2, "B": 1}\'\nOTHER=KEEP\n')
+    return DotEnvStore(file=file)
+
+
+def actions(changes) -> dict[str, SyncAction]:
+    return {change.target_key: change.action for change in changes if change.error is None}
+
+
+def test_digest():
+    assert digest({"A": 1, "B": [1, 2]}) == digest({"B": [1, 2], "A": 1})
+    assert digest("1") != digest(1)
+
+
+def test_map_key():
+    settings = StoreSettings(prefix="APP_", suffix="_V1", mapping={"OLD": "NEW"}, filter_key=["SKIP"])
+
+    assert map_key("KEY", settings) == "APP_KEY_V1"
+    assert map_key("OLD", settings) == "APP_NEW_V1"
+    assert map_key("SKIP", settings) is None
+    assert map_key("prod/KEY", StoreSettings(), source_prefix="prod/") == "KEY"
+    assert map_key("dev/KEY", StoreSettings(), source_prefix="prod/") is None
+
+
+def test_sync(source, target):
+    changes = list(sync(source, target, keys=["NEW", "CHANGED", "SAME"], batch_size=2))
+
+    assert [change.key for change in changes] == ["NEW", "CHANGED", "SAME"]
+    assert actions(changes) == {"NEW": SyncAction.ADD, "CHANGED": SyncAction.UPDATE, "SAME": SyncAction.UNCHANGED}
+    assert target.get("NEW").get_secret_value() == "VALUE"
+    assert target.get("CHANGED").get_secret_value() == {"LIST": [1, 2, 3]}
+    assert target.get("OTHER").get_secret_value() == "KEEP"
+
+    assert set(actions(sync(source, target, keys=["NEW", "CHANGED", "SAME"])).values()) == {SyncAction.UNCHANGED}
+
+
+def test_dry_run(source, target):
+    content = target._file.read_text()
+
+    assert actions(sync(source, target, dry_run=True))["NEW"] == SyncAction.ADD
+    assert target._file.read_text() == content
+
+
+def test_new_secrets_are_not_read(source, target, monkeypatch):
+    requested = []
+    get_many = target.get_many
+    monkeypatch.setattr(target, "get_many", lambda keys, timeout=None: requested.extend(keys) or get_many(keys))
+
+    list(sync(source, target))
+
+    assert sorted(requested) == ["CHANGED", "SAME"]
+
+
+def test_mapping(source, target):
+    settings = StoreSettings(prefix="APP_", mapping={"NEW": "RENAMED"}, filter_key=["SAME"])
+
+    changes = list(sync(source, target, keys=["NEW", "CHANGED", "SAME"], settings=settings))
+
+    assert actions(changes) == {"APP_RENAMED": SyncAction.ADD, "APP_CHANGED": SyncAction.ADD}
+    assert target.get("APP_RENAMED").get_secret_value() == "VALUE"
+
+
+def test_partial_failure(source, target, monkeypatch):
+    def update(key, value):
+        raise RuntimeError("denied")
+
+    monkeypatch.setattr(target, "update", update)
+
+    changes = {change.target_key: change for change in sync(source, target)}
+
+    assert isinstance(changes["CHANGED"].error, RuntimeError)
+    assert changes["NEW"].error is None
+    assert target.get("NEW").get_secret_value() == "VALUE"
+
+
+def test_writes_are_batched(source, target, monkeypatch):
+    put_many = target.put_many
+    batches = []
+
+    def record(values):
+        batches.append(set(values))
+        return put_many(values)
+
+    monkeypatch.setattr(target, "put_many", record)
+
+    list(sync(source, target, keys=["NEW", "CHANGED", "SAME"], batch_size=3))
+
+    assert batches == [{"NEW", "CHANGED"}]
+
+
+def test_read_only_target(source, target):
+    target.capabilities = target.capabilities.model_copy(update={"write": False})
+
+    with pytest.raises(ValueError, match="does not support writing"):
+        sync(source, target)
+    assert actions(sync(source, target, dry_run=True))["NEW"] == SyncAction.ADD
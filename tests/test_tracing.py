@@ -0,0 +1,194 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from pydantic import Secret as PydanticSecret
+
+from secretmanager import tracing
+from secretmanager.decoding import LazySecretValue
+from secretmanager.error import SecretNotFoundError
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.secret import Secret
+from secretmanager.tracing import NOOP_SPAN, SamplingProfiler
+from secretmanager.value import SecretValue
+
+
+class RecordingSpan:
+    def __init__(self, tracer: "RecordingTracer", name: str, attributes: dict) -> None:
+        self.name = name
+        self.attributes = dict(attributes)
+        self.error: BaseException | None = None
+        self.parent = tracer.stack[-1].name if tracer.stack else None
+        self._tracer = tracer
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, error=None):
+        self.error = error
+        self._tracer.stack.remove(self)
+
+
+class RecordingTracer:
+    def __init__(self) -> None:
+        self.spans: list[RecordingSpan] = []
+        self.stack: list[RecordingSpan] = []
+
+    def start_span(self, name, attributes):
+        span = RecordingSpan(self, name, attributes)
+        self.spans.append(span)
+        self.stack.append(span)
+        return span
+
+    def find(self, name: str) -> list[RecordingSpan]:
+        return [s for s in self.spans if s.name == name]
+
+
+@pytest.fixture
+def tracer():
+    tracer = RecordingTracer()
+    previous = tracing.set_tracer(tracer)
+    yield tracer
+    tracing.set_tracer(previous)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setenv("KEY", "VERY-SECRET")
+    return EnvVarStore()
+
+
+def test_span_disabled():
+    assert not tracing.is_enabled()
+    assert tracing.span("name", key="KEY") is NOOP_SPAN
+
+
+def test_instrumentation_is_removed_when_disabled():
+    original = EnvVarStore.__dict__["get"]
+
+    previous = tracing.set_tracer(RecordingTracer())
+    assert EnvVarStore.__dict__["get"] is not original
+    tracing.set_tracer(previous)
+
+    assert EnvVarStore.__dict__["get"] is original
+    assert "__wrapped__" not in Secret.__call__.__dict__
+
+
+def test_secret_spans(tracer, store):
+    assert Secret("KEY", store=store)() == "VERY-SECRET"
+
+    resolve = tracer.find("secret.resolve")[0]
+    assert resolve.attributes == {"key": "KEY"}
+    assert resolve.parent is None
+    assert tracer.find("secret.map_key")[0].parent == "secret.resolve"
+
+    get = tracer.find("store.get")[0]
+    assert get.parent == "secret.resolve"
+    assert get.attributes == {"store": "EnvVarStore", "key": "KEY"}
+    assert tracer.find("cache.get")[0].attributes == {"hit": False}
+    assert tracer.find("store.to_secret_value")[0].parent == "store.get"
+    assert tracer.find("store.deserialize")[0].parent == "store.to_secret_value"
+    assert tracer.stack == []
+
+
+def test_cache_hit_span(tracer, store):
+    Secret("KEY", store=store)()
+    Secret("KEY", store=store)()
+
+    assert [s.attributes["hit"] for s in tracer.find("cache.get")] == [False, True]
+
+
+def test_error_is_recorded(tracer, store):
+    with pytest.raises(SecretNotFoundError):
+        store.get("MISSING")
+
+    assert isinstance(tracer.find("store.get")[0].error, SecretNotFoundError)
+
+
+def test_values_are_never_recorded(tracer, store):
+    store.add("OTHER", "ALSO-SECRET")
+    Secret("KEY", store=store)()
+    with tracing.span("custom", value="VERY-SECRET", secret=PydanticSecret("VERY-SECRET"), data={"a": 1}) as span:
+        span.set_attribute("value", "VERY-SECRET")
+        span.set_attribute("token", SecretValue("VERY-SECRET"))
+        span.set_attribute("lazy", LazySecretValue("VERY-SECRET"))
+
+    recorded = [v for s in tracer.spans for v in s.attributes.values()]
+    assert "VERY-SECRET" not in recorded
+    assert "ALSO-SECRET" not in recorded
+    assert tracer.find("custom")[0].attributes == {}
+
+
+def test_sampling_profiler(store):
+    with SamplingProfiler(interval=0.001) as profiler:
+        assert tracing.get_tracer() is profiler
+        for _ in range(3):
+            Secret("KEY", store=store)()
+        with tracing.span("slow"):
+            time.sleep(0.05)
+
+    assert not tracing.is_enabled()
+    summary = profiler.summary()
+    assert summary["secret.resolve"]["calls"] == 3
+    assert summary["slow"]["total"] >= 0.05
+    assert summary["slow"]["samples"] > 0
+    assert "slow " in profiler.folded()
+
+
+def test_sampling_profiler_threads(store):
+    def work():
+        with tracing.span("outer"), tracing.span("inner"):
+            time.sleep(0.02)
+
+    with SamplingProfiler(interval=0.001) as profiler:
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert profiler.calls["inner"] == 4
+    assert set(profiler.samples) == {("outer", "inner")}
+
+
+def test_sampling_profiler_coroutines(store):
+    async def work(name: str, delay: float):
+        with tracing.span(name):
+            await asyncio.sleep(delay)
+
+    async def main():
+        with tracing.span("gather"):
+            await asyncio.gather(work("first", 0.03), work("second", 0.01))
+
+    with SamplingProfiler(interval=0.001) as profiler:
+        asyncio.run(main())
+
+    # spans of coroutines on one loop thread do not end each other
+    assert set(profiler.samples) <= {("gather", "first"), ("gather", "second")}
+    assert ("gather", "first") in profiler.samples
+    assert profiler.calls == {"gather": 1, "first": 1, "second": 1}
+    assert profiler._active == {}
+    assert not profiler._children
+
+
+def test_opentelemetry_tracer(store):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    previous = tracing.set_tracer(tracing.OpenTelemetryTracer(provider.get_tracer("test")))
+    try:
+        Secret("KEY", store=store)()
+    finally:
+        tracing.set_tracer(previous)
+
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    assert spans["store.get"].parent.span_id == spans["secret.resolve"].context.span_id
+    assert "VERY-SECRET" not in [v for s in spans.values() for v in s.attributes.values()]
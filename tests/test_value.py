@@ -0,0 +1,46 @@
+import pickle
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from secretmanager.cache import CacheEntry
+from secretmanager.store import SecretValue
+
+
+class Model(BaseModel):
+    secret: SecretValue
+
+
+def test_masked():
+    value = SecretValue({"password": "VERY-SECRET"})
+
+    assert value.get_secret_value() == {"password": "VERY-SECRET"}
+    assert repr(value) == "SecretValue('**********')"
+    assert str(value) == "**********"
+    assert str(SecretValue("")) == ""
+    assert "VERY-SECRET" not in f"{value} {value!r}"
+
+
+def test_slotted():
+    assert not hasattr(SecretValue("VALUE"), "__dict__")
+    assert not hasattr(CacheEntry("VALUE", 0.0), "__dict__")
+
+
+def test_equality_and_pickling():
+    assert SecretValue("VALUE") == SecretValue("VALUE")
+    assert SecretValue("VALUE") != SecretValue("OTHER")
+    assert SecretValue("VALUE") != "VALUE"
+    assert hash(SecretValue("VALUE")) == hash(SecretValue("VALUE"))
+    assert pickle.loads(pickle.dumps(SecretValue([1, 2]))) == SecretValue([1, 2])
+
+
+def test_pydantic_field():
+    value = SecretValue({"a": 1})
+
+    assert Model(secret=value).secret is value
+    assert Model(secret={"a": 1}).secret == value
+    assert Model.model_validate_json('{"secret": {"a": 1}}').secret == value
+    assert Model(secret=value).model_dump() == {"secret": value}
+    assert Model(secret=value).model_dump_json() == '{"secret":"**********"}'
+    with pytest.raises(ValidationError):
+        Model(secret=object())
@@ -0,0 +1,120 @@
+import threading
+import time
+
+from secretmanager.implementations.env import EnvVarStore
+from secretmanager.watch import FileSnapshotDiff, SnapshotDiff, Watch
+
+
+class Source:
+    def __init__(self, values: dict[str, str]) -> None:
+        self.values = values
+        self.loads = 0
+
+    def __call__(self) -> dict[str, str]:
+        self.loads += 1
+        return dict(self.values)
+
+
+def test_snapshot_diff():
+    source = Source({"KEY": "VALUE", "OTHER": "VALUE"})
+    diff = SnapshotDiff(source)
+    assert diff() == set()
+
+    source.values = {"KEY": "UPDATED", "NEW": "VALUE"}
+
+    assert diff() == {"KEY", "OTHER", "NEW"}
+    assert diff() == set()
+
+
+def test_file_snapshot_diff_loads_modified_files_only(tmp_path):
+    file = tmp_path / "secrets"
+    file.write_text("")
+    source = Source({"KEY": "VALUE"})
+    diff = FileSnapshotDiff(file, source)
+
+    assert diff() == set()
+    assert source.loads == 1
+
+    source.values = {"KEY": "UPDATED"}
+    file.write_text("KEY=UPDATED")
+    assert diff() == {"KEY"}
+
+    file.unlink()
+    assert diff() == {"KEY"}
+    assert source.loads == 2
+
+
+def test_watch_invalidates_cache(monkeypatch, cache):
+    monkeypatch.setenv("KEY", "VALUE")
+    store = EnvVarStore()
+    store.capabilities.cacheable = True
+    store._put_cache("KEY", "CACHED")
+    store._put_cache("OTHER", "CACHED")
+
+    with Watch(store, ["KEY"], None, lambda: {"KEY", "OTHER"}, interval=60) as watch:
+        assert watch.check() == {"KEY"}
+
+    assert store._get_cache("KEY") is None
+    assert store._get_cache("OTHER") == "CACHED"
+
+
+def test_watch_notifies_subscribers(monkeypatch):
+    monkeypatch.setenv("KEY", "VALUE")
+    events = []
+    notified = threading.Event()
+
+    def callback(key, value):
+        events.append((key, value.get_secret_value() if value is not None else None))
+        notified.set()
+
+    with Watch(EnvVarStore(), None, callback, lambda: {"KEY", "DELETED"}, interval=0.01):
+        assert notified.wait(2)
+
+    assert events[:2] == [("DELETED", None), ("KEY", "VALUE")]
+
+
+def test_watch_survives_failures(monkeypatch, caplog):
+    monkeypatch.setenv("KEY", "VALUE")
+
+    def poll():
+        raise RuntimeError("unavailable")
+
+    def callback(key, value):
+        raise RuntimeError("broken subscriber")
+
+    with Watch(EnvVarStore(), None, None, poll, interval=60) as watch:
+        assert watch.check() == set()
+    with Watch(EnvVarStore(), None, callback, lambda: {"KEY"}, interval=60) as watch:
+        assert watch.check() == {"KEY"}
+
+    assert "unavailable" in caplog.text
+    assert "broken subscriber" in caplog.text
+
+
+def test_concurrent_checks_report_a_change_once():
+    reported = threading.Event()
+
+    def poll() -> set[str]:
+        # like a snapshot diff, the previous state is read before it is replaced
+        if reported.is_set():
+            return set()
+        time.sleep(0.05)
+        reported.set()
+        return {"KEY"}
+
+    barrier = threading.Barrier(4)
+    results = []
+
+    with Watch(EnvVarStore(), None, None, poll, interval=60) as watch:
+
+        def check() -> None:
+            barrier.wait()
+            results.append(watch.check())
+
+        threads = [threading.Thread(target=check) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert sorted(results, key=len) == [set(), set(), set(), {"KEY"}]